@@ -1,70 +1,124 @@
 # /TINO-TE.ai-BETA-backend/app/admin.py
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from . import crud, models, schemas
-from .database import get_db
+from . import crud_async, models, schemas, upstream
+from .database import get_async_db, pool_stats as db_pool_stats
 from .admin_auth import verify_admin_api_key
+from .auth_cache import auth_cache
+from .workers import pool_stats
 
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
 
-@router.get("/users", response_model=List[schemas.User])
-def read_users(
+# 사용자 응답에 노트 요약 목록을 포함하도록 요청하는 include 값
+INCLUDE_NOTES_SUMMARY = "notes_summary"
+
+
+def wants_note_summaries(include: Optional[str]) -> bool:
+    """?include= 값을 확인합니다. 지원하지 않는 값이면 400 오류를 발생시킵니다."""
+    if not include:
+        return False
+    values = {value.strip() for value in include.split(",") if value.strip()}
+    unknown = values - {INCLUDE_NOTES_SUMMARY}
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 include 값입니다: {', '.join(sorted(unknown))}",
+        )
+    return INCLUDE_NOTES_SUMMARY in values
+
+
+async def build_user_responses(
+    db: AsyncSession, users: List[models.User], include_notes: bool = False
+) -> List[schemas.User]:
+    """
+    사용자 응답 목록을 만듭니다. 노트 수는 GROUP BY 쿼리 한 번으로 계산하며,
+    include_notes=True이면 crud_async.get_users(with_note_summaries=True)로 미리 불러온 노트 요약을 포함합니다.
+    (schemas.User.model_validate(user)는 notes 관계를 지연 로딩하므로 사용하지 않습니다.)
+    """
+    counts = await crud_async.count_notes_by_owner(db, [user.id for user in users])
+    responses = []
+    for user in users:
+        notes = None
+        if include_notes:
+            ordered = sorted(user.notes, key=lambda note: (note.created_at, str(note.id)), reverse=True)
+            notes = [schemas.NoteSummary.model_validate(note) for note in ordered]
+        responses.append(schemas.User(
+            id=user.id,
+            name=user.name,
+            student_id=user.student_id,
+            api_key=user.api_key,
+            daily_credits=user.daily_credits,
+            note_count=counts.get(user.id, 0),
+            notes=notes,
+        ))
+    return responses
+
+
+@router.get("/users", response_model=List[schemas.User], response_model_exclude_none=True)
+async def read_users(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     api_key: str = Depends(verify_admin_api_key)
 ):
     """
-    모든 사용자 목록을 조회합니다.
+    모든 사용자 목록을 노트 수와 함께 조회합니다.
+    ?include=notes_summary를 지정하면 사용자별 노트 요약 목록(본문 제외)도 포함합니다.
     """
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+    include_notes = wants_note_summaries(include)
+    users = await crud_async.get_users(db, skip=skip, limit=limit, with_note_summaries=include_notes)
+    return await build_user_responses(db, users, include_notes)
 
-@router.post("/users", response_model=schemas.User)
-def create_user(
+@router.post("/users", response_model=schemas.User, response_model_exclude_none=True)
+async def create_user(
     user: schemas.UserCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     api_key: str = Depends(verify_admin_api_key)
 ):
     """
     새로운 사용자를 생성합니다.
     """
-    db_user = crud.get_user_by_student_id(db, student_id=user.student_id)
+    db_user = await crud_async.get_user_by_student_id(db, student_id=user.student_id)
     if db_user:
         raise HTTPException(status_code=400, detail="이미 존재하는 학번입니다.")
-    return crud.create_user(db=db, user=user)
+    created_user = await crud_async.create_user(db=db, user=user)
+    return (await build_user_responses(db, [created_user]))[0]
 
 @router.delete("/users/{student_id}")
-def delete_user(
+async def delete_user(
     student_id: str, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     api_key: str = Depends(verify_admin_api_key)
 ):
     """
     특정 학번의 사용자를 삭제합니다.
     """
-    db_user = crud.get_user_by_student_id(db, student_id=student_id)
+    db_user = await crud_async.get_user_by_student_id(db, student_id=student_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     
-    db.delete(db_user)
-    db.commit()
+    user_id = db_user.id
+    await crud_async.delete_user_jobs(db, user_id)
+    await db.delete(db_user)
+    await db.commit()
+    auth_cache.invalidate_user(user_id)
     return {"detail": f"학번 {student_id}의 사용자가 삭제되었습니다."}
 
-@router.put("/users/{student_id}", response_model=schemas.User)
-def update_user(
+@router.put("/users/{student_id}", response_model=schemas.User, response_model_exclude_none=True)
+async def update_user(
     student_id: str, 
     user: schemas.UserCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     api_key: str = Depends(verify_admin_api_key)
 ):
     """
     특정 학번의 사용자 정보를 수정합니다.
     """
-    db_user = crud.get_user_by_student_id(db, student_id=student_id)
+    db_user = await crud_async.get_user_by_student_id(db, student_id=student_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     
@@ -72,6 +126,33 @@ def update_user(
     db_user.name = user.name
     db_user.student_id = user.student_id
     
-    db.commit()
-    db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_user)
+    auth_cache.invalidate_user(db_user.id)
+    return (await build_user_responses(db, [db_user]))[0]
+
+
+@router.get("/workers")
+def read_worker_stats(api_key: str = Depends(verify_admin_api_key)):
+    """
+    프로세스 풀(문서 추출, PDF 렌더링)의 대기 작업 수와 실행 시간 통계를 조회합니다.
+    """
+    return {"pools": pool_stats()}
+
+
+@router.get("/db-pool")
+def read_db_pool_stats(api_key: str = Depends(verify_admin_api_key)):
+    """
+    데이터베이스 연결 풀의 현재 사용량(사용 중/대기 연결 수)과
+    연결 대여 횟수, 대기 시간, 시간 초과 횟수 등의 누적 통계를 조회합니다.
+    """
+    return {"pool": db_pool_stats()}
+
+
+@router.get("/ai-queue")
+def read_ai_queue_stats(api_key: str = Depends(verify_admin_api_key)):
+    """
+    외부 AI API 호출 대기열을 모델별로 조회합니다.
+    실행 중/대기 중인 요청 수, 기다리는 사용자 수, 남은 RPM/TPM 예산, 429 횟수, 대기 시간 통계를 포함합니다.
+    """
+    return {"models": upstream.lane_stats()}
@@ -2,24 +2,28 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import APIKeyHeader
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from . import crud
-from .database import get_db
-from .models import User
+from . import crud_async
+from .auth_cache import AuthenticatedUser, auth_cache
+from .database import get_async_db
 
 # --- 코드 설명 ---
 # 이 파일은 API 요청의 인증 및 권한 부여를 처리합니다.
+# 확인된 API 키는 auth_cache에 잠시 보관되므로, 대부분의 요청은 DB 조회 없이 인증됩니다.
+# get_async_db는 FastAPI가 요청마다 한 번만 만들어 인증과 라우트가 같은 세션을 공유하며,
+# 세션은 실제로 쿼리할 때 연결을 가져오므로 캐시 적중 시에는 DB 연결을 사용하지 않습니다.
 
 # "Authorization" 헤더에서 API 키를 추출하는 객체를 생성합니다.
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
 async def get_current_user(
-    api_key: str = Depends(api_key_header), db: Session = Depends(get_db)
-) -> User:
+    api_key: str = Depends(api_key_header), db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
     """
     API 키를 검증하고, 유효한 경우 해당 사용자 정보를 반환하는 의존성 함수.
     크레딧 체크는 하지 않으므로 로그인, 사용자 정보 조회 등에 사용 가능합니다.
+    반환값은 DB 세션과 분리된 AuthenticatedUser이므로 관계(notes 등)가 필요하면 DB에서 다시 조회해야 합니다.
     """
     if not api_key or not api_key.startswith("Bearer "):
         raise HTTPException(
@@ -29,25 +33,33 @@ async def get_current_user(
 
     # "Bearer " 접두사를 제거하여 순수한 API 키만 추출합니다.
     token = api_key.split(" ")[1]
-    
+
+    # 최근에 확인된 키라면 DB를 조회하지 않습니다.
+    principal = auth_cache.get(token)
+    if principal is not None:
+        return principal
+
     # DB에서 해당 API 키를 가진 사용자를 찾습니다.
-    user = crud.get_user_by_api_key(db, api_key=token)
+    user = await crud_async.get_user_by_api_key(db, api_key=token)
     
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API 키가 올바르지 않습니다.",
         )
-        
-    # 모든 검증을 통과하면 사용자 객체를 반환합니다.
-    return user
+
+    # 모든 검증을 통과하면 사용자 정보를 캐시에 넣고 반환합니다.
+    principal = AuthenticatedUser.from_model(user)
+    auth_cache.set(principal)
+    return principal
 
 async def get_current_user_with_credits(
-    api_key: str = Depends(api_key_header), db: Session = Depends(get_db)
-) -> User:
+    api_key: str = Depends(api_key_header), db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
     """
     API 키를 검증하고 크레딧도 체크하는 의존성 함수.
     노트 생성 등 크레딧이 필요한 작업에만 사용합니다.
+    여기서는 빠른 거절만 하며, 실제 차감은 credits.reserve_credits가 DB에서 원자적으로 처리합니다.
     """
     # 먼저 기본 사용자 인증을 수행
     user = await get_current_user(api_key, db)
@@ -0,0 +1,116 @@
+# /TINO-TE.ai-BETA-backend/app/auth_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from app.config import settings
+
+# --- 코드 설명 ---
+# 이 파일은 API 키 → 사용자 정보를 프로세스 메모리에 잠시 보관하는 인증 캐시입니다.
+# 인증이 필요한 모든 요청이 DB에서 API 키를 조회하지 않도록,
+# 한 번 확인된 키는 TTL 동안 메모리에서 바로 확인합니다.
+# 관리자 수정/삭제, 크레딧 변경 시 해당 사용자의 항목을 갱신하거나 지웁니다.
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """인증된 사용자 정보 (요청 간에 공유되므로 DB 세션과 분리된 읽기 전용 값입니다)"""
+
+    id: int
+    name: str
+    student_id: str
+    api_key: str
+    daily_credits: int  # 캐시에 저장된 시점의 크레딧 (실제 차감은 항상 DB에서 처리)
+
+    @classmethod
+    def from_model(cls, user) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            name=user.name,
+            student_id=user.student_id,
+            api_key=user.api_key,
+            daily_credits=user.daily_credits,
+        )
+
+
+class AuthCache:
+    """API 키를 키로 하는 TTL + LRU 캐시"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._keys_by_user: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str) -> Optional[AuthenticatedUser]:
+        """캐시된 사용자를 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            item = self._entries.get(api_key)
+            if item is None:
+                return None
+            stored_at, principal = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(api_key)
+                return None
+            self._entries.move_to_end(api_key)
+            return principal
+
+    def set(self, principal: AuthenticatedUser) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            old_key = self._keys_by_user.get(principal.id)
+            if old_key is not None and old_key != principal.api_key:
+                self._remove(old_key)
+            self._entries[principal.api_key] = (time.monotonic(), principal)
+            self._entries.move_to_end(principal.api_key)
+            self._keys_by_user[principal.id] = principal.api_key
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def update_credits(self, user_id: int, daily_credits: Optional[int]) -> None:
+        """
+        크레딧이 바뀐 사용자의 캐시 값을 갱신합니다.
+        새 값을 모르면(None) 항목을 지워 다음 요청에서 DB를 다시 읽게 합니다.
+        """
+        with self._lock:
+            api_key = self._keys_by_user.get(user_id)
+            if api_key is None:
+                return
+            if daily_credits is None:
+                self._remove(api_key)
+                return
+            stored_at, principal = self._entries[api_key]
+            # 만료 시각은 그대로 두어 다른 필드가 TTL보다 오래 남지 않도록 합니다.
+            self._entries[api_key] = (stored_at, replace(principal, daily_credits=daily_credits))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """사용자 정보가 바뀌거나 삭제되었을 때 해당 항목을 지웁니다."""
+        with self._lock:
+            api_key = self._keys_by_user.get(user_id)
+            if api_key is not None:
+                self._remove(api_key)
+
+    def clear(self) -> None:
+        """모든 항목을 지웁니다. (전체 크레딧 초기화 등)"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, api_key: str) -> None:
+        # 호출하는 쪽에서 lock을 잡고 있어야 합니다.
+        item = self._entries.pop(api_key, None)
+        if item is not None and self._keys_by_user.get(item[1].id) == api_key:
+            del self._keys_by_user[item[1].id]
+
+
+auth_cache = AuthCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,178 @@
+# /TINO-TE.ai-BETA-backend/app/cache.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async, services
+from app.config import settings
+from app.ingestion import IngestedUpload
+from app.logging_config import logger
+
+# --- 코드 설명 ---
+# 이 파일은 업로드 내용의 SHA-256 해시(ingestion.py에서 업로드를 받으며 계산)를 키로 하는 전사/요약 결과 캐시를 담당합니다.
+# 같은 반 학생들이 같은 강의 녹음이나 자료를 여러 번 올려도
+# Whisper/GPT를 다시 호출하지 않고 저장된 결과로 바로 노트를 만듭니다.
+# 1단계(hot tier): 프로세스 메모리의 작은 LRU 캐시
+# 2단계: 데이터베이스의 result_cache 테이블 (TTL + LRU 정리)
+
+# 이 횟수만큼 저장할 때마다 DB 캐시를 한 번 정리합니다.
+PRUNE_EVERY_WRITES = 100
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(kind: str, content_hash: str, model: str, language: str, prompt_version: str) -> str:
+    """내용 해시와 결과에 영향을 주는 설정값들을 묶어 캐시 키를 만듭니다."""
+    raw = "|".join([kind, content_hash, model, language, prompt_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """메모리(hot tier)와 데이터베이스 두 단계로 구성된 결과 캐시"""
+
+    def __init__(self, hot_entries: int, hot_ttl_seconds: int, ttl_seconds: int, max_entries: int):
+        self.hot_entries = hot_entries
+        self.hot_ttl_seconds = hot_ttl_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._hot: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _get_hot(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._hot.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.hot_ttl_seconds:
+                del self._hot[key]
+                return None
+            self._hot.move_to_end(key)
+            return value
+
+    def _set_hot(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._hot[key] = (time.monotonic(), value)
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_entries:
+                self._hot.popitem(last=False)
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[Any]:
+        """캐시된 결과를 반환합니다. 없으면 None을 반환합니다."""
+        value = self._get_hot(key)
+        if value is not None:
+            return value
+
+        try:
+            entry = await crud_async.get_cache_entry(db, key=key, ttl_seconds=self.ttl_seconds)
+        except Exception as e:
+            # 캐시 조회 실패가 노트 생성을 막아서는 안 됩니다.
+            logger.warning(f"캐시 조회 실패: {e}")
+            await db.rollback()
+            return None
+        if entry is None:
+            return None
+
+        value = json.loads(entry.payload)
+        self._set_hot(key, value)
+        return value
+
+    async def set(self, db: AsyncSession, key: str, kind: str, value: Any) -> None:
+        """결과를 메모리와 데이터베이스에 저장합니다."""
+        self._set_hot(key, value)
+        try:
+            await crud_async.upsert_cache_entry(db, key=key, kind=kind, payload=json.dumps(value, ensure_ascii=False))
+            self._writes += 1
+            if self._writes % PRUNE_EVERY_WRITES == 0:
+                await self.prune(db)
+        except Exception as e:
+            logger.warning(f"캐시 저장 실패: {e}")
+            await db.rollback()
+
+    async def prune(self, db: AsyncSession) -> int:
+        """만료되었거나 한도를 넘은 DB 캐시 항목을 정리합니다."""
+        deleted = await crud_async.prune_cache_entries(db, ttl_seconds=self.ttl_seconds, max_entries=self.max_entries)
+        if deleted:
+            logger.info(f"결과 캐시 {deleted}개 항목을 정리했습니다.")
+        return deleted
+
+    def clear_hot(self) -> None:
+        with self._lock:
+            self._hot.clear()
+
+
+result_cache = ResultCache(
+    hot_entries=settings.RESULT_CACHE_HOT_ENTRIES,
+    hot_ttl_seconds=settings.RESULT_CACHE_HOT_TTL_SECONDS,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+)
+
+
+async def transcribe_media_cached(db: AsyncSession, upload: IngestedUpload) -> str:
+    """같은 미디어 파일의 전사 결과가 캐시에 있으면 재사용하고, 없으면 Whisper를 호출합니다."""
+    content_hash = upload.sha256
+    key = make_key(
+        "transcription", content_hash,
+        services.WHISPER_MODEL, services.TRANSCRIPTION_LANGUAGE, services.TRANSCRIPTION_PROMPT_VERSION,
+    )
+    cached = await result_cache.get(db, key)
+    if cached is not None:
+        logger.info(f"전사 캐시 적중: {content_hash[:12]}")
+        return cached
+
+    transcription = await services.transcribe_media_with_whisper(upload)
+    await result_cache.set(db, key, "transcription", transcription)
+    return transcription
+
+
+async def extract_document_text_cached(db: AsyncSession, upload: IngestedUpload) -> str:
+    """같은 문서의 추출 텍스트가 캐시에 있으면 재사용합니다."""
+    content_hash = upload.sha256
+    key = make_key("document_text", content_hash, "local", "-", "1")
+    cached = await result_cache.get(db, key)
+    if cached is not None:
+        logger.info(f"문서 텍스트 캐시 적중: {content_hash[:12]}")
+        return cached
+
+    text = await services.extract_text_from_document(upload)
+    await result_cache.set(db, key, "document_text", text)
+    return text
+
+
+def _summary_key(text: str) -> str:
+    return make_key(
+        "summary", hash_text(text),
+        services.SUMMARY_MODEL, services.TRANSCRIPTION_LANGUAGE, services.SUMMARY_PROMPT_VERSION,
+    )
+
+
+async def get_cached_summary(db: AsyncSession, text: str) -> Optional[dict]:
+    """같은 텍스트의 요약 결과가 캐시에 있으면 반환합니다."""
+    return await result_cache.get(db, _summary_key(text))
+
+
+async def store_summary(db: AsyncSession, text: str, summarized_result: dict) -> None:
+    """요약 결과를 캐시에 저장합니다. (스트리밍 요약이 끝난 뒤에도 사용)"""
+    await result_cache.set(db, _summary_key(text), "summary", summarized_result)
+
+
+async def summarize_text_cached(db: AsyncSession, text: str) -> dict:
+    """같은 텍스트의 요약 결과가 캐시에 있으면 재사용하고, 없으면 GPT를 호출합니다."""
+    cached = await get_cached_summary(db, text)
+    if cached is not None:
+        logger.info("요약 캐시 적중")
+        return cached
+
+    summarized_result = await services.summarize_long_text(text)
+    await store_summary(db, text, summarized_result)
+    return summarized_result
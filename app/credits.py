@@ -0,0 +1,76 @@
+# /TINO-TE.ai-BETA-backend/app/credits.py
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async
+from app.logging_config import logger
+
+# --- 코드 설명 ---
+# 이 파일은 노트 생성에 필요한 크레딧을 처리 시작 전에 미리 예약(차감)하고,
+# 처리가 성공하면 확정, 실패하면 환불하는 크레딧 장부 역할을 합니다.
+# 예약은 조건부 UPDATE 한 문장(crud_async.reserve_credits)으로 처리되므로
+# 같은 사용자가 동시에 여러 파일을 올려도 가진 크레딧 이상을 사용할 수 없습니다.
+
+
+class CreditReservation:
+    """예약된 크레딧 하나를 나타냅니다. commit 또는 refund 중 한 번만 처리됩니다."""
+
+    def __init__(self, user_id: int, amount: int, remaining: int):
+        self.user_id = user_id
+        self.amount = amount
+        self.remaining = remaining
+        self._settled = False
+
+    @property
+    def settled(self) -> bool:
+        """확정 또는 환불이 이미 처리되었는지 여부"""
+        return self._settled
+
+    def commit(self) -> None:
+        """작업이 성공했으므로 예약된 크레딧 차감을 확정합니다."""
+        self._settled = True
+
+    async def refund(self, db: AsyncSession) -> None:
+        """작업이 실패했으므로 예약된 크레딧을 돌려줍니다."""
+        if self._settled:
+            return
+        self._settled = True
+        try:
+            await crud_async.refund_credits(db, user_id=self.user_id, amount=self.amount)
+        except Exception as e:
+            logger.error(f"크레딧 환불 실패 (user_id={self.user_id}, amount={self.amount}): {e}")
+            await db.rollback()
+
+
+async def reserve_credits(db: AsyncSession, user_id: int, amount: int) -> CreditReservation:
+    """크레딧을 예약합니다. 크레딧이 부족하면 403 오류를 발생시킵니다."""
+    remaining = await crud_async.reserve_credits(db, user_id=user_id, amount=amount)
+    if remaining is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="크레딧이 부족합니다. 내일 다시 시도해주세요.",
+        )
+    return CreditReservation(user_id, amount, remaining)
+
+
+@asynccontextmanager
+async def credit_reservation(db: AsyncSession, user_id: int, amount: int) -> AsyncIterator[CreditReservation]:
+    """
+    블록 실행 전에 크레딧을 예약하고, 블록이 예외 없이 끝나면 확정, 예외가 발생하면 환불합니다.
+
+    async with credit_reservation(db, user.id, 10):
+        note = await pipeline.build_note_from_media(...)
+    """
+    reservation = await reserve_credits(db, user_id, amount)
+    try:
+        yield reservation
+    except BaseException:
+        await db.rollback()
+        await reservation.refund(db)
+        raise
+    else:
+        reservation.commit()
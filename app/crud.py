@@ -1,11 +1,16 @@
 # /TINO-TE.ai-BETA-backend/app/crud.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.orm import Session, load_only, selectinload, undefer_group, with_expression
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import base64
 import secrets
 import uuid
 
 # 우리가 만든 models.py와 schemas.py를 가져옵니다.
 from . import models, schemas
+from .auth_cache import auth_cache
 
 # --- 기존 함수 (수정 없음) ---
 def get_user_by_student_id(db: Session, student_id: str):
@@ -42,26 +47,175 @@ def create_note_for_user(db: Session, note: schemas.Note, user_id: int):
     return db_note
 
 def deduct_credits(db: Session, user_id: int, amount: int = 1):
-    """사용자의 크레딧을 차감합니다."""
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    if db_user:
-        db_user.daily_credits -= amount
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+    """
+    사용자의 크레딧을 차감하고 남은 크레딧을 반환합니다.
+    조회 후 수정하지 않고 UPDATE 한 번으로 처리합니다.
+    """
+    remaining = db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(daily_credits=models.User.daily_credits - amount)
+        .returning(models.User.daily_credits)
+    ).scalar_one_or_none()
+    db.commit()
+    auth_cache.update_credits(user_id, remaining)
+    return remaining
+
+# --- [추가] 크레딧 예약/환불 함수 ---
+def reserve_credits(db: Session, user_id: int, amount: int):
+    """
+    크레딧이 충분한 경우에만 원자적으로 차감하고 남은 크레딧을 반환합니다.
+    크레딧이 부족하면 아무것도 바꾸지 않고 None을 반환합니다.
+    조건부 UPDATE 한 문장으로 처리하므로 같은 사용자의 동시 요청이 크레딧을 초과 사용할 수 없습니다.
+    """
+    remaining = db.execute(
+        update(models.User)
+        .where(models.User.id == user_id, models.User.daily_credits >= amount)
+        .values(daily_credits=models.User.daily_credits - amount)
+        .returning(models.User.daily_credits)
+    ).scalar_one_or_none()
+    db.commit()
+    auth_cache.update_credits(user_id, remaining)
+    return remaining
+
+def refund_credits(db: Session, user_id: int, amount: int):
+    """예약했던 크레딧을 되돌려주고 남은 크레딧을 반환합니다."""
+    remaining = db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(daily_credits=models.User.daily_credits + amount)
+        .returning(models.User.daily_credits)
+    ).scalar_one_or_none()
+    db.commit()
+    auth_cache.update_credits(user_id, remaining)
+    return remaining
 
 # --- [추가] 특정 사용자의 모든 노트를 조회하는 함수 ---
 def get_notes_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     """특정 사용자가 생성한 노트 목록을 조회합니다."""
     return db.query(models.Note).filter(models.Note.owner_id == user_id).offset(skip).limit(limit).all()
 
+# --- [추가] 커서 기반 노트 목록 조회 함수 ---
+NOTE_PREVIEW_LENGTH = 120  # 목록에 보여줄 요약 미리보기 길이(글자 수)
+
+def _note_preview_expression():
+    """요약의 앞부분만 DB에서 잘라 가져오는 SQL 식"""
+    return func.coalesce(func.substr(models.Note.summary, 1, NOTE_PREVIEW_LENGTH), "")
+
+def encode_note_cursor(created_at: datetime, note_id: uuid.UUID) -> str:
+    """페이지의 마지막 노트로 다음 페이지 커서를 만듭니다."""
+    raw = f"{created_at.isoformat()}|{note_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_note_cursor(cursor: str):
+    """커서를 (created_at, note_id)로 되돌립니다. 형식이 잘못되면 ValueError가 발생합니다."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, note_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(note_id)
+    except (UnicodeError, ValueError) as e:
+        raise ValueError("올바르지 않은 커서입니다.") from e
+
+def get_note_summaries(db: Session, user_id: int, limit: int = 50, cursor: str = None):
+    """
+    사용자의 노트를 최신순(created_at, id 내림차순)으로 한 페이지 조회합니다.
+    OFFSET 대신 마지막으로 본 노트 이후부터 읽는 키셋 방식이라 페이지가 깊어져도 느려지지 않으며,
+    원문/요약 본문 대신 요약의 앞부분만 DB에서 잘라 가져옵니다.
+    (노트 목록, 다음 페이지 커서 또는 None)을 반환합니다.
+    """
+    query = db.query(
+        models.Note.id,
+        models.Note.title,
+        models.Note.note_type,
+        models.Note.created_at,
+        _note_preview_expression().label("preview"),
+    ).filter(models.Note.owner_id == user_id)
+
+    if cursor:
+        created_at, note_id = decode_note_cursor(cursor)
+        query = query.filter(
+            tuple_(models.Note.created_at, models.Note.id) < tuple_(created_at, note_id)
+        )
+
+    # 다음 페이지가 있는지 확인하기 위해 하나 더 읽습니다.
+    rows = query.order_by(models.Note.created_at.desc(), models.Note.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_note_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def get_note_ids_for_export(
+    db: Session,
+    user_id: int,
+    note_ids: Optional[List[uuid.UUID]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[uuid.UUID]:
+    """내보낼 노트의 ID를 생성일 순으로 조회합니다. 본문은 읽지 않습니다."""
+    query = db.query(models.Note.id).filter(models.Note.owner_id == user_id)
+    if note_ids:
+        query = query.filter(models.Note.id.in_(note_ids))
+    if created_from is not None:
+        query = query.filter(models.Note.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(models.Note.created_at <= created_to)
+    query = query.order_by(models.Note.created_at, models.Note.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return [row.id for row in query.all()]
+
+# --- [추가] 사용자 목록과 노트 통계 조회 함수 ---
+def get_users(db: Session, skip: int = 0, limit: Optional[int] = 100, with_note_summaries: bool = False):
+    """
+    사용자 목록을 조회합니다.
+    with_note_summaries=True이면 모든 사용자의 노트 요약(본문 제외)을 selectinload 쿼리 한 번으로 함께 불러옵니다.
+    """
+    query = db.query(models.User).order_by(models.User.id)
+    if with_note_summaries:
+        query = query.options(_note_summaries_option())
+    return query.offset(skip).limit(limit).all()
+
+def get_user_with_note_summaries(db: Session, user_id: int):
+    """사용자 한 명과 그 사용자의 노트 요약(본문 제외)을 불러옵니다."""
+    return (
+        db.query(models.User)
+        .options(_note_summaries_option())
+        .filter(models.User.id == user_id)
+        .first()
+    )
+
+def _note_summaries_option():
+    return selectinload(models.User.notes).options(
+        load_only(models.Note.id, models.Note.title, models.Note.note_type, models.Note.created_at),
+        with_expression(models.Note.preview, _note_preview_expression()),
+    )
+
+def count_notes_by_owner(db: Session, user_ids: List[int]) -> Dict[int, int]:
+    """여러 사용자의 노트 수를 GROUP BY 쿼리 한 번으로 계산합니다."""
+    if not user_ids:
+        return {}
+    rows = (
+        db.query(models.Note.owner_id, func.count(models.Note.id))
+        .filter(models.Note.owner_id.in_(user_ids))
+        .group_by(models.Note.owner_id)
+        .all()
+    )
+    return {owner_id: count for owner_id, count in rows}
+
 # --- [추가] 특정 노트 하나를 ID로 조회하는 함수 ---
-def get_note(db: Session, note_id: uuid.UUID, user_id: int):
+def get_note(db: Session, note_id: uuid.UUID, user_id: int, with_body: bool = False):
     """
     사용자 ID와 노트 ID로 특정 노트를 조회합니다.
     (다른 사용자의 노트를 볼 수 없도록 user_id로 한 번 더 확인합니다.)
+    with_body=True이면 원문/요약도 같은 쿼리로 함께 불러옵니다.
+    그렇지 않으면 본문은 처음 접근할 때 별도 쿼리로 불러옵니다.
     """
-    return db.query(models.Note).filter(models.Note.id == note_id, models.Note.owner_id == user_id).first()
+    query = db.query(models.Note).filter(models.Note.id == note_id, models.Note.owner_id == user_id)
+    if with_body:
+        query = query.options(undefer_group(models.NOTE_BODY_GROUP))
+    return query.first()
 
 # --- [추가] 모든 사용자의 크레딧을 초기화하는 함수 ---
 def reset_all_user_credits(db: Session, credits: int = 10):
@@ -71,6 +225,7 @@ def reset_all_user_credits(db: Session, credits: int = 10):
     """
     db.query(models.User).update({models.User.daily_credits: credits})
     db.commit()
+    auth_cache.clear()
     return {"message": f"모든 사용자의 크레딧이 {credits}으로 초기화되었습니다."}
 
 # --- [추가] 노트 삭제 함수 ---
@@ -85,7 +240,165 @@ def delete_note(db: Session, note_id: uuid.UUID, user_id: int):
     ).first()
     
     if note:
+        # 이 노트를 만든 작업 기록은 남기고 노트 연결만 끊습니다. (외래 키 위반 방지)
+        db.query(models.Job).filter(models.Job.note_id == note_id).update(
+            {models.Job.note_id: None}, synchronize_session=False
+        )
         db.delete(note)
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+# --- [추가] 전사/요약 결과 캐시 함수 ---
+def get_cache_entry(db: Session, key: str, ttl_seconds: int):
+    """
+    캐시 항목을 조회합니다. 만료되지 않은 항목이면 사용 기록을 갱신한 뒤 반환합니다.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    entry = db.query(models.ResultCacheEntry).filter(
+        models.ResultCacheEntry.key == key,
+        models.ResultCacheEntry.created_at >= cutoff
+    ).first()
+
+    if entry:
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_accessed_at = datetime.now(timezone.utc)
+        db.commit()
+    return entry
+
+def upsert_cache_entry(db: Session, key: str, kind: str, payload: str):
+    """캐시 항목을 저장합니다. 같은 키가 있으면 내용을 덮어씁니다."""
+    now = datetime.now(timezone.utc)
+    db.merge(models.ResultCacheEntry(
+        key=key,
+        kind=kind,
+        payload=payload,
+        hit_count=0,
+        created_at=now,
+        last_accessed_at=now
+    ))
+    db.commit()
+
+def prune_cache_entries(db: Session, ttl_seconds: int, max_entries: int) -> int:
+    """
+    만료된 캐시 항목을 삭제하고, 남은 항목이 max_entries를 넘으면
+    가장 오래 사용되지 않은 항목부터 삭제합니다. 삭제된 항목 수를 반환합니다.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    deleted = db.query(models.ResultCacheEntry).filter(
+        models.ResultCacheEntry.created_at < cutoff
+    ).delete(synchronize_session=False)
+
+    overflow = db.query(models.ResultCacheEntry).count() - max_entries
+    if overflow > 0:
+        stale_keys = db.query(models.ResultCacheEntry.key).order_by(
+            models.ResultCacheEntry.last_accessed_at.asc()
+        ).limit(overflow).subquery()
+        deleted += db.query(models.ResultCacheEntry).filter(
+            models.ResultCacheEntry.key.in_(stale_keys.select())
+        ).delete(synchronize_session=False)
+
+    db.commit()
+    return deleted
+
+# --- [추가] 노트 생성 백그라운드 작업 함수 ---
+def create_job(db: Session, job_id: uuid.UUID, user_id: int, kind: str, filename: str, content_type: str, input_path: str, credits_reserved: int = 0):
+    """새로운 대기 상태의 작업을 생성합니다."""
+    db_job = models.Job(
+        id=job_id,
+        owner_id=user_id,
+        kind=kind,
+        status="queued",
+        stage="queued",
+        progress=0,
+        filename=filename,
+        content_type=content_type,
+        input_path=input_path,
+        credits_reserved=credits_reserved
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_job(db: Session, job_id: uuid.UUID, user_id: int = None):
+    """
+    작업을 조회합니다. user_id가 주어지면 해당 사용자의 작업만 조회합니다.
+    """
+    query = db.query(models.Job).filter(models.Job.id == job_id)
+    if user_id is not None:
+        query = query.filter(models.Job.owner_id == user_id)
+    return query.first()
+
+def claim_job(db: Session, job_id: uuid.UUID) -> bool:
+    """
+    대기 중인 작업을 실행 상태로 바꿉니다.
+    조건부 UPDATE로 처리하므로 여러 워커가 같은 작업을 동시에 가져가지 않습니다.
+    """
+    updated = db.query(models.Job).filter(
+        models.Job.id == job_id,
+        models.Job.status == "queued"
+    ).update(
+        {models.Job.status: "running", models.Job.updated_at: datetime.now(timezone.utc)},
+        synchronize_session=False
+    )
+    db.commit()
+    return updated == 1
+
+def touch_job(db: Session, job_id: uuid.UUID):
+    """실행 중인 작업의 하트비트(updated_at)를 갱신합니다."""
+    db.query(models.Job).filter(
+        models.Job.id == job_id,
+        models.Job.status == "running"
+    ).update({models.Job.updated_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    db.commit()
+
+def delete_user_jobs(db: Session, user_id: int):
+    """
+    사용자를 삭제하기 전에 그 사용자의 작업 기록을 지웁니다. (외래 키 위반 방지)
+    사용자 삭제와 한 트랜잭션으로 처리되도록 커밋은 호출한 쪽에서 합니다.
+    """
+    return db.query(models.Job).filter(models.Job.owner_id == user_id).delete(synchronize_session=False)
+
+def update_job(db: Session, job_id: uuid.UUID, **fields):
+    """작업의 상태, 단계, 진행률 등을 갱신합니다."""
+    fields["updated_at"] = datetime.now(timezone.utc)
+    db.query(models.Job).filter(models.Job.id == job_id).update(fields, synchronize_session=False)
+    db.commit()
+
+def requeue_stale_running_jobs(db: Session, stale_seconds: int):
+    """
+    stale_seconds 동안 하트비트가 없는 실행 중 작업(처리하던 서버가 종료됨)을 다시 대기 상태로 되돌리고,
+    되돌린 작업의 ID 목록을 반환합니다.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)
+    stale_ids = [job_id for (job_id,) in db.query(models.Job.id).filter(
+        models.Job.status == "running",
+        models.Job.updated_at < cutoff
+    ).all()]
+    if not stale_ids:
+        return []
+    # 조회와 갱신 사이에 하트비트가 갱신된 작업은 되돌리지 않습니다.
+    db.query(models.Job).filter(
+        models.Job.id.in_(stale_ids),
+        models.Job.status == "running",
+        models.Job.updated_at < cutoff
+    ).update(
+        {models.Job.status: "queued", models.Job.updated_at: datetime.now(timezone.utc)},
+        synchronize_session=False
+    )
+    db.commit()
+    return [job_id for (job_id,) in db.query(models.Job.id).filter(
+        models.Job.id.in_(stale_ids),
+        models.Job.status == "queued"
+    ).all()]
+
+def requeue_stale_jobs(db: Session, stale_seconds: int):
+    """
+    서버 재시작 등으로 중단된 작업을 다시 대기 상태로 되돌리고,
+    대기 중인 모든 작업을 생성 순서대로 반환합니다.
+    """
+    requeue_stale_running_jobs(db, stale_seconds)
+    return db.query(models.Job).filter(
+        models.Job.status == "queued"
+    ).order_by(models.Job.created_at.asc()).all()
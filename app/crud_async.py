@@ -0,0 +1,133 @@
+# /TINO-TE.ai-BETA-backend/app/crud_async.py
+
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, models, schemas
+
+# --- 코드 설명 ---
+# 이 파일은 crud.py의 함수들을 AsyncSession에서 실행하는 비동기 버전입니다.
+# 쿼리는 crud.py에 한 번만 작성하고, 여기서는 AsyncSession.run_sync로 실행합니다.
+# run_sync 안의 DB 입출력은 비동기 드라이버(asyncpg)를 통해 이루어지므로 이벤트 루프를 막지 않습니다.
+# 주의: AsyncSession에서 불러온 객체는 지연 로딩(본문, 관계)을 사용할 수 없으므로
+# 필요한 값은 with_body=True, load_note_body 등으로 미리 불러와야 합니다.
+
+
+# --- 사용자 ---
+async def get_user_by_student_id(db: AsyncSession, student_id: str):
+    return await db.run_sync(crud.get_user_by_student_id, student_id=student_id)
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
+    return await db.run_sync(crud.create_user, user=user)
+
+async def get_user_by_api_key(db: AsyncSession, api_key: str):
+    return await db.run_sync(crud.get_user_by_api_key, api_key=api_key)
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: Optional[int] = 100, with_note_summaries: bool = False):
+    return await db.run_sync(crud.get_users, skip=skip, limit=limit, with_note_summaries=with_note_summaries)
+
+async def get_user_with_note_summaries(db: AsyncSession, user_id: int):
+    return await db.run_sync(crud.get_user_with_note_summaries, user_id=user_id)
+
+async def count_notes_by_owner(db: AsyncSession, user_ids: List[int]) -> Dict[int, int]:
+    return await db.run_sync(crud.count_notes_by_owner, user_ids)
+
+# --- 크레딧 ---
+async def deduct_credits(db: AsyncSession, user_id: int, amount: int = 1):
+    return await db.run_sync(crud.deduct_credits, user_id=user_id, amount=amount)
+
+async def reserve_credits(db: AsyncSession, user_id: int, amount: int):
+    return await db.run_sync(crud.reserve_credits, user_id=user_id, amount=amount)
+
+async def refund_credits(db: AsyncSession, user_id: int, amount: int):
+    return await db.run_sync(crud.refund_credits, user_id=user_id, amount=amount)
+
+async def reset_all_user_credits(db: AsyncSession, credits: int = 10):
+    return await db.run_sync(crud.reset_all_user_credits, credits=credits)
+
+# --- 노트 ---
+async def create_note_for_user(db: AsyncSession, note: schemas.Note, user_id: int):
+    db_note = await db.run_sync(crud.create_note_for_user, note=note, user_id=user_id)
+    # refresh는 본문(지연 로딩 컬럼)을 다시 읽지 않으므로 저장 직후 함께 불러옵니다.
+    return await load_note_body(db, db_note)
+
+async def get_notes_by_user(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+    return await db.run_sync(crud.get_notes_by_user, user_id=user_id, skip=skip, limit=limit)
+
+async def get_note_summaries(db: AsyncSession, user_id: int, limit: int = 50, cursor: str = None):
+    return await db.run_sync(crud.get_note_summaries, user_id=user_id, limit=limit, cursor=cursor)
+
+async def get_note_ids_for_export(
+    db: AsyncSession,
+    user_id: int,
+    note_ids: Optional[List[uuid.UUID]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> List[uuid.UUID]:
+    return await db.run_sync(
+        crud.get_note_ids_for_export,
+        user_id=user_id,
+        note_ids=note_ids,
+        created_from=created_from,
+        created_to=created_to,
+        limit=limit,
+    )
+
+async def get_note(db: AsyncSession, note_id: uuid.UUID, user_id: int, with_body: bool = False):
+    return await db.run_sync(crud.get_note, note_id=note_id, user_id=user_id, with_body=with_body)
+
+async def load_note_body(db: AsyncSession, note: models.Note) -> models.Note:
+    """get_note(with_body=False)로 불러온 노트의 원문/요약을 불러옵니다."""
+    await db.refresh(note, attribute_names=["original_transcription", "summary"])
+    return note
+
+async def delete_note(db: AsyncSession, note_id: uuid.UUID, user_id: int):
+    return await db.run_sync(crud.delete_note, note_id=note_id, user_id=user_id)
+
+# --- 전사/요약 결과 캐시 ---
+async def get_cache_entry(db: AsyncSession, key: str, ttl_seconds: int):
+    return await db.run_sync(crud.get_cache_entry, key=key, ttl_seconds=ttl_seconds)
+
+async def upsert_cache_entry(db: AsyncSession, key: str, kind: str, payload: str):
+    return await db.run_sync(crud.upsert_cache_entry, key=key, kind=kind, payload=payload)
+
+async def prune_cache_entries(db: AsyncSession, ttl_seconds: int, max_entries: int) -> int:
+    return await db.run_sync(crud.prune_cache_entries, ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+# --- 노트 생성 백그라운드 작업 ---
+async def create_job(db: AsyncSession, job_id: uuid.UUID, user_id: int, kind: str, filename: str, content_type: str, input_path: str, credits_reserved: int = 0):
+    return await db.run_sync(
+        crud.create_job,
+        job_id=job_id,
+        user_id=user_id,
+        kind=kind,
+        filename=filename,
+        content_type=content_type,
+        input_path=input_path,
+        credits_reserved=credits_reserved,
+    )
+
+async def get_job(db: AsyncSession, job_id: uuid.UUID, user_id: int = None):
+    return await db.run_sync(crud.get_job, job_id=job_id, user_id=user_id)
+
+async def claim_job(db: AsyncSession, job_id: uuid.UUID) -> bool:
+    return await db.run_sync(crud.claim_job, job_id=job_id)
+
+async def update_job(db: AsyncSession, job_id: uuid.UUID, **fields):
+    return await db.run_sync(crud.update_job, job_id, **fields)
+
+async def delete_user_jobs(db: AsyncSession, user_id: int):
+    return await db.run_sync(crud.delete_user_jobs, user_id=user_id)
+
+async def touch_job(db: AsyncSession, job_id: uuid.UUID):
+    return await db.run_sync(crud.touch_job, job_id=job_id)
+
+async def requeue_stale_running_jobs(db: AsyncSession, stale_seconds: int):
+    return await db.run_sync(crud.requeue_stale_running_jobs, stale_seconds=stale_seconds)
+
+async def requeue_stale_jobs(db: AsyncSession, stale_seconds: int):
+    return await db.run_sync(crud.requeue_stale_jobs, stale_seconds=stale_seconds)
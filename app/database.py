@@ -1,13 +1,22 @@
 # /TINO-TE.ai-BETA-backend/app/database.py
 
 import os
-from sqlalchemy import create_engine
+from typing import Any, AsyncIterator, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from pydantic_settings import BaseSettings
 
+from app.config import settings
+from app.db_metrics import PoolMetrics, instrumented_pool_class
+
 # --- 코드 설명 ---
 # 이 파일은 데이터베이스 연결을 설정하고 관리하는 역할을 합니다.
+# API 서버는 비동기 엔진(asyncpg)과 AsyncSession을 사용하므로 느린 쿼리가 이벤트 루프를 막지 않습니다.
+# 동기 엔진과 SessionLocal은 seed.py 같은 스크립트를 위한 호환용으로 남겨 둡니다.
 
 # 환경 변수에서 데이터베이스 URL을 가져오거나 기본값 사용
 # Railway/Supabase 환경에서 DATABASE_URL을 가져옵니다
@@ -22,7 +31,48 @@ SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
 # 2. 데이터베이스 엔진 생성
 # create_engine은 데이터베이스와 통신하는 핵심 인터페이스입니다.
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# PostgreSQL에는 연결 풀 크기, 재사용 주기, pre-ping, 연결/쿼리 시간 제한을 설정값대로 적용합니다.
+# (Supabase 풀러는 유휴 연결을 끊기 때문에 pre-ping과 recycle이 없으면 끊어진 연결을 사용하게 됩니다.)
+def _is_postgresql(url: str) -> bool:
+    return make_url(url.replace("postgres://", "postgresql://", 1)).get_backend_name() == "postgresql"
+
+def engine_options(url: str, async_driver: bool = False) -> Dict[str, Any]:
+    """create_engine/create_async_engine에 넘길 연결 풀 설정을 만듭니다."""
+    if not _is_postgresql(url):
+        return {}
+    if async_driver:
+        connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT}
+        if settings.DB_DISABLE_STATEMENT_CACHE:
+            # 트랜잭션 풀러는 트랜잭션마다 다른 서버 연결을 배정하므로, 연결에 남는 prepared statement를 쓰지 않습니다.
+            connect_args["statement_cache_size"] = 0
+    else:
+        connect_args = {"connect_timeout": max(1, int(settings.DB_CONNECT_TIMEOUT))}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+def _set_statement_timeout(connection) -> None:
+    """트랜잭션을 시작할 때마다 그 트랜잭션에만 적용되는 쿼리 시간 제한(statement_timeout)을 설정합니다."""
+    # 트랜잭션 풀러 뒤의 서버 연결은 여러 클라이언트가 나눠 쓰므로, 세션 단위 SET은 다른 연결에 남거나 사라질 수 있습니다.
+    # SET LOCAL은 현재 트랜잭션이 끝나면 자동으로 풀립니다.
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+def configure_engine_events(sync_engine, url: str, metrics: PoolMetrics = None) -> None:
+    """트랜잭션마다 statement_timeout을 적용하고, metrics가 있으면 연결 생성/폐기를 기록합니다."""
+    if _is_postgresql(url) and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        event.listen(sync_engine, "begin", _set_statement_timeout)
+    if metrics is not None:
+        event.listen(sync_engine, "connect", lambda *args: metrics.record_connect())
+        event.listen(sync_engine, "invalidate", lambda *args: metrics.record_invalidate())
+        event.listen(sync_engine, "soft_invalidate", lambda *args: metrics.record_invalidate())
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+configure_engine_events(engine, SQLALCHEMY_DATABASE_URL)
 
 # 3. 데이터베이스 세션 생성
 # SessionLocal은 데이터베이스와 대화하기 위한 '세션'을 만드는 공장입니다.
@@ -30,7 +80,47 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL)
 # 세션을 하나씩 만들어서 사용하게 됩니다.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# 4. 데이터베이스 모델의 기본 클래스 생성
+# 4. 비동기 데이터베이스 엔진과 세션 생성
+# 같은 DATABASE_URL을 비동기 드라이버용 주소로 바꿔 사용합니다.
+def to_async_database_url(url: str) -> str:
+    """postgresql:// 주소를 asyncpg, sqlite:// 주소를 aiosqlite 드라이버 주소로 바꿉니다."""
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1))
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        # asyncpg는 sslmode 대신 ssl 파라미터를 사용합니다.
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        if settings.DB_DISABLE_STATEMENT_CACHE:
+            # SQLAlchemy asyncpg 방언이 따로 두는 prepared statement 캐시도 끕니다.
+            query["prepared_statement_cache_size"] = "0"
+        parsed = parsed.set(query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+# API 서버가 사용하는 비동기 엔진의 연결 풀 통계 (관리자 API에서 조회)
+pool_metrics = PoolMetrics()
+
+_async_engine_options = engine_options(SQLALCHEMY_DATABASE_URL, async_driver=True)
+if _async_engine_options:
+    _async_engine_options["poolclass"] = instrumented_pool_class(AsyncAdaptedQueuePool, pool_metrics)
+
+async_engine = create_async_engine(to_async_database_url(SQLALCHEMY_DATABASE_URL), **_async_engine_options)
+configure_engine_events(async_engine.sync_engine, SQLALCHEMY_DATABASE_URL, pool_metrics)
+
+def pool_stats() -> Dict[str, Any]:
+    """비동기 엔진 연결 풀의 현재 상태와 누적 통계를 반환합니다."""
+    return pool_metrics.stats(async_engine.sync_engine.pool)
+
+# AsyncSession은 커밋 후 속성을 다시 읽으려고 하면 지연 로딩 오류가 나므로
+# expire_on_commit=False로 커밋 후에도 객체의 값을 그대로 사용합니다.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# 5. 데이터베이스 모델의 기본 클래스 생성
 # Base는 앞으로 우리가 만들 모든 데이터베이스 모델(테이블)들이
 # 상속받아야 할 기본 클래스입니다. 이 클래스를 상속받는 모든 클래스는
 # SQLAlchemy에 의해 자동으로 테이블과 매핑됩니다.
@@ -39,6 +129,11 @@ Base = declarative_base()
 # --- [추가] 데이터베이스 세션 의존성 함수 ---
 # API가 호출될 때마다 독립적인 데이터베이스 세션을 생성하고,
 # API 처리가 끝나면 세션을 자동으로 닫아주는 역할을 합니다.
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# 동기 세션 의존성 (호환용)
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,128 @@
+# /TINO-TE.ai-BETA-backend/app/db_metrics.py
+
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool
+
+# --- 코드 설명 ---
+# 이 파일은 데이터베이스 연결 풀의 사용량을 기록합니다.
+# 연결을 빌려 가는 데 걸린 시간(대기 + 새 연결 생성 + pre-ping), 오래 걸린 횟수, 시간 초과 횟수,
+# 동시에 사용 중인 연결 수와 연결을 기다리는 요청 수의 최댓값을 모아 관리자 API로 보여 줍니다.
+# 풀의 연결(DB_POOL_SIZE + DB_MAX_OVERFLOW)이 모두 사용 중일 때 들어온 요청만 '기다리는 요청'으로 셉니다.
+# 실제 동시 요청량(peak_checked_out + peak_waiting)에 맞춰 DB_POOL_SIZE/DB_MAX_OVERFLOW를 정할 때 사용합니다.
+
+# 연결을 빌리는 데 이 시간(초) 이상 걸리면 오래 기다린 것으로 셉니다.
+SLOW_CHECKOUT_SECONDS = 0.05
+
+
+class PoolMetrics:
+    """연결 풀 사용량 통계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0  # 연결을 빌려 간 횟수
+        self.slow_checkouts = 0  # SLOW_CHECKOUT_SECONDS 이상 걸린 횟수
+        self.timeouts = 0  # DB_POOL_TIMEOUT 안에 연결을 얻지 못한 횟수
+        self.connects = 0  # 새로 만든 DB 연결 수
+        self.invalidations = 0  # 끊어진 것으로 판단되어 버린 연결 수 (pre-ping 실패 등)
+        self.peak_checked_out = 0  # 동시에 사용 중이던 연결 수의 최댓값
+        self.queued_checkouts = 0  # 남는 연결이 없어 대기열에서 기다려야 했던 횟수
+        self.waiting = 0  # 지금 연결을 기다리는 요청 수
+        self.peak_waiting = 0  # 동시에 연결을 기다리던 요청 수의 최댓값
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def begin_wait(self) -> None:
+        with self._lock:
+            self.queued_checkouts += 1
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def end_wait(self) -> None:
+        with self._lock:
+            self.waiting -= 1
+
+    def record_checkout(self, wait_seconds: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if wait_seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+            self._wait_total += wait_seconds
+            self._wait_max = max(self._wait_max, wait_seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self._wait_max = max(self._wait_max, wait_seconds)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self, pool: Pool) -> Dict[str, Any]:
+        """현재 풀 상태와 누적 통계를 반환합니다."""
+        with self._lock:
+            result: Dict[str, Any] = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "peak_checked_out": self.peak_checked_out,
+                "queued_checkouts": self.queued_checkouts,
+                "waiting": self.waiting,
+                "peak_waiting": self.peak_waiting,
+                "avg_checkout_ms": round(self._wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "max_checkout_ms": round(self._wait_max * 1000, 2),
+            }
+        if isinstance(pool, QueuePool):
+            result.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "timeout_seconds": pool.timeout(),
+            })
+        return result
+
+
+def instrumented_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """
+    연결을 빌려 갈 때마다 metrics에 기록하는 QueuePool 하위 클래스를 만듭니다.
+    engine.dispose()로 풀이 다시 만들어져도 같은 클래스가 사용되므로 통계가 이어집니다.
+    """
+
+    class InstrumentedPool(base):
+        def _exhausted(self) -> bool:
+            # max_overflow가 -1이면 연결을 무제한으로 만들 수 있으므로 기다리지 않습니다.
+            return self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+
+        def connect(self):
+            started = time.perf_counter()
+            # 빌려 가는 모든 요청이 아니라, 들어온 시점에 남는 연결이 없어 대기열에 서는 요청만 셉니다.
+            queued = self._exhausted()
+            if queued:
+                metrics.begin_wait()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                metrics.record_timeout(time.perf_counter() - started)
+                raise
+            finally:
+                if queued:
+                    metrics.end_wait()
+            metrics.record_checkout(time.perf_counter() - started, self.checkedout())
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
@@ -0,0 +1,175 @@
+# /TINO-TE.ai-BETA-backend/app/export.py
+
+import asyncio
+import re
+import time
+import uuid
+import zipfile
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Tuple
+
+from app import crud_async
+from app.database import AsyncSessionLocal
+from app.logging_config import logger
+from app.pdf_cache import get_note_pdf
+from app.pdf_service import note_to_pdf_data
+from app.workers import PoolSaturatedError, pdf_pool
+
+# --- 코드 설명 ---
+# 이 파일은 여러 노트를 PDF/마크다운 파일로 묶은 ZIP을 스트리밍으로 만들어 전달합니다.
+# ZIP 파일 전체를 메모리에 만들지 않고, 노트 하나를 쓸 때마다 만들어진 바이트를 바로 전송하므로
+# 노트 수와 관계없이 메모리 사용량이 일정합니다.
+# 다음 몇 개 노트의 PDF는 미리 PDF 렌더링 프로세스 풀에 맡겨 두어 전송과 렌더링이 겹쳐 진행됩니다.
+
+EXPORT_FORMATS = ("pdf", "markdown")
+
+# 이 크기 이상 쌓이면 클라이언트로 전송합니다.
+FLUSH_BYTES = 256 * 1024
+FILE_CHUNK_SIZE = 64 * 1024
+
+# 렌더링 풀이 가득 찼을 때 다시 시도하기 전에 기다리는 시간(초)
+SATURATED_RETRY_DELAY = 0.5
+# 렌더링 풀이 이 시간(초) 동안 계속 가득 차 있으면 기다리지 않고 내보내기를 실패시킵니다.
+SATURATED_MAX_WAIT = 60.0
+
+
+class _ZipStreamBuffer:
+    """
+    zipfile이 쓰는 바이트를 모아 두었다가 꺼내 갈 수 있게 하는 쓰기 전용 버퍼.
+    seek/tell을 지원하지 않으므로 zipfile은 스트리밍 모드(data descriptor)로 기록합니다.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        self.size = 0
+        return data
+
+
+def _safe_filename(title: Optional[str]) -> str:
+    name = re.sub(r'[\\/:*?"<>|\r\n\t]+', "_", (title or "").strip()).strip(". ")
+    return name[:80] or "note"
+
+
+def note_to_markdown(note_data: Dict[str, Any]) -> str:
+    """노트를 마크다운 문서 하나로 만듭니다."""
+    return (
+        f"# {note_data.get('title') or '제목 없음'}\n\n"
+        f"- 생성일: {note_data.get('created_at') or ''}\n"
+        f"- 타입: {note_data.get('note_type') or ''}\n\n"
+        f"## 요약\n\n{note_data.get('summary') or ''}\n\n"
+        f"## 원본 내용\n\n{note_data.get('original_transcription') or ''}\n"
+    )
+
+
+async def _load_note_data(user_id: int, note_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+    # 여러 노트를 동시에 준비하므로 호출마다 별도 세션을 사용합니다.
+    async with AsyncSessionLocal() as db:
+        note = await crud_async.get_note(db, note_id=note_id, user_id=user_id, with_body=True)
+        return note_to_pdf_data(note) if note else None
+
+
+async def _render_pdf(note_id: uuid.UUID, note_data: Dict[str, Any]) -> Any:
+    # 내보내기는 오래 걸리는 일괄 작업이므로, 렌더링 풀이 가득 차 있으면 거절하지 않고
+    # SATURATED_MAX_WAIT초까지 기다립니다.
+    deadline = time.monotonic() + SATURATED_MAX_WAIT
+    while True:
+        try:
+            return await get_note_pdf(note_id, note_data)
+        except PoolSaturatedError:
+            if time.monotonic() >= deadline:
+                raise
+            await asyncio.sleep(SATURATED_RETRY_DELAY)
+
+
+async def _prepare(user_id: int, note_id: uuid.UUID, formats: List[str]) -> Optional[Tuple[Dict[str, Any], Any]]:
+    note_data = await _load_note_data(user_id, note_id)
+    if note_data is None:
+        return None
+    pdf = await _render_pdf(note_id, note_data) if "pdf" in formats else None
+    return note_data, pdf
+
+
+def _close_prepared(task: asyncio.Task) -> None:
+    """전송하지 못하고 끝난 노트의 열린 PDF 캐시 파일을 닫습니다. (작업의 done 콜백)"""
+    if not task.cancelled() and task.exception() is None and task.result() is not None:
+        pdf = task.result()[1]
+        if pdf is not None and not isinstance(pdf, bytes):
+            pdf.close()
+
+
+async def stream_notes_zip(
+    user_id: int, note_ids: List[uuid.UUID], formats: List[str]
+) -> AsyncGenerator[bytes, None]:
+    """노트들을 ZIP으로 묶으면서 만들어진 바이트를 차례로 전달합니다."""
+    buffer = _ZipStreamBuffer()
+    window = max(1, pdf_pool.max_workers)
+    remaining = iter(note_ids)
+    pending: Deque[asyncio.Task] = deque()
+
+    def fill() -> None:
+        while len(pending) < window:
+            note_id = next(remaining, None)
+            if note_id is None:
+                return
+            pending.append(asyncio.create_task(_prepare(user_id, note_id, formats)))
+
+    try:
+        with zipfile.ZipFile(buffer, "w") as archive:
+            fill()
+            index = 0
+            while pending:
+                prepared = await pending.popleft()
+                fill()
+                if prepared is None:
+                    continue
+                note_data, pdf = prepared
+                index += 1
+                base_name = f"{index:03d}_{_safe_filename(note_data.get('title'))}"
+
+                if "markdown" in formats:
+                    archive.writestr(
+                        f"{base_name}.md",
+                        note_to_markdown(note_data),
+                        compress_type=zipfile.ZIP_DEFLATED,
+                    )
+
+                if pdf is not None:
+                    # PDF는 이미 압축되어 있으므로 다시 압축하지 않습니다.
+                    info = zipfile.ZipInfo(f"{base_name}.pdf", date_time=time.localtime()[:6])
+                    with archive.open(info, "w") as entry:
+                        if isinstance(pdf, bytes):
+                            entry.write(pdf)
+                        else:
+                            with pdf as pdf_file:
+                                while chunk := pdf_file.read(FILE_CHUNK_SIZE):
+                                    entry.write(chunk)
+                                    if buffer.size >= FLUSH_BYTES:
+                                        yield buffer.drain()
+
+                if buffer.size >= FLUSH_BYTES:
+                    yield buffer.drain()
+
+        # 중앙 디렉터리(ZIP 끝부분)
+        yield buffer.drain()
+    except Exception as e:
+        logger.error(f"노트 내보내기 실패 (user_id={user_id}): {e}")
+        raise
+    finally:
+        for task in pending:
+            # cancel() 직후에는 작업이 아직 끝나지 않았으므로, 끝난 뒤에 결과의 파일을 닫습니다.
+            # (취소되기 전에 이미 PDF를 연 경우에도 닫힘)
+            task.cancel()
+            task.add_done_callback(_close_prepared)
@@ -0,0 +1,131 @@
+# /TINO-TE.ai-BETA-backend/app/http_client.py
+
+import asyncio
+import importlib.util
+from typing import Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.logging_config import logger
+
+# --- 코드 설명 ---
+# 이 파일은 외부 AI API(OpenAI, DeepSeek) 호출에 사용하는 HTTP 클라이언트를
+# 프로세스 전체에서 하나만 만들어 공유하도록 관리합니다.
+# 요청마다 httpx.AsyncClient()를 새로 만들면 매번 TCP+TLS 핸드셰이크를 다시 하고
+# keep-alive 연결을 버리게 되므로, FastAPI 시작 시 한 번 만들고 종료 시 닫습니다.
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """응답 본문을 다 읽거나 닫을 때 호스트 슬롯을 반납하는 스트림 래퍼"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class _PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    호스트별 동시 연결 수를 제한하는 트랜스포트.
+    httpx.Limits는 전체 연결 수만 제한하므로, 한 호스트(예: Whisper)가
+    풀 전체를 점유하지 않도록 호스트마다 세마포어를 둡니다.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self._max_per_host)
+
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, semaphore.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HTTPClientManager:
+    """공유 httpx.AsyncClient의 생성과 종료를 관리하는 클래스"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @staticmethod
+    def _http2_available() -> bool:
+        # HTTP/2는 h2 패키지가 있어야 동작하므로 설치된 경우에만 켭니다.
+        return settings.HTTP_ENABLE_HTTP2 and importlib.util.find_spec("h2") is not None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = self._http2_available()
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        transport = _PerHostLimitTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+            max_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        )
+        logger.info(
+            f"공유 HTTP 클라이언트 생성 (max_connections={settings.HTTP_MAX_CONNECTIONS}, "
+            f"per_host={settings.HTTP_MAX_CONNECTIONS_PER_HOST}, http2={http2})"
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(180, connect=settings.HTTP_CONNECT_TIMEOUT),
+        )
+
+    async def start(self) -> None:
+        """애플리케이션 시작 시 호출되어 클라이언트를 미리 만들어 둡니다."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def close(self) -> None:
+        """애플리케이션 종료 시 호출되어 열린 연결을 모두 정리합니다."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("공유 HTTP 클라이언트를 종료했습니다.")
+        self._client = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        공유 클라이언트를 반환합니다.
+        startup 훅이 실행되지 않은 환경(스크립트 등)에서는 처음 호출될 때 생성합니다.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+
+# 프로세스 전체에서 공유하는 클라이언트 관리자 인스턴스
+http_client_manager = HTTPClientManager()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """서비스 모듈에서 사용하는 공유 HTTP 클라이언트를 반환합니다."""
+    return http_client_manager.get_client()
@@ -0,0 +1,304 @@
+# /TINO-TE.ai-BETA-backend/app/ingestion.py
+
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartParser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import media_probe
+from app.config import settings
+
+# --- 코드 설명 ---
+# 이 파일은 업로드 파일을 한 번만 읽으면서 크기 제한 확인, SHA-256 해시 계산,
+# 실제 파일 형식 확인(파일 앞부분의 시그니처)을 함께 처리합니다.
+# 요청 본문의 크기는 UploadSizeLimitMiddleware가 받는 도중에 확인하므로, 한도를 넘는 업로드는 끝까지 저장되지 않습니다.
+# 업로드 내용은 Starlette가 받으면서 만든 SpooledTemporaryFile(INGEST_MEMORY_THRESHOLD_BYTES를 넘으면 디스크)을
+# 복사하지 않고 그대로 넘겨받아 사용하므로, 큰 동영상을 여러 개 동시에 받아도 메모리 사용량이 일정합니다.
+# 이후 단계(캐시, Whisper 전송, 문서 추출)는 바이트 대신 이 파일 핸들을 받아 디스크에서 바로 읽습니다.
+# 미디어 파일은 이 단계에서 헤더만 읽어 재생 길이도 구해 둡니다. (media_probe.py)
+
+INGEST_CHUNK_SIZE = 1024 * 1024  # 한 번에 읽을 크기 (1MB)
+SNIFF_BYTES = 64  # 파일 형식 확인에 사용할 앞부분 크기
+# multipart 본문에는 파일 외에 경계 문자열과 파트 헤더가 들어가므로 요청 크기 한도에 여유를 둡니다.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Starlette가 업로드 파일을 메모리에 두는 최대 크기 (넘으면 디스크 임시 파일로 옮김)
+MultiPartParser.max_file_size = settings.INGEST_MEMORY_THRESHOLD_BYTES
+
+MAX_BYTES = {
+    "media": settings.INGEST_MAX_MEDIA_BYTES,
+    "document": settings.INGEST_MAX_DOCUMENT_BYTES,
+}
+
+# 문서 확장자별로 허용하는 실제 형식 (None은 시그니처가 없는 일반 텍스트)
+DOCUMENT_SIGNATURES = {
+    ".pdf": ("application/pdf",),
+    ".docx": ("application/zip",),
+    ".doc": ("application/msword", "application/zip"),
+    ".txt": (None, "text/plain"),
+}
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """파일 앞부분의 시그니처로 실제 형식을 추정합니다. 알 수 없으면 None을 반환합니다."""
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"  # DOCX 등 Office Open XML 문서
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "application/msword"
+    if head.startswith((b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")):
+        return "text/plain"  # BOM이 있는 텍스트
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"M4A ", b"M4B "):
+            return "audio/mp4"
+        if brand == b"qt  ":
+            return "video/quicktime"
+        return "video/mp4"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"  # WebM/Matroska
+    if head.startswith(b"ID3"):
+        return "audio/mpeg"
+    if head.startswith(b"OggS"):
+        return "audio/ogg"
+    if head.startswith(b"fLaC"):
+        return "audio/flac"
+    if head.startswith(b"#!AMR"):
+        return "audio/amr"
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xF6 == 0xF0:
+        return "audio/aac"  # ADTS 프레임
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        return "audio/mpeg"  # ID3 태그 없는 MPEG 오디오 프레임
+    return None
+
+
+class IngestedUpload:
+    """크기 확인, 해시 계산, 형식 확인이 끝난 업로드 파일"""
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        filename: str,
+        content_type: str,
+        size: int,
+        sha256: str,
+        kind: str,
+        path: Optional[str] = None,
+        duration_seconds: Optional[float] = None,
+    ):
+        self.file = file
+        self.filename = filename
+        self.content_type = content_type  # 시그니처로 확인한 형식 (알 수 없으면 업로드 시 선언된 형식)
+        self.size = size
+        self.sha256 = sha256
+        self.kind = kind
+        self.path = path  # 디스크에 이름이 있는 파일이면 그 경로
+        self.duration_seconds = duration_seconds  # 헤더로 확인한 미디어 재생 길이(초), 알 수 없으면 None
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.filename or "")[1].lower()
+
+    def rewind(self) -> BinaryIO:
+        """처음 위치로 되돌린 파일 핸들을 반환합니다."""
+        self.file.seek(0)
+        return self.file
+
+    def read_all(self) -> bytes:
+        """파일 전체를 읽습니다. 크기 제한 안의 작은 텍스트 문서에만 사용합니다."""
+        return self.rewind().read()
+
+    async def save_to(self, path: str) -> None:
+        """파일 내용을 path에 저장합니다."""
+        def copy() -> None:
+            with open(path, "wb") as output:
+                shutil.copyfileobj(self.rewind(), output, INGEST_CHUNK_SIZE)
+
+        await run_in_threadpool(copy)
+
+    @asynccontextmanager
+    async def as_path(self) -> AsyncIterator[str]:
+        """
+        ffmpeg나 다른 프로세스처럼 경로가 필요한 곳에 넘길 파일 경로를 제공합니다.
+        이미 디스크에 이름이 있는 파일이면 그대로 사용하고, 아니면 임시 파일로 한 번 복사합니다.
+        """
+        if self.path is not None:
+            yield self.path
+            return
+
+        temp_file = tempfile.NamedTemporaryFile(suffix=self.extension, dir=spool_dir())
+        try:
+            await run_in_threadpool(shutil.copyfileobj, self.rewind(), temp_file, INGEST_CHUNK_SIZE)
+            temp_file.flush()
+            yield temp_file.name
+        finally:
+            temp_file.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "IngestedUpload":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def spool_dir() -> Optional[str]:
+    """업로드/변환 임시 파일을 저장할 폴더를 반환합니다. (없으면 만듭니다)"""
+    if not settings.INGEST_SPOOL_DIR:
+        return None
+    os.makedirs(settings.INGEST_SPOOL_DIR, exist_ok=True)
+    return settings.INGEST_SPOOL_DIR
+
+
+def _format_size(size: int) -> str:
+    """1MB 미만의 한도도 0MB로 표시되지 않도록 MB 또는 KB 단위로 표시합니다."""
+    if size >= 1024 * 1024:
+        return f"{round(size / (1024 * 1024), 1):g}MB"
+    return f"{round(size / 1024, 1):g}KB"
+
+
+def _too_large(kind: str, limit: int) -> HTTPException:
+    label = "미디어" if kind == "media" else "문서"
+    return HTTPException(
+        status_code=413,
+        detail=f"{label} 파일 크기가 너무 큽니다. {_format_size(limit)} 이하의 파일을 업로드해주세요."
+    )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    요청 본문이 업로드 한도를 넘으면 끝까지 받지 않고 413으로 거절하는 ASGI 미들웨어입니다.
+    Content-Length가 한도를 넘으면 본문을 읽기 전에 거절하고, 길이를 알 수 없는(chunked) 요청은
+    받는 도중 한도를 넘는 순간 거절합니다. route_kinds에 없는 경로에는 default_kind의 한도를 적용합니다.
+    """
+
+    def __init__(self, app: ASGIApp, route_kinds: Optional[Dict[str, str]] = None, default_kind: str = "media"):
+        self.app = app
+        self.route_kinds = route_kinds or {}
+        self.default_kind = default_kind
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        kind = self.route_kinds.get(scope["path"], self.default_kind)
+        limit = MAX_BYTES[kind] + MULTIPART_OVERHEAD_BYTES
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": _too_large(kind, MAX_BYTES[kind]).detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _too_large(kind, MAX_BYTES[kind])
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def _scan(source: BinaryIO, kind: str) -> tuple:
+    """
+    source를 처음부터 한 번 읽으면서 크기 제한을 확인하고, 해시를 계산하고, 앞부분을 모읍니다. (스레드 풀에서 실행)
+    """
+    limit = MAX_BYTES[kind]
+    digest = hashlib.sha256()
+    head = b""
+    size = 0
+    source.seek(0)
+    while chunk := source.read(INGEST_CHUNK_SIZE):
+        size += len(chunk)
+        # 제한을 넘는 순간 더 읽지 않고 거절합니다.
+        if size > limit:
+            raise _too_large(kind, limit)
+        if len(head) < SNIFF_BYTES:
+            head += chunk[:SNIFF_BYTES - len(head)]
+        digest.update(chunk)
+    return size, digest.hexdigest(), head
+
+
+def _check_signature(kind: str, filename: str, declared: str, sniffed: Optional[str]) -> str:
+    """선언된 형식과 실제 내용이 맞는지 확인하고, 이후 단계에서 사용할 형식을 반환합니다."""
+    if kind == "media":
+        if sniffed is not None and not sniffed.startswith(("audio/", "video/")):
+            raise HTTPException(
+                status_code=400,
+                detail="파일 내용이 오디오 또는 비디오 형식이 아닙니다."
+            )
+        return sniffed or declared
+
+    extension = os.path.splitext(filename or "")[1].lower()
+    allowed = DOCUMENT_SIGNATURES.get(extension)
+    if allowed is not None and sniffed not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"파일 내용이 확장자({extension})와 일치하지 않습니다."
+        )
+    return sniffed or declared
+
+
+def _probe(source: BinaryIO, kind: str, content_type: str, size: int) -> Optional[float]:
+    """미디어 파일이면 헤더만 읽어 재생 길이를 구합니다. (스레드 풀에서 실행)"""
+    if kind != "media":
+        return None
+    return media_probe.probe_duration(source, content_type, size)
+
+
+async def ingest_upload(file: UploadFile, kind: str) -> IngestedUpload:
+    """
+    업로드 파일을 한 번 읽어 크기 제한 확인, 해시 계산, 형식 확인을 합니다.
+    kind는 "media" 또는 "document"입니다. 크기 제한을 넘으면 413, 내용이 형식과 다르면 400 오류를 발생시킵니다.
+    Starlette가 받아 둔 임시 파일을 복사하지 않고 넘겨받으므로, 반환된 객체를 닫을 때 그 파일도 닫힙니다.
+    """
+    # 요청이 끝날 때 FastAPI가 UploadFile을 닫아도 스트림이나 작업에서 계속 쓸 수 있도록 파일 핸들을 넘겨받습니다.
+    spool = file.file
+    file.file = tempfile.SpooledTemporaryFile()
+    try:
+        size, sha256, head = await run_in_threadpool(_scan, spool, kind)
+        content_type = _check_signature(kind, file.filename, file.content_type or "", sniff_content_type(head))
+        duration = await run_in_threadpool(_probe, spool, kind, content_type, size)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return IngestedUpload(spool, file.filename, content_type, size, sha256, kind, duration_seconds=duration)
+
+
+async def ingest_path(path: str, filename: str, content_type: str, kind: str) -> IngestedUpload:
+    """
+    이미 디스크에 저장된 파일(백그라운드 작업 입력)을 복사 없이 같은 방식으로 확인합니다.
+    반환된 객체를 닫아도 파일 자체는 삭제되지 않습니다.
+    """
+    source = open(path, "rb")
+    try:
+        size, sha256, head = await run_in_threadpool(_scan, source, kind)
+        content_type = _check_signature(kind, filename, content_type or "", sniff_content_type(head))
+        duration = await run_in_threadpool(_probe, source, kind, content_type, size)
+    except BaseException:
+        source.close()
+        raise
+    source.seek(0)
+    return IngestedUpload(source, filename, content_type, size, sha256, kind, path=path, duration_seconds=duration)
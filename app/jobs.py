@@ -0,0 +1,249 @@
+# /TINO-TE.ai-BETA-backend/app/jobs.py
+
+import asyncio
+import json
+import os
+import uuid
+from typing import AsyncGenerator, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async, models, pipeline, schemas
+from app.config import settings
+from app.credits import credit_reservation
+from app.database import AsyncSessionLocal
+from app.ingestion import IngestedUpload, ingest_path
+from app.logging_config import logger
+
+# --- 코드 설명 ---
+# 이 파일은 노트 생성(전사/추출 → 요약 → 저장)을 백그라운드 작업으로 처리합니다.
+# 업로드 요청은 파일을 디스크에 저장하고 작업 ID만 즉시 반환하며,
+# 정해진 수의 asyncio 워커가 DB에 기록된 작업을 하나씩 꺼내 처리합니다.
+# 작업 상태는 DB(jobs 테이블)에 남으므로 서버가 재시작되어도 이어서 처리됩니다.
+# 실행 중인 작업은 주기적으로 하트비트(updated_at)를 남기고, 하트비트가 끊긴 작업(재배포 등으로
+# 처리하던 서버가 종료됨)은 실행 중인 서버의 점검 태스크가 찾아 다시 대기열에 넣습니다.
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# SSE 스트림에서 작업 상태를 확인하는 간격(초)과 연결 유지용 주석 전송 간격(초)
+EVENT_POLL_INTERVAL = 1.0
+EVENT_HEARTBEAT_INTERVAL = 15.0
+
+
+class JobManager:
+    """노트 생성 작업 큐와 워커 풀을 관리하는 클래스"""
+
+    def __init__(self, workers: int, storage_dir: str):
+        self.workers = workers
+        self.storage_dir = storage_dir
+        self._queue: "asyncio.Queue[uuid.UUID]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        """워커를 시작하고, 재시작 전에 끝나지 않은 작업을 다시 대기열에 넣습니다."""
+        os.makedirs(self.storage_dir, exist_ok=True)
+        try:
+            async with AsyncSessionLocal() as db:
+                pending = await crud_async.requeue_stale_jobs(db, stale_seconds=settings.JOB_STALE_SECONDS)
+            for job in pending:
+                self._queue.put_nowait(job.id)
+            if pending:
+                logger.info(f"대기 중인 작업 {len(pending)}개를 다시 대기열에 넣었습니다.")
+        except Exception as e:
+            logger.error(f"대기 작업 복구 실패: {e}")
+
+        for index in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+        logger.info(f"작업 워커 {self.workers}개를 시작했습니다.")
+
+    async def stop(self) -> None:
+        """워커를 중지합니다. 실행 중이던 작업은 다음 시작 시 다시 처리됩니다."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(self, db: AsyncSession, user_id: int, kind: str, upload: IngestedUpload) -> models.Job:
+        """
+        크레딧을 예약하고 업로드 파일을 디스크에 저장한 뒤 새 작업을 대기열에 넣습니다.
+        예약한 크레딧은 작업이 실패하면 환불됩니다.
+        """
+        amount = pipeline.NOTE_CREDITS[kind]
+        async with credit_reservation(db, user_id, amount):
+            return await self._store_and_enqueue(db, user_id, kind, upload, credits_reserved=amount)
+
+    async def _store_and_enqueue(
+        self, db: AsyncSession, user_id: int, kind: str, upload: IngestedUpload, credits_reserved: int
+    ) -> models.Job:
+        job_id = uuid.uuid4()
+        input_path = os.path.join(self.storage_dir, f"{job_id}{upload.extension}")
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        await upload.save_to(input_path)
+
+        return await self.enqueue_file(
+            db, user_id, kind, input_path, upload.filename, upload.content_type,
+            job_id=job_id, credits_reserved=credits_reserved,
+        )
+
+    async def enqueue_file(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        kind: str,
+        input_path: str,
+        filename: str,
+        content_type: str,
+        job_id: Optional[uuid.UUID] = None,
+        credits_reserved: int = 0,
+    ) -> models.Job:
+        """이미 디스크에 있는 파일로 작업을 만들어 대기열에 넣습니다."""
+        job = await crud_async.create_job(
+            db,
+            job_id=job_id or uuid.uuid4(),
+            user_id=user_id,
+            kind=kind,
+            filename=filename,
+            content_type=content_type,
+            input_path=input_path,
+            credits_reserved=credits_reserved,
+        )
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"작업 워커 {index} 오류 ({job_id}): {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _sweeper(self) -> None:
+        """하트비트가 끊긴 실행 중 작업을 주기적으로 찾아 다시 대기열에 넣습니다."""
+        while True:
+            await asyncio.sleep(settings.JOB_SWEEP_INTERVAL_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    stale_ids = await crud_async.requeue_stale_running_jobs(
+                        db, stale_seconds=settings.JOB_STALE_SECONDS
+                    )
+                for job_id in stale_ids:
+                    self._queue.put_nowait(job_id)
+                if stale_ids:
+                    logger.info(f"멈춘 작업 {len(stale_ids)}개를 다시 대기열에 넣었습니다.")
+            except Exception as e:
+                logger.error(f"멈춘 작업 확인 실패: {e}")
+
+    @staticmethod
+    async def _heartbeat(job_id: uuid.UUID) -> None:
+        """작업이 실행되는 동안 updated_at을 갱신합니다. (파이프라인과 세션을 공유하지 않도록 별도 세션 사용)"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await crud_async.touch_job(db, job_id)
+            except Exception as e:
+                logger.warning(f"작업 하트비트 갱신 실패 ({job_id}): {e}")
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            # 다른 워커(또는 다른 프로세스)가 이미 가져간 작업이면 건너뜁니다.
+            if not await crud_async.claim_job(db, job_id):
+                return
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                await self._process(db, job_id)
+            finally:
+                heartbeat.cancel()
+
+    async def _process(self, db: AsyncSession, job_id: uuid.UUID) -> None:
+        """입력 파일로 노트를 만들고 결과를 작업에 기록합니다."""
+        job = await crud_async.get_job(db, job_id)
+        input_path = job.input_path
+        if not input_path or not os.path.exists(input_path):
+            # 다른 서버의 디스크에 저장되었다가 그 서버가 종료된 경우 등
+            await self._fail(db, job, "작업 입력 파일을 찾을 수 없습니다. 파일을 다시 업로드해주세요.")
+            return
+
+        async def progress(stage: str, percent: int) -> None:
+            await crud_async.update_job(db, job_id, stage=stage, progress=percent)
+
+        try:
+            # 디스크에 있는 입력 파일은 복사하지 않고 크기/형식 확인과 해시 계산만 다시 합니다.
+            with await ingest_path(input_path, job.filename, job.content_type, job.kind) as upload:
+                if job.kind == "media":
+                    note = await pipeline.build_note_from_media(db, job.owner_id, upload, progress)
+                else:
+                    note = await pipeline.build_note_from_document(db, job.owner_id, upload, progress)
+        except HTTPException as e:
+            await self._fail(db, job, str(e.detail))
+        except Exception as e:
+            logger.error(f"작업 처리 실패 ({job_id}): {e}")
+            await self._fail(db, job, str(e))
+        else:
+            await crud_async.update_job(
+                db, job_id, status="succeeded", stage="done", progress=100, note_id=note.id
+            )
+        # 성공 또는 실패로 끝난 작업만 입력 파일을 지웁니다.
+        # 서버 종료(stop)로 취소되면 CancelledError가 전파되어 여기까지 오지 않으므로,
+        # 파일이 남아 다시 대기열에 들어간 작업이 그대로 사용합니다.
+        if os.path.exists(input_path):
+            os.unlink(input_path)
+
+    @staticmethod
+    async def _fail(db: AsyncSession, job: models.Job, error: str) -> None:
+        """작업을 실패 처리하고 예약했던 크레딧을 환불합니다."""
+        # rollback은 객체를 만료시키므로(AsyncSession에서는 다시 읽을 수 없음) 필요한 값을 먼저 꺼냅니다.
+        job_id, owner_id, credits_reserved = job.id, job.owner_id, job.credits_reserved
+        await db.rollback()
+        if credits_reserved:
+            await crud_async.refund_credits(db, user_id=owner_id, amount=credits_reserved)
+        await crud_async.update_job(db, job_id, status="failed", stage="failed", error=error, credits_reserved=0)
+
+
+job_manager = JobManager(workers=settings.JOB_WORKERS, storage_dir=settings.JOB_STORAGE_DIR)
+
+
+async def _load_job_state(job_id: uuid.UUID, user_id: int) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        job = await crud_async.get_job(db, job_id=job_id, user_id=user_id)
+        if job is None:
+            return None
+        return schemas.Job.model_validate(job).model_dump(mode="json")
+
+
+async def job_event_stream(job_id: uuid.UUID, user_id: int) -> AsyncGenerator[str, None]:
+    """
+    작업 진행 상황을 Server-Sent Events 형식으로 전달합니다.
+    상태가 바뀔 때마다 progress 이벤트를 보내고, 작업이 끝나면 스트림을 닫습니다.
+    """
+    last_state = None
+    idle = 0.0
+    while True:
+        state = await _load_job_state(job_id, user_id)
+        if state is None:
+            yield "event: error\ndata: {\"detail\": \"작업을 찾을 수 없습니다.\"}\n\n"
+            return
+
+        if state != last_state:
+            last_state = state
+            idle = 0.0
+            yield f"event: progress\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+            if state["status"] in TERMINAL_STATUSES:
+                return
+        elif idle >= EVENT_HEARTBEAT_INTERVAL:
+            # 프록시가 유휴 연결을 끊지 않도록 주석 라인을 보냅니다.
+            idle = 0.0
+            yield ": keep-alive\n\n"
+
+        await asyncio.sleep(EVENT_POLL_INTERVAL)
+        idle += EVENT_POLL_INTERVAL
@@ -1,26 +1,47 @@
 # /TINO-TE.ai-BETA-backend/app/main.py
 
+import base64
+import hashlib
 import uuid
-from typing import List 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from fastapi.concurrency import run_in_threadpool
 import os
 import asyncio
 from datetime import datetime
 
 
 # 우리가 직접 만든 모든 모듈들을 가져옵니다.
-from app import services, schemas, models, crud, auth, admin
+from app import services, schemas, models, crud_async, auth, admin
+from app import pipeline
+from app.jobs import job_manager, job_event_stream
+from app.streaming import release_stream_resources, stream_note_from_upload
+from app.export import stream_notes_zip
+from app.ingestion import UploadSizeLimitMiddleware, ingest_upload
+from app.credits import credit_reservation, reserve_credits
 from app.logging_config import logger
 from app.scheduler import start_scheduler
 from app.admin_auth import verify_admin_api_key
-# --- [수정] get_db를 database 모듈에서 가져옵니다.
-from app.database import engine, get_db
+from app.http_client import http_client_manager
+from app.workers import PoolSaturatedError, WorkerCrashedError, shutdown_pools
+from app.pdf_cache import pdf_cache
+from app.pdf_service import get_render_context
+from app.config import settings
+# --- [수정] get_async_db를 database 모듈에서 가져옵니다.
+from app.database import async_engine, engine, get_async_db
 
 # 데이터베이스 테이블 생성 (Supabase 연결 복구)
 try:
     models.Base.metadata.create_all(bind=engine)
+    # create_all은 이미 있는 테이블에 새 인덱스를 추가하지 않으므로 따로 생성합니다.
+    for index in models.Note.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    # 이후의 모든 요청은 비동기 엔진을 사용하므로 동기 엔진의 연결은 정리합니다.
+    engine.dispose()
     logger.info("✅ Database connection successful")
 except Exception as e:
     logger.error(f"❌ Database connection failed: {e}")
@@ -39,10 +60,28 @@ app.include_router(admin.router)
 # 애플리케이션 시작 이벤트
 @app.on_event("startup")
 async def startup_event():
+    # 외부 AI API 호출용 공유 HTTP 클라이언트(연결 풀) 생성
+    await http_client_manager.start()
+    # 노트 생성 작업 워커 시작 (재시작 전 대기 작업 복구 포함)
+    await job_manager.start()
+    # PDF 폰트 등록과 스타일 생성을 첫 다운로드 전에 미리 해 둡니다.
+    await run_in_threadpool(get_render_context)
     # 스케줄러 시작 (백그라운드 태스크로 실행)
     asyncio.create_task(start_scheduler())
     logger.info("애플리케이션이 시작되었습니다.")
 
+# 애플리케이션 종료 이벤트
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_manager.stop()
+    # 문서 추출 등에 사용한 프로세스 풀 정리
+    shutdown_pools()
+    # 공유 HTTP 클라이언트의 keep-alive 연결 정리
+    await http_client_manager.close()
+    # 데이터베이스 연결 풀 정리
+    await async_engine.dispose()
+    logger.info("애플리케이션이 종료되었습니다.")
+
 # --- [삭제] ---
 # 이 함수는 database.py 파일로 이동했으므로 여기서 삭제합니다.
 # def get_db():
@@ -67,19 +106,30 @@ frontend_url = os.getenv("FRONTEND_URL")
 if frontend_url:
     origins.append(frontend_url)
 
+# 업로드 크기 한도를 넘는 요청은 본문을 끝까지 받기 전에 413으로 거절합니다.
+# (CORS 미들웨어 안쪽에 두어 거절 응답에도 CORS 헤더가 붙도록 먼저 등록합니다.)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    route_kinds={
+        "/api/v1/notes/from-document": "document",
+        "/api/v1/jobs/from-document": "document",
+    },
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # 배포 시에는 모든 도메인 허용 (나중에 제한 가능)
     allow_credentials=True,
     allow_methods=["*"], # 모든 HTTP 메소드 허용
     allow_headers=["*"], # 모든 HTTP 헤더 허용
+    expose_headers=["Content-Disposition", "ETag"], # 브라우저 코드가 PDF 파일명과 ETag를 읽을 수 있도록 노출
 )
 
 @app.post("/api/v1/login", response_model=schemas.Token)
-def login_for_access_token(
-    form_data: schemas.UserLogin, db: Session = Depends(get_db)
+async def login_for_access_token(
+    form_data: schemas.UserLogin, db: AsyncSession = Depends(get_async_db)
 ):
-    user = crud.get_user_by_student_id(db, student_id=form_data.student_id)
+    user = await crud_async.get_user_by_student_id(db, student_id=form_data.student_id)
     if not user or user.name != form_data.name:
         raise HTTPException(
             status_code=401,
@@ -89,14 +139,25 @@ def login_for_access_token(
     return {"api_key": user.api_key}
 
 # --- [추가] '내 정보' 조회 API ---
-@app.get("/api/v1/users/me", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
+@app.get("/api/v1/users/me", response_model=schemas.User, response_model_exclude_none=True)
+async def read_users_me(
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
+):
     """
-    (인증 필요) 현재 로그인된 사용자의 상세 정보를 반환합니다.
-    (노트 목록은 제외하고 반환하도록 스키마 조정이 필요할 수 있으나, 우선은 전체 반환)
+    (인증 필요) 현재 로그인된 사용자의 정보를 반환합니다.
+    노트 목록은 기본적으로 포함하지 않으며, ?include=notes_summary로 요청하면 노트 요약 목록과 노트 수를 함께 반환합니다.
     크레딧 체크를 하지 않으므로 크레딧이 0이어도 로그인 가능합니다.
     """
-    return current_user
+    if not admin.wants_note_summaries(include):
+        # 인증 캐시에 있는 정보만으로 응답하므로 DB를 조회하지 않습니다.
+        return schemas.User.model_validate(current_user)
+
+    user = await crud_async.get_user_with_note_summaries(db, user_id=current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    return (await admin.build_user_responses(db, [user], include_notes=True))[0]
 
 @app.get("/")
 def read_root():
@@ -106,63 +167,54 @@ def read_root():
 
 @app.post("/api/v1/notes/from-media", response_model=schemas.Note)
 async def create_note_from_media(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user_with_credits),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user_with_credits),
     file: UploadFile = File(...)
 ):
-    if not file.content_type.startswith("audio/") and not file.content_type.startswith("video/"):
-        raise HTTPException(
-            status_code=400,
-            detail="지원하지 않는 파일 형식입니다. 오디오 또는 비디오 파일을 업로드해주세요."
-        )
-
-    try:
-        transcription = await services.transcribe_media_with_whisper(file)
-        summarized_result = await services.summarize_text_with_openai(transcription)
-    except HTTPException as e:
-        raise e
-
-    note_data = schemas.Note(
-        id=uuid.uuid4(),
-        title=summarized_result["title"],
-        original_transcription=transcription,
-        summary=summarized_result["summary"],
-        media_duration_seconds=0,
-        note_type="audio",
-        created_at=datetime.now()
-    )
-    created_note = crud.create_note_for_user(db=db, note=note_data, user_id=current_user.id)
-    crud.deduct_credits(db=db, user_id=current_user.id, amount=10)
-    
-    return created_note
+    pipeline.validate_media_file(file)
+    # 크기 제한/형식 확인과 해시 계산을 한 번에 끝낸 뒤 처리합니다.
+    with await ingest_upload(file, "media") as upload:
+        # 처리 전에 크레딧을 원자적으로 예약하고, 실패하면 자동으로 환불합니다.
+        async with credit_reservation(db, current_user.id, pipeline.MEDIA_NOTE_CREDITS):
+            return await pipeline.build_note_from_media(db, current_user.id, upload)
 
 # --- [추가] 노트 목록을 조회하는 API 엔드포인트 ---
-@app.get("/api/v1/notes", response_model=List[schemas.Note])
-def read_notes(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+@app.get("/api/v1/notes", response_model=schemas.NotePage)
+async def read_notes(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
-    (인증 필요) 현재 로그인된 사용자가 생성한 모든 노트 목록을 반환합니다.
+    (인증 필요) 현재 로그인된 사용자의 노트 목록을 최신순으로 한 페이지씩 반환합니다.
+    목록에는 요약 미리보기만 포함되며, 본문은 GET /api/v1/notes/{note_id}로 조회합니다.
+    다음 페이지는 응답의 next_cursor를 cursor로 전달해 요청합니다.
     """
-    notes = crud.get_notes_by_user(db, user_id=current_user.id)
-    return notes
+    try:
+        notes, next_cursor = await crud_async.get_note_summaries(
+            db, user_id=current_user.id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": notes, "next_cursor": next_cursor}
 
 
 
 # --- [추가] 디버깅용 사용자 목록 조회 API 엔드포인트 ---
-@app.get("/api/v1/debug/users")
-def debug_read_users(db: Session = Depends(get_db)):
+@app.get("/api/v1/debug/users", response_model=List[schemas.User], response_model_exclude_none=True)
+async def debug_read_users(include: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """
     (디버깅용) 모든 사용자 목록을 반환합니다.
     """
-    users = db.query(models.User).all()
-    return users
+    include_notes = admin.wants_note_summaries(include)
+    users = await crud_async.get_users(db, limit=None, with_note_summaries=include_notes)
+    return await admin.build_user_responses(db, users, include_notes)
 
 # --- [추가] 모든 사용자의 크레딧을 초기화하는 API 엔드포인트 ---
 @app.post("/api/v1/admin/reset-credits")
-def reset_all_credits(
-    db: Session = Depends(get_db),
+async def reset_all_credits(
+    db: AsyncSession = Depends(get_async_db),
     credits: int = 10,
     api_key: str = Depends(admin.verify_admin_api_key)
 ):
@@ -170,21 +222,114 @@ def reset_all_credits(
     (관리자 전용) 모든 사용자의 크레딧을 초기화합니다.
     이 엔드포인트는 매일 자정에 자동으로 호출되어야 합니다.
     """
-    return crud.reset_all_user_credits(db, credits)
+    return await crud_async.reset_all_user_credits(db, credits)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 현재 ETag가 포함되어 있는지 확인합니다."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def _note_etag(note: models.Note) -> str:
+    """
+    노트의 ETag를 만듭니다. 노트는 생성 후 수정되지 않으므로
+    본문을 읽지 않고 ID, 생성 시각, 제목만으로 만듭니다.
+    """
+    created_at = note.created_at.isoformat() if note.created_at else ""
+    digest = hashlib.sha256(f"{note.id}|{created_at}|{note.title}".encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+# --- [추가] 노트 상세 조회 API ---
+@app.get("/api/v1/notes/{note_id}", response_model=schemas.Note)
+async def read_note(
+    note_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    (인증 필요) 노트 하나의 전체 내용(요약, 원문)을 반환합니다.
+    응답에는 ETag가 포함되며, 브라우저가 같은 값을 If-None-Match로 보내면
+    본문을 읽지 않고 304 Not Modified로 응답합니다.
+    """
+    try:
+        note_uuid = uuid.UUID(note_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="올바르지 않은 노트 ID 형식입니다."
+        )
+
+    # 원문/요약은 지연 로딩되므로 304로 응답할 때는 DB에서 읽지 않습니다.
+    note = await crud_async.get_note(db, note_id=note_uuid, user_id=current_user.id)
+    if not note:
+        raise HTTPException(
+            status_code=404,
+            detail="노트를 찾을 수 없습니다."
+        )
+
+    etag = _note_etag(note)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return await crud_async.load_note_body(db, note)
+
+# --- [추가] 노트 일괄 내보내기 API ---
+@app.post("/api/v1/notes/export")
+async def export_notes(
+    request: schemas.NoteExportRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    (인증 필요) 여러 노트를 PDF 및/또는 마크다운 파일로 묶은 ZIP을 스트리밍으로 내려받습니다.
+    note_ids 또는 생성일 범위(created_from, created_to)로 노트를 지정합니다.
+    """
+    if not request.note_ids and request.created_from is None and request.created_to is None:
+        raise HTTPException(status_code=400, detail="내보낼 노트 ID 또는 날짜 범위를 지정해주세요.")
+    if not request.formats:
+        raise HTTPException(status_code=400, detail="내보낼 형식(pdf, markdown)을 하나 이상 지정해주세요.")
+
+    note_ids = await crud_async.get_note_ids_for_export(
+        db,
+        user_id=current_user.id,
+        note_ids=request.note_ids,
+        created_from=request.created_from,
+        created_to=request.created_to,
+        limit=settings.EXPORT_MAX_NOTES + 1,
+    )
+    if not note_ids:
+        raise HTTPException(status_code=404, detail="내보낼 노트를 찾을 수 없습니다.")
+    if len(note_ids) > settings.EXPORT_MAX_NOTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.EXPORT_MAX_NOTES}개의 노트만 내보낼 수 있습니다.",
+        )
+
+    filename = f"tino-te-notes-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+    return StreamingResponse(
+        stream_notes_zip(current_user.id, note_ids, list(dict.fromkeys(request.formats))),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 # --- [추가] 노트 삭제 API ---
 @app.delete("/api/v1/notes/{note_id}")
-def delete_note(
+async def delete_note(
     note_id: str,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
     (인증 필요) 특정 노트를 삭제합니다.
     """
     try:
         note_uuid = uuid.UUID(note_id)
-        note = crud.get_note(db, note_id=note_uuid, user_id=current_user.id)
+        note = await crud_async.get_note(db, note_id=note_uuid, user_id=current_user.id)
         
         if not note:
             raise HTTPException(
@@ -192,7 +337,8 @@ def delete_note(
                 detail="노트를 찾을 수 없습니다."
             )
         
-        crud.delete_note(db, note_id=note_uuid, user_id=current_user.id)
+        await crud_async.delete_note(db, note_id=note_uuid, user_id=current_user.id)
+        await run_in_threadpool(pdf_cache.discard, note_uuid)
         return {"message": "노트가 성공적으로 삭제되었습니다."}
         
     except ValueError:
@@ -204,17 +350,30 @@ def delete_note(
 @app.get("/api/v1/notes/{note_id}/pdf")
 async def download_note_as_pdf(
     note_id: str,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    response_format: str = Query("pdf", alias="format", pattern="^(pdf|json)$"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
 ):
     """
     (인증 필요) 특정 노트를 PDF로 다운로드합니다.
+    기본적으로 application/pdf 바이너리를 그대로 전송하며,
+    ?format=json을 지정하면 이전처럼 Base64로 인코딩한 JSON으로 반환합니다.
+    렌더링은 별도 프로세스 풀에서 실행되며, 풀이 가득 차 있으면 503을 반환합니다.
     """
     try:
-        from app.pdf_service import create_pdf_endpoint_handler
+        from app.pdf_service import (
+            content_disposition,
+            iter_pdf_chunks,
+            iter_pdf_file,
+            note_content_hash,
+            note_to_pdf_data,
+            pdf_filename,
+        )
+        from app.pdf_cache import get_note_pdf, load_pdf_bytes
         
         note_uuid = uuid.UUID(note_id)
-        note = crud.get_note(db, note_id=note_uuid, user_id=current_user.id)
+        note = await crud_async.get_note(db, note_id=note_uuid, user_id=current_user.id, with_body=True)
         
         if not note:
             raise HTTPException(
@@ -223,23 +382,53 @@ async def download_note_as_pdf(
             )
         
         # 노트 데이터를 딕셔너리로 변환
-        note_data = {
-            "title": note.title,
-            "summary": note.summary,
-            "original_transcription": note.original_transcription,
-            "note_type": note.note_type,
-            "created_at": note.created_at.strftime("%Y-%m-%d %H:%M:%S") if note.created_at else ""
-        }
-        
-        # PDF 생성
-        pdf_result = create_pdf_endpoint_handler(note_data)
-        
-        return {
-            "pdf_data": pdf_result["pdf_data"],
-            "filename": pdf_result["filename"],
-            "content_type": pdf_result["content_type"]
+        note_data = note_to_pdf_data(note)
+
+        # 내용이 같으면 PDF도 같으므로, 브라우저에 같은 PDF가 있으면 다시 만들지 않습니다.
+        etag = f'"{note_content_hash(note_data)[:32]}"'
+        if response_format == "pdf" and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        # 캐시에 있으면 렌더링 없이 저장된 파일을 연 핸들이, 없으면 프로세스 풀에서 렌더링한 결과가 옵니다.
+        pdf = await get_note_pdf(note.id, note_data)
+
+        if response_format == "json":
+            pdf_bytes = await run_in_threadpool(load_pdf_bytes, pdf)
+            return {
+                "pdf_data": base64.b64encode(pdf_bytes).decode("utf-8"),
+                "filename": pdf_filename(note_data),
+                "content_type": "application/pdf"
+            }
+
+        headers = {
+            "Content-Disposition": content_disposition(pdf_filename(note_data)),
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
         }
+        if not isinstance(pdf, bytes):
+            # 열린 핸들로 전송하므로 전송 중 캐시 정리로 파일이 삭제되어도 끝까지 전송됩니다.
+            # 클라이언트가 전송 전에 연결을 끊어도 핸들이 닫히도록 BackgroundTask로도 닫습니다.
+            headers["Content-Length"] = str(os.fstat(pdf.fileno()).st_size)
+            return StreamingResponse(
+                iter_pdf_file(pdf), media_type="application/pdf", headers=headers,
+                background=BackgroundTask(pdf.close),
+            )
+
+        headers["Content-Length"] = str(len(pdf))
+        return StreamingResponse(iter_pdf_chunks(pdf), media_type="application/pdf", headers=headers)
         
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF 생성 요청이 많습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "5"},
+        )
+    except WorkerCrashedError:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF 생성 중 작업 프로세스가 종료되었습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "5"},
+        )
     except ValueError:
         raise HTTPException(
             status_code=400,
@@ -250,56 +439,129 @@ async def download_note_as_pdf(
             status_code=500,
             detail="PDF 생성 라이브러리가 설치되지 않았습니다. pip install reportlab을 실행해주세요."
         )
+    except RuntimeError as e:
+        # 렌더링 프로세스에서 발생한 오류
+        raise HTTPException(
+            status_code=500,
+            detail=f"PDF 생성 중 오류가 발생했습니다: {str(e)}"
+        )
 
 @app.post("/api/v1/notes/from-document", response_model=schemas.Note)
 async def create_note_from_document(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user_with_credits),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user_with_credits),
     file: UploadFile = File(...)
 ):
     """
     (인증 필요) 문서 파일(PDF, DOCX, TXT)을 업로드하여 노트를 생성합니다.
     """
-    # 파일 확장자 확인
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    if file_extension not in ['.pdf', '.docx', '.doc', '.txt']:
+    pipeline.validate_document_file(file)
+    with await ingest_upload(file, "document") as upload:
+        async with credit_reservation(db, current_user.id, pipeline.DOCUMENT_NOTE_CREDITS):
+            return await pipeline.build_note_from_document(db, current_user.id, upload)
+
+# --- [추가] 요약을 실시간으로 전달하는 스트리밍 노트 생성 API ---
+@app.post("/api/v1/notes/stream")
+async def create_note_streaming(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user_with_credits),
+    file: UploadFile = File(...)
+):
+    """
+    (인증 필요) 미디어 또는 문서 파일로 노트를 만들면서 요약 토큰을
+    Server-Sent Events(stage, token, note, error 이벤트)로 실시간 전달합니다.
+    스트림이 끝나면 노트가 저장되고 note 이벤트로 전달됩니다.
+    """
+    content_type = file.content_type or ""
+    if content_type.startswith("audio/") or content_type.startswith("video/"):
+        kind = "media"
+    else:
+        pipeline.validate_document_file(file)
+        kind = "document"
+
+    # 업로드 파일은 요청 처리가 끝나면 닫히므로, 스트림에서 사용할 수 있도록 임시 파일을 넘겨받습니다. (스트림이 끝나면 닫힘)
+    upload = await ingest_upload(file, kind)
+
+    # 스트림을 시작하기 전에 크레딧을 예약합니다. 스트림 중 실패하면 환불됩니다.
+    try:
+        reservation = await reserve_credits(db, current_user.id, pipeline.NOTE_CREDITS[kind])
+    except BaseException:
+        upload.close()
+        raise
+
+    # 클라이언트가 스트림 시작 전에 연결을 끊어도 예약한 크레딧과 임시 파일이 정리되도록 합니다.
+    return StreamingResponse(
+        stream_note_from_upload(current_user.id, upload, kind, reservation),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release_stream_resources, upload, reservation),
+    )
+
+# --- [추가] 백그라운드 노트 생성 작업 API ---
+@app.post("/api/v1/jobs/from-media", response_model=schemas.Job, status_code=202)
+async def create_media_job(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user_with_credits),
+    file: UploadFile = File(...)
+):
+    """
+    (인증 필요) 미디어 파일로 노트를 만드는 작업을 등록하고 작업 정보를 즉시 반환합니다.
+    진행 상황은 GET /api/v1/jobs/{job_id} 또는 /events 스트림으로 확인합니다.
+    """
+    pipeline.validate_media_file(file)
+    with await ingest_upload(file, "media") as upload:
+        return await job_manager.submit(db, current_user.id, "media", upload)
+
+@app.post("/api/v1/jobs/from-document", response_model=schemas.Job, status_code=202)
+async def create_document_job(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user_with_credits),
+    file: UploadFile = File(...)
+):
+    """
+    (인증 필요) 문서 파일로 노트를 만드는 작업을 등록하고 작업 정보를 즉시 반환합니다.
+    """
+    pipeline.validate_document_file(file)
+    with await ingest_upload(file, "document") as upload:
+        return await job_manager.submit(db, current_user.id, "document", upload)
+
+def _parse_job_id(job_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(job_id)
+    except ValueError:
         raise HTTPException(
             status_code=400,
-            detail="지원하지 않는 파일 형식입니다. PDF, DOCX, DOC, TXT 파일만 업로드해주세요."
+            detail="올바르지 않은 작업 ID 형식입니다."
         )
 
-    try:
-        # 문서에서 텍스트 추출
-        text = await services.extract_text_from_document(file)
-        
-        # 텍스트가 너무 길면 일부만 사용
-        if len(text) > 10000:
-            text = text[:10000] + "...(생략됨)"
-            
-        # OpenAI API로 요약
-        summarized_result = await services.summarize_text_with_openai(text)
-        
-        # 노트 생성
-        note_data = schemas.Note(
-            id=uuid.uuid4(),
-            title=summarized_result["title"],
-            original_transcription=text,
-            summary=summarized_result["summary"],
-            media_duration_seconds=0,
-            note_type="document",
-            created_at=datetime.now()
-        )
-        
-        created_note = crud.create_note_for_user(db=db, note=note_data, user_id=current_user.id)
-        crud.deduct_credits(db=db, user_id=current_user.id, amount=5)
-        
-        return created_note
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
+@app.get("/api/v1/jobs/{job_id}", response_model=schemas.Job)
+async def read_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    (인증 필요) 작업의 현재 상태, 단계, 진행률을 반환합니다.
+    """
+    job = await crud_async.get_job(db, job_id=_parse_job_id(job_id), user_id=current_user.id)
+    if not job:
         raise HTTPException(
-            status_code=500,
-            detail=f"문서 처리 중 오류가 발생했습니다: {str(e)}"
+            status_code=404,
+            detail="작업을 찾을 수 없습니다."
         )
+    return job
 
+@app.get("/api/v1/jobs/{job_id}/events")
+def stream_job_events(
+    job_id: str,
+    current_user: auth.AuthenticatedUser = Depends(auth.get_current_user)
+):
+    """
+    (인증 필요) 작업 진행 상황을 Server-Sent Events로 전달합니다.
+    작업이 끝나면(succeeded/failed) 스트림이 닫힙니다.
+    """
+    return StreamingResponse(
+        job_event_stream(_parse_job_id(job_id), current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
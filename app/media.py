@@ -0,0 +1,356 @@
+# /TINO-TE.ai-BETA-backend/app/media.py
+
+import difflib
+import os
+import re
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple
+
+from app import vad
+from app.config import settings
+from app.ingestion import spool_dir
+from app.logging_config import logger
+from app.workers import SubprocessError, media_pool
+
+# --- 코드 설명 ---
+# 이 파일은 오디오/비디오 파일을 다루는 도구 함수들을 모아둔 곳입니다.
+# 실제 디코딩/인코딩은 ffmpeg, ffprobe 외부 프로그램에 맡기고,
+# 모든 호출은 미디어 변환 서브프로세스 풀(workers.media_pool)에서 실행해 이벤트 루프를 막지 않습니다.
+# 전사 전에는 오디오 트랙만 꺼내 모노 16kHz의 작은 파일로 압축하므로,
+# 강의 동영상도 원본보다 수십 배 작은 데이터만 Whisper로 전송합니다.
+# 이어서 VAD(vad.py)로 긴 무음을 찾아 말소리 구간만 이어 붙인 오디오를 만듭니다.
+
+# Whisper에 보낼 오디오 형식별 (확장자, MIME 타입, ffmpeg 출력 형식, 인코더 옵션)
+AUDIO_FORMATS = {
+    "opus": (".ogg", "audio/ogg", "ogg", ("-c:a", "libopus", "-application", "voip")),
+    "mp3": (".mp3", "audio/mpeg", "mp3", ("-c:a", "libmp3lame")),
+}
+
+# 음성 인식에 필요한 채널 수와 샘플링 레이트
+AUDIO_CHANNELS = 1
+AUDIO_SAMPLE_RATE = 16000
+
+# 앞뒤 무음을 잘라낼 때 음성 앞뒤에 남겨 둘 여유(초). 첫 음절이 잘리지 않도록 합니다.
+SILENCE_KEEP_SECONDS = 0.5
+
+# ffmpeg silencedetect 필터 출력 ("silence_start: 12.3", "silence_end: 45.6 | ...")
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+# 말소리 구간을 이어 붙이는 ffmpeg 필터 식이 너무 길어지지 않도록 제한하는 구간 수
+VAD_MAX_REGIONS = 400
+
+# 파일에 오디오 트랙이 없을 때 ffmpeg가 출력하는 메시지
+_NO_AUDIO_MESSAGES = ("matches no streams", "does not contain any stream")
+
+
+class MediaToolError(Exception):
+    """ffmpeg/ffprobe 실행이 실패했을 때 발생하는 예외"""
+
+
+class NoAudioStreamError(MediaToolError):
+    """파일에 오디오 트랙이 없을 때 발생하는 예외"""
+
+
+class CompactAudio(NamedTuple):
+    """전사용으로 압축한 오디오 파일"""
+    path: str
+    extension: str
+    content_type: str
+    duration: Optional[float] = None  # 재생 길이(초), 알 수 없으면 None
+
+
+def ffmpeg_available() -> bool:
+    """ffmpeg와 ffprobe가 모두 설치되어 있는지 확인합니다."""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+def _tool_error(program: str, returncode: int, stderr: bytes) -> MediaToolError:
+    text = stderr.decode("utf-8", errors="ignore")
+    lines = text.strip().splitlines()
+    message = f"{program} 실행 실패: {lines[-1] if lines else returncode}"
+    if any(marker in text for marker in _NO_AUDIO_MESSAGES):
+        return NoAudioStreamError(message)
+    return MediaToolError(message)
+
+
+async def _run(*args: str) -> bytes:
+    """외부 프로그램을 서브프로세스 풀에서 실행하고 표준 출력을 반환합니다."""
+    returncode, stdout, stderr = await media_pool.run(*args)
+    if returncode != 0:
+        raise _tool_error(args[0], returncode, stderr)
+    return stdout
+
+
+async def probe_duration(path: str) -> Optional[float]:
+    """ffprobe로 미디어 길이(초)를 조회합니다. 알 수 없으면 None을 반환합니다."""
+    try:
+        output = await _run(
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            path,
+        )
+        return float(output.decode().strip())
+    except (MediaToolError, ValueError) as e:
+        logger.warning(f"미디어 길이 조회 실패: {e}")
+        return None
+
+
+def plan_segments(duration: float, segment_seconds: float, overlap_seconds: float) -> List[Tuple[float, float]]:
+    """
+    전체 길이를 겹치는 구간(start, length) 목록으로 나눕니다.
+    각 구간은 다음 구간과 overlap_seconds만큼 겹치므로, 경계에서 잘린 단어도
+    어느 한쪽 구간에서는 온전히 전사됩니다.
+    """
+    if duration <= segment_seconds:
+        return [(0.0, duration)]
+
+    step = segment_seconds - overlap_seconds
+    segments = []
+    start = 0.0
+    while start < duration:
+        length = min(segment_seconds, duration - start)
+        segments.append((start, length))
+        if start + length >= duration:
+            break
+        start += step
+    return segments
+
+
+def audio_format() -> Tuple[str, str, str, Tuple[str, ...]]:
+    """설정된 압축 형식의 (확장자, MIME 타입, ffmpeg 출력 형식, 인코더 옵션)을 반환합니다."""
+    return AUDIO_FORMATS.get(settings.MEDIA_AUDIO_CODEC, AUDIO_FORMATS["opus"])
+
+
+def _encode_args() -> List[str]:
+    """오디오 트랙 하나만 모노 16kHz로 바꿔 설정된 형식으로 인코딩하는 ffmpeg 출력 옵션"""
+    codec_args = audio_format()[3]
+    return [
+        "-map", "0:a:0", "-vn", "-sn", "-dn",
+        "-ac", str(AUDIO_CHANNELS), "-ar", str(AUDIO_SAMPLE_RATE),
+        *codec_args, "-b:a", settings.MEDIA_AUDIO_BITRATE,
+    ]
+
+
+async def detect_silences(path: str, threshold_db: float, min_seconds: float) -> List[Tuple[float, float]]:
+    """
+    ffmpeg silencedetect 필터로 min_seconds 이상 이어지는 무음 구간 (시작, 끝) 목록을 구합니다.
+    오디오만 디코딩하므로 동영상도 빠르게 처리됩니다. 끝 시각을 알 수 없는 무음은 파일 끝까지로 봅니다.
+    """
+    returncode, _, stderr = await media_pool.run(
+        "ffmpeg", "-nostdin", "-hide_banner", "-nostats",
+        "-i", path,
+        "-map", "0:a:0", "-af", f"silencedetect=noise={threshold_db}dB:d={min_seconds}",
+        "-f", "null", "-",
+    )
+    if returncode != 0:
+        raise _tool_error("ffmpeg", returncode, stderr)
+
+    silences: List[List[float]] = []
+    for kind, value in _SILENCE_RE.findall(stderr.decode("utf-8", errors="ignore")):
+        if kind == "start":
+            silences.append([max(0.0, float(value)), float("inf")])
+        elif silences:
+            silences[-1][1] = float(value)
+    return [(start, end) for start, end in silences]
+
+
+def speech_bounds(silences: List[Tuple[float, float]], duration: float) -> Tuple[float, float]:
+    """
+    앞뒤 무음을 뺀 (시작, 끝) 시각을 반환합니다. 중간의 무음은 그대로 둡니다.
+    전체가 무음이면 원래 범위를 그대로 반환합니다.
+    """
+    start, end = 0.0, duration
+    if silences and silences[0][0] <= SILENCE_KEEP_SECONDS:
+        start = max(0.0, silences[0][1] - SILENCE_KEEP_SECONDS)
+    if silences and silences[-1][1] >= duration - SILENCE_KEEP_SECONDS:
+        end = min(duration, silences[-1][0] + SILENCE_KEEP_SECONDS)
+    if end <= start:
+        return 0.0, duration
+    return start, end
+
+
+async def extract_audio(
+    path: str, output_path: str, trim_silence: bool = False, duration: Optional[float] = None
+) -> Optional[float]:
+    """
+    미디어 파일에서 오디오 트랙만 꺼내(디먹싱) 모노 16kHz로 다운믹스하고 작은 형식으로 인코딩합니다.
+    비디오 트랙은 디코딩하지 않으므로 강의 동영상도 오디오 길이에 비례하는 시간만 걸립니다.
+    trim_silence가 True이면 녹음 앞뒤의 긴 무음을 잘라냅니다.
+    duration은 업로드 시 확인한 원본 길이이며, 변환된 오디오의 길이(알 수 없으면 None)를 반환합니다.
+    """
+    range_args: List[str] = []
+    if trim_silence:
+        if duration is None:
+            duration = await probe_duration(path)
+        if duration:
+            silences = await detect_silences(
+                path, settings.MEDIA_SILENCE_THRESHOLD_DB, settings.MEDIA_SILENCE_MIN_SECONDS
+            )
+            start, end = speech_bounds(silences, duration)
+            if start > 0.0 or end < duration:
+                range_args = ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}"]
+                duration = end - start
+
+    await _run(
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        *range_args, "-i", path,
+        *_encode_args(),
+        output_path,
+    )
+    return duration
+
+
+@asynccontextmanager
+async def compact_audio(
+    path: str, trim_silence: bool = False, duration: Optional[float] = None
+) -> AsyncIterator[Optional[CompactAudio]]:
+    """
+    압축한 오디오를 임시 파일로 만들어 제공하고, 사용이 끝나면 삭제합니다.
+    오디오 트랙이 없으면 NoAudioStreamError가 발생하고, 그 밖의 이유로 변환에 실패하면
+    원본을 그대로 사용할 수 있도록 None을 제공합니다.
+    """
+    extension, content_type, _, _ = audio_format()
+    fd, output_path = tempfile.mkstemp(suffix=extension, dir=spool_dir())
+    os.close(fd)
+    try:
+        try:
+            duration = await extract_audio(path, output_path, trim_silence, duration)
+        except NoAudioStreamError:
+            raise
+        except MediaToolError as e:
+            logger.warning(f"오디오 변환 실패, 원본 파일로 전사합니다: {e}")
+            yield None
+        else:
+            yield CompactAudio(output_path, extension, content_type, duration)
+    finally:
+        os.unlink(output_path)
+
+
+async def speech_regions(path: str) -> Tuple[List[Tuple[float, float]], float]:
+    """
+    오디오를 16kHz PCM으로 디코딩하면서 VAD로 말소리 구간 목록과 전체 길이(초)를 구합니다.
+    PCM은 조금씩 받아 프레임 특징만 남기므로 긴 강의도 메모리를 거의 쓰지 않습니다.
+    """
+    accumulator = vad.FrameFeatureAccumulator()
+    try:
+        async for chunk in media_pool.stream(
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", path,
+            "-map", "0:a:0", "-ac", "1", "-ar", str(vad.SAMPLE_RATE),
+            "-f", "s16le", "pipe:1",
+        ):
+            accumulator.feed(chunk)
+    except SubprocessError as e:
+        raise _tool_error("ffmpeg", e.returncode, e.stderr) from e
+
+    energy_db, zcr = accumulator.result()
+    regions = vad.detect_speech(
+        energy_db, zcr,
+        settings.VAD_MIN_SILENCE_SECONDS, settings.VAD_PADDING_SECONDS,
+        max_regions=VAD_MAX_REGIONS,
+    )
+    return regions, energy_db.size * vad.FRAME_SECONDS
+
+
+def _select_filter(regions: List[Tuple[float, float]]) -> str:
+    """말소리 구간만 남기고 시각을 다시 이어 붙이는 ffmpeg 필터"""
+    ranges = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in regions)
+    return f"aselect='{ranges}',asetpts=N/SR/TB"
+
+
+@asynccontextmanager
+async def speech_only_audio(audio: CompactAudio) -> AsyncIterator[Tuple[CompactAudio, Optional[vad.TimestampMap]]]:
+    """
+    VAD로 긴 무음을 뺀 오디오와, 그 시각을 원본 시각으로 바꾸는 TimestampMap을 제공합니다.
+    줄어드는 길이가 VAD_MIN_SAVING_RATIO보다 작거나 검출/변환에 실패하면 audio를 그대로 제공합니다.
+    검출하면서 디코딩한 길이로 제공하는 오디오의 duration을 채웁니다.
+    """
+    try:
+        regions, duration = await speech_regions(audio.path)
+    except MediaToolError as e:
+        logger.warning(f"음성 구간 검출 실패, 무음을 포함해 전사합니다: {e}")
+        yield audio, None
+        return
+
+    if duration > 0:
+        audio = audio._replace(duration=duration)
+    timestamps = vad.TimestampMap(regions)
+    skipped = duration - timestamps.kept_seconds
+    if not regions or duration <= 0 or skipped / duration < settings.VAD_MIN_SAVING_RATIO:
+        yield audio, None
+        return
+
+    fd, output_path = tempfile.mkstemp(suffix=audio.extension, dir=spool_dir())
+    os.close(fd)
+    try:
+        speech = None
+        try:
+            await _run(
+                "ffmpeg", "-nostdin", "-v", "error", "-y",
+                "-i", audio.path,
+                "-af", _select_filter(regions),
+                *_encode_args(),
+                output_path,
+            )
+            speech = CompactAudio(output_path, audio.extension, audio.content_type, timestamps.kept_seconds)
+            logger.info(f"무음 {skipped:.0f}초 제외 ({skipped / duration:.0%}), 말소리 구간 {len(regions)}개")
+        except MediaToolError as e:
+            logger.warning(f"무음 제외 변환 실패, 무음을 포함해 전사합니다: {e}")
+
+        if speech is None:
+            yield audio, None
+        else:
+            yield speech, timestamps
+    finally:
+        os.unlink(output_path)
+
+
+async def extract_audio_segment(path: str, start: float, length: float) -> bytes:
+    """
+    지정한 구간의 오디오만 잘라 모노 16kHz로 인코딩해 반환합니다. (형식은 MEDIA_AUDIO_CODEC)
+    Whisper는 음성만 필요하므로 비디오 트랙은 버립니다(-vn).
+    """
+    container = audio_format()[2]
+    return await _run(
+        "ffmpeg", "-nostdin", "-v", "error",
+        "-ss", f"{start:.3f}", "-t", f"{length:.3f}",
+        "-i", path,
+        *_encode_args(),
+        "-f", container, "pipe:1",
+    )
+
+
+def stitch_transcripts(parts: List[str], max_overlap_words: int = 40, min_match_words: int = 3) -> str:
+    """
+    구간별 전사 결과를 순서대로 이어 붙입니다.
+    인접한 두 구간은 오디오가 겹치므로, 앞 구간의 끝과 뒤 구간의 시작에서
+    가장 길게 일치하는 단어열을 찾아 그 지점에서 이어 붙여 중복을 제거합니다.
+    """
+    words: List[str] = []
+    for part in parts:
+        part_words = part.split()
+        if not part_words:
+            continue
+        if not words:
+            words.extend(part_words)
+            continue
+
+        tail = words[-max_overlap_words:]
+        head = part_words[:max_overlap_words]
+        matcher = difflib.SequenceMatcher(None, tail, head, autojunk=False)
+        match = matcher.find_longest_match(0, len(tail), 0, len(head))
+
+        if match.size >= min_match_words:
+            # 일치 구간 뒤에 남은 앞 구간의 단어(경계에서 잘린 부분)는 버리고,
+            # 뒤 구간의 일치 구간 이후부터 이어 붙입니다.
+            trailing = len(tail) - (match.a + match.size)
+            if trailing:
+                del words[-trailing:]
+            words.extend(part_words[match.b + match.size:])
+        else:
+            words.extend(part_words)
+
+    return " ".join(words)
@@ -0,0 +1,249 @@
+# /TINO-TE.ai-BETA-backend/app/media_probe.py
+
+import struct
+from typing import BinaryIO, Callable, Dict, Optional
+
+# --- 코드 설명 ---
+# 이 파일은 오디오/비디오 파일의 헤더만 읽어 재생 길이(초)를 구합니다.
+# 디코딩 없이 필요한 위치로 이동(seek)해 몇 KB만 읽으므로, 업로드를 받는 단계(ingestion.py)에서
+# 바로 길이를 알 수 있습니다. 지원하지 않는 형식이나 손상된 헤더는 None을 반환하며,
+# 그런 경우에는 ffprobe(media.probe_duration)로 다시 조회합니다.
+
+# Ogg 파일 끝에서 마지막 페이지를 찾을 때 읽을 크기
+OGG_TAIL_BYTES = 64 * 1024
+
+# MPEG 오디오 비트레이트 표 (kbps) [MPEG-1 여부][레이어]
+_MP3_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _read_at(fileobj: BinaryIO, offset: int, length: int) -> bytes:
+    fileobj.seek(offset)
+    return fileobj.read(length)
+
+
+def _wav_duration(fileobj: BinaryIO, size: int) -> Optional[float]:
+    offset = 12
+    byte_rate = None
+    while offset + 8 <= size:
+        chunk_id, chunk_size = struct.unpack("<4sI", _read_at(fileobj, offset, 8))
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", _read_at(fileobj, offset + 16, 4))[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # 스트리밍으로 기록된 파일은 data 크기가 비어 있으므로 파일 끝까지로 봅니다.
+            data_size = chunk_size if 0 < chunk_size <= size - offset - 8 else size - offset - 8
+            return data_size / byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _flac_duration(fileobj: BinaryIO, size: int) -> Optional[float]:
+    # "fLaC" 다음의 첫 메타데이터 블록은 항상 STREAMINFO입니다.
+    info = _read_at(fileobj, 8, 18)
+    if len(info) < 18:
+        return None
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def _mp3_duration(fileobj: BinaryIO, size: int) -> Optional[float]:
+    offset = 0
+    header = _read_at(fileobj, 0, 10)
+    if header[:3] == b"ID3" and len(header) == 10:
+        tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        offset = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+
+    frame = _read_at(fileobj, offset, 4)
+    if len(frame) < 4 or frame[0] != 0xFF or frame[1] & 0xE0 != 0xE0:
+        return None
+    version_bits = (frame[1] >> 3) & 0x3
+    layer_bits = (frame[1] >> 1) & 0x3
+    bitrate_index = frame[2] >> 4
+    rate_index = (frame[2] >> 2) & 0x3
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version_bits == 3
+    layer = 4 - layer_bits
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    samples_per_frame = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+
+    # VBR 파일은 첫 프레임의 Xing/Info 또는 VBRI 헤더에 전체 프레임 수가 있습니다.
+    mono = (frame[3] >> 6) == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    xing = _read_at(fileobj, offset + 4 + side_info, 12)
+    if xing[:4] in (b"Xing", b"Info") and len(xing) == 12:
+        flags = struct.unpack(">I", xing[4:8])[0]
+        if flags & 0x1:
+            frames = struct.unpack(">I", xing[8:12])[0]
+            return frames * samples_per_frame / sample_rate
+    vbri = _read_at(fileobj, offset + 36, 18)
+    if vbri[:4] == b"VBRI" and len(vbri) == 18:
+        frames = struct.unpack(">I", vbri[14:18])[0]
+        return frames * samples_per_frame / sample_rate
+
+    # 고정 비트레이트(CBR)로 보고 크기로 계산합니다.
+    return (size - offset) * 8 / bitrate
+
+
+def _mp4_duration(fileobj: BinaryIO, size: int) -> Optional[float]:
+    def boxes(start: int, end: int):
+        offset = start
+        while offset + 8 <= end:
+            box_size, box_type = struct.unpack(">I4s", _read_at(fileobj, offset, 8))
+            header_size = 8
+            if box_size == 1:
+                box_size = struct.unpack(">Q", _read_at(fileobj, offset + 8, 8))[0]
+                header_size = 16
+            elif box_size == 0:
+                box_size = end - offset
+            if box_size < header_size:
+                return
+            yield box_type, offset + header_size, offset + box_size
+            offset += box_size
+
+    # moov 상자는 파일 앞이나 끝에 있으므로 최상위 상자들의 헤더만 건너뛰며 찾습니다.
+    for box_type, body, box_end in boxes(0, size):
+        if box_type != b"moov":
+            continue
+        for child_type, child_body, _ in boxes(body, box_end):
+            if child_type != b"mvhd":
+                continue
+            version = _read_at(fileobj, child_body, 1)[0]
+            if version == 1:
+                timescale, duration = struct.unpack(">IQ", _read_at(fileobj, child_body + 20, 12))
+            else:
+                timescale, duration = struct.unpack(">II", _read_at(fileobj, child_body + 12, 8))
+            return duration / timescale if timescale else None
+    return None
+
+
+def _ogg_duration(fileobj: BinaryIO, size: int) -> Optional[float]:
+    first_page = _read_at(fileobj, 0, 27 + 255)
+    if len(first_page) < 28:
+        return None
+    payload_start = 27 + first_page[26]
+    payload = _read_at(fileobj, payload_start, 19)
+    if payload.startswith(b"OpusHead"):
+        # Opus의 granule 위치는 항상 48kHz 기준이며, 앞부분 pre-skip 샘플은 재생되지 않습니다.
+        sample_rate = 48000
+        pre_skip = struct.unpack("<H", payload[10:12])[0]
+    elif payload.startswith(b"\x01vorbis"):
+        sample_rate = struct.unpack("<I", payload[12:16])[0]
+        pre_skip = 0
+    else:
+        return None
+
+    tail_start = max(0, size - OGG_TAIL_BYTES)
+    tail = _read_at(fileobj, tail_start, size - tail_start)
+    last_page = tail.rfind(b"OggS")
+    if last_page < 0 or last_page + 14 > len(tail) or not sample_rate:
+        return None
+    granule = struct.unpack("<q", tail[last_page + 6:last_page + 14])[0]
+    if granule <= 0:
+        return None
+    return max(0, granule - pre_skip) / sample_rate
+
+
+def _read_vint(fileobj: BinaryIO, keep_marker: bool) -> Optional[tuple]:
+    """EBML 가변 길이 정수를 읽어 (값, 바이트 수, 크기 미정 여부)를 반환합니다."""
+    first = fileobj.read(1)
+    if not first:
+        return None
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first[0] & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        return None
+    rest = fileobj.read(length - 1)
+    value = first[0] if keep_marker else first[0] & (mask - 1)
+    all_ones = value == mask - 1
+    for byte in rest:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    return value, length, (not keep_marker and all_ones)
+
+
+def _matroska_duration(fileobj: BinaryIO, size: int) -> Optional[float]:
+    segment_id, info_id, cluster_id = 0x18538067, 0x1549A966, 0x1F43B675
+    timecode_scale_id, duration_id = 0x2AD7B1, 0x4489
+
+    def elements(start: int, end: int):
+        offset = start
+        while offset < end:
+            fileobj.seek(offset)
+            element_id = _read_vint(fileobj, keep_marker=True)
+            element_size = _read_vint(fileobj, keep_marker=False)
+            if element_id is None or element_size is None:
+                return
+            body = offset + element_id[1] + element_size[1]
+            body_end = end if element_size[2] else body + element_size[0]
+            yield element_id[0], body, body_end
+            offset = body_end
+
+    for element_id, body, body_end in elements(0, size):
+        if element_id != segment_id:
+            continue
+        for child_id, child_body, child_end in elements(body, body_end):
+            if child_id == cluster_id:
+                return None  # Info보다 실제 데이터가 먼저 나오면 헤더만으로는 알 수 없습니다.
+            if child_id != info_id:
+                continue
+            scale, duration = 1_000_000, None
+            for item_id, item_body, item_end in elements(child_body, child_end):
+                if item_id not in (timecode_scale_id, duration_id):
+                    continue
+                data = _read_at(fileobj, item_body, min(item_end - item_body, 8))
+                if item_id == timecode_scale_id:
+                    scale = int.from_bytes(data, "big")
+                elif item_id == duration_id:
+                    duration = struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+            return duration * scale / 1e9 if duration else None
+    return None
+
+
+_PARSERS: Dict[str, Callable[[BinaryIO, int], Optional[float]]] = {
+    "audio/wav": _wav_duration,
+    "audio/flac": _flac_duration,
+    "audio/mpeg": _mp3_duration,
+    "audio/mp4": _mp4_duration,
+    "video/mp4": _mp4_duration,
+    "video/quicktime": _mp4_duration,
+    "audio/ogg": _ogg_duration,
+    "video/webm": _matroska_duration,
+}
+
+
+def probe_duration(fileobj: BinaryIO, content_type: str, size: int) -> Optional[float]:
+    """
+    파일 헤더만 읽어 재생 길이(초)를 반환합니다. 알 수 없으면 None을 반환합니다.
+    content_type은 ingestion.sniff_content_type으로 확인한 실제 형식입니다.
+    """
+    parser = _PARSERS.get(content_type)
+    if parser is None:
+        return None
+    try:
+        duration = parser(fileobj, size)
+    except (struct.error, IndexError, OverflowError, ValueError, ZeroDivisionError):
+        return None
+    finally:
+        fileobj.seek(0)
+    if duration is None or duration <= 0:
+        return None
+    return duration
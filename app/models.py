@@ -1,9 +1,9 @@
 # /TINO-TE.ai-BETA-backend/app/models.py
 
 import uuid
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, query_expression
 from sqlalchemy.dialects.postgresql import UUID # UUID 타입을 위해 추가
 
 # 우리가 만든 database.py 파일에서 Base를 가져옵니다.
@@ -28,6 +28,10 @@ class User(Base):
     notes = relationship("Note", back_populates="owner")
 
 
+# 원문과 요약처럼 크기가 큰 노트 컬럼을 묶은 지연 로딩 그룹 이름
+NOTE_BODY_GROUP = "body"
+
+
 class Note(Base):
     """생성된 노트 정보를 저장하는 테이블"""
     __tablename__ = "notes"
@@ -35,8 +39,9 @@ class Note(Base):
     # id를 UUID로 설정하여 전역적으로 고유한 ID를 갖도록 합니다.
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, index=True)
-    original_transcription = Column(String)
-    summary = Column(String)
+    # 원문과 요약은 매우 길 수 있으므로 실제로 사용할 때만 불러옵니다.
+    original_transcription = deferred(Column(String), group=NOTE_BODY_GROUP)
+    summary = deferred(Column(String), group=NOTE_BODY_GROUP)
     media_duration_seconds = Column(Float)
     note_type = Column(String, default="audio")  # "audio" 또는 "document"
 
@@ -50,3 +55,53 @@ class Note(Base):
     # Note 모델에서 자신을 생성한 User 정보를 쉽게 가져오기 위한 설정
     owner = relationship("User", back_populates="notes")
 
+    # 목록 조회 시 SQL에서 잘라낸 요약 미리보기를 담는 값 (with_expression으로 채움)
+    preview = query_expression()
+
+    # 사용자별 노트 목록을 최신순으로 페이지 단위 조회하기 위한 복합 인덱스
+    __table_args__ = (
+        Index("ix_notes_owner_id_created_at", "owner_id", "created_at"),
+    )
+
+
+class ResultCacheEntry(Base):
+    """
+    전사/요약 결과를 업로드 내용의 해시로 저장하는 캐시 테이블.
+    같은 강의 녹음이나 자료가 여러 번 업로드되면 외부 API를 다시 호출하지 않고 재사용합니다.
+    """
+    __tablename__ = "result_cache"
+
+    # 내용 해시 + 모델 + 언어 + 프롬프트 버전으로 만든 SHA-256 키
+    key = Column(String(64), primary_key=True)
+    kind = Column(String, index=True)  # "transcription", "document_text", "summary"
+    payload = Column(Text)  # JSON 직렬화된 결과
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # LRU 정리를 위해 마지막으로 사용된 시간을 기록합니다.
+    last_accessed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class Job(Base):
+    """
+    노트 생성 백그라운드 작업 정보를 저장하는 테이블.
+    서버가 재시작되어도 대기/진행 중이던 작업을 다시 이어서 처리할 수 있도록 DB에 기록합니다.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # 사용자나 노트를 지워도 외래 키 오류가 나지 않도록 DB에서 작업을 함께 지우거나(CASCADE) 노트 연결을 끊습니다(SET NULL).
+    # create_all은 이미 있는 테이블의 제약 조건을 바꾸지 않으므로, 기존 DB에서는 crud.delete_note와
+    # 관리자 사용자 삭제 API가 먼저 작업 행을 정리합니다.
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    kind = Column(String)  # "media" 또는 "document"
+    status = Column(String, default="queued", index=True)  # queued, running, succeeded, failed
+    stage = Column(String, default="queued")  # 현재 진행 단계 (transcribing, summarizing 등)
+    progress = Column(Integer, default=0)  # 진행률 (0-100)
+    filename = Column(String)
+    content_type = Column(String)
+    input_path = Column(String)  # 처리 대기 중인 업로드 파일의 저장 경로
+    note_id = Column(UUID(as_uuid=True), ForeignKey("notes.id", ondelete="SET NULL"), nullable=True)
+    credits_reserved = Column(Integer, default=0)  # 작업 등록 시 예약한 크레딧 (실패하면 환불)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
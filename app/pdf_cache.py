@@ -0,0 +1,242 @@
+# /TINO-TE.ai-BETA-backend/app/pdf_cache.py
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Set, Union
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.logging_config import logger
+from app.workers import PoolSaturatedError, pdf_pool
+from app.pdf_service import PDF_TEMPLATE_VERSION, create_pdf_from_note, note_content_hash, note_to_pdf_data
+
+# --- 코드 설명 ---
+# 이 파일은 렌더링한 노트 PDF를 디스크에 저장해 두는 캐시를 담당합니다.
+# 노트는 생성 후 바뀌지 않으므로 (노트 ID, 내용 해시, 템플릿 버전)이 같으면 PDF도 같습니다.
+# 같은 노트를 여러 번 다운로드해도 ReportLab으로 다시 그리지 않고 저장된 파일을 그대로 전송합니다.
+# 파일 목록과 크기는 메모리의 LRU 색인으로 관리하므로(시작 후 처음 사용할 때 폴더를 한 번만 읽음),
+# 저장할 때마다 폴더 전체를 다시 읽지 않고 전체 크기가 PDF_CACHE_MAX_BYTES를 넘을 때만 오래된 파일부터 삭제합니다.
+# 캐시 파일은 열린 파일 핸들로 전달하므로, 전송 중에 정리로 삭제되어도 전송에는 영향이 없습니다.
+# PDF 렌더링 프로세스는 파일을 쓰기만 하고, 색인과 정리는 API 서버 프로세스에서만 합니다.
+
+
+class PdfCache:
+    """디스크 기반 PDF 캐시"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # 파일 경로 -> 크기 (오래 사용하지 않은 순서)
+        self._total = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path_for(self, note_id: uuid.UUID, content_hash: str) -> str:
+        filename = f"{note_id}-{content_hash[:32]}-v{PDF_TEMPLATE_VERSION}.pdf"
+        return os.path.join(self.directory, filename)
+
+    def open(self, note_id: uuid.UUID, content_hash: str) -> Optional[BinaryIO]:
+        """캐시된 PDF 파일을 열어 반환합니다. 없으면(정리로 삭제된 경우 포함) None을 반환합니다."""
+        if not self.enabled:
+            return None
+        try:
+            pdf_file = self._open_and_track(self.path_for(note_id, content_hash))
+        except FileNotFoundError:
+            return None
+        try:
+            # 다시 시작한 뒤에도 사용 순서를 이어 가도록 수정 시간도 갱신합니다.
+            os.utime(pdf_file.name)
+        except OSError:
+            pass
+        return pdf_file
+
+    def write(self, note_id: uuid.UUID, content_hash: str, pdf_bytes: bytes) -> Optional[str]:
+        """
+        PDF를 캐시 폴더에 저장하고 경로를 반환합니다. 저장에 실패하면 None을 반환합니다.
+        PDF 렌더링 프로세스에서 호출되므로 색인은 건드리지 않으며, add()로 등록해야 정리 대상이 됩니다.
+        """
+        if not self.enabled:
+            return None
+        path = self.path_for(note_id, content_hash)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 다른 요청이 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 이름을 바꿉니다.
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as output:
+                output.write(pdf_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"PDF 캐시 저장 실패: {e}")
+            return None
+        return path
+
+    def add(self, path: str) -> BinaryIO:
+        """write()로 저장한 파일을 열어 색인에 등록합니다."""
+        return self._open_and_track(path)
+
+    def _open_and_track(self, path: str) -> BinaryIO:
+        """
+        파일을 열고 색인의 가장 최근 위치로 옮긴 뒤, 전체 크기가 한도를 넘으면 오래된 파일부터 정리합니다.
+        먼저 열어 두므로 정리에서 이 파일이 삭제되어도 전송할 수 있습니다. 파일이 없으면 FileNotFoundError가 발생합니다.
+        """
+        with self._lock:
+            index = self._load_index()
+            self._total -= index.pop(path, 0)
+            pdf_file = open(path, "rb")
+            index[path] = os.fstat(pdf_file.fileno()).st_size
+            self._total += index[path]
+            if self._total > self.max_bytes:
+                self._evict()
+        return pdf_file
+
+    def discard(self, note_id: uuid.UUID) -> None:
+        """삭제된 노트의 캐시 파일을 지웁니다. 폴더를 다시 읽지 않고 색인에서 찾습니다."""
+        prefix = f"{note_id}-"
+        with self._lock:
+            index = self._load_index()
+            for path in [path for path in index if os.path.basename(path).startswith(prefix)]:
+                self._total -= index.pop(path)
+                self._remove(path)
+
+    def _entries(self):
+        try:
+            return [
+                entry for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".pdf")
+            ]
+        except FileNotFoundError:
+            return []
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        """처음 사용할 때 폴더를 한 번 읽어 수정 시간 순서로 색인을 만듭니다. (잠금 안에서 호출)"""
+        if self._index is None:
+            files = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+            files.sort()
+            self._index = OrderedDict((path, size) for _, path, size in files)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def _evict(self) -> None:
+        """전체 크기가 한도 안으로 들어올 때까지 가장 오래 사용하지 않은 파일부터 삭제합니다. (잠금 안에서 호출)"""
+        removed = 0
+        while self._total > self.max_bytes and self._index:
+            path, size = self._index.popitem(last=False)
+            self._total -= size
+            if self._remove(path):
+                removed += 1
+        if removed:
+            logger.info(f"PDF 캐시 {removed}개 파일을 정리했습니다.")
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+pdf_cache = PdfCache(directory=settings.PDF_CACHE_DIR, max_bytes=settings.PDF_CACHE_MAX_BYTES)
+
+
+def render_note_pdf_to_cache(note_id: uuid.UUID, note_data: Dict[str, Any]) -> Union[str, bytes]:
+    """
+    노트 PDF를 렌더링해서 캐시 폴더에 저장합니다.
+    캐시 파일 경로(str)를 반환하며, 캐시를 사용할 수 없으면 PDF 바이트(bytes)를 반환합니다.
+    """
+    pdf_bytes = create_pdf_from_note(note_data)
+    path = pdf_cache.write(note_id, note_content_hash(note_data), pdf_bytes)
+    return path if path is not None else pdf_bytes
+
+
+def _render_in_worker(note_id: uuid.UUID, note_data: Dict[str, Any]) -> Any:
+    """
+    PDF 렌더링 프로세스 풀에서 실행되는 함수입니다.
+    HTTPException은 프로세스 간에 pickle로 전달되지 않으므로 일반 예외로 바꿉니다.
+    """
+    try:
+        return render_note_pdf_to_cache(note_id, note_data)
+    except HTTPException as e:
+        raise RuntimeError(str(e.detail)) from None
+
+
+async def get_note_pdf(
+    note_id: uuid.UUID, note_data: Dict[str, Any], only_if_idle: bool = False
+) -> Union[BinaryIO, bytes]:
+    """
+    노트 PDF를 연 캐시 파일 핸들(또는 PDF 바이트)로 반환합니다. 파일 핸들은 사용한 쪽에서 닫아야 합니다.
+    캐시에 없으면 이벤트 루프를 막지 않도록 PDF 렌더링 프로세스 풀에서 만듭니다.
+    풀이 가득 차 있으면 workers.PoolSaturatedError가 발생합니다.
+    only_if_idle이면 풀에 실행 중이거나 대기 중인 작업이 하나라도 있을 때 PoolSaturatedError가 발생합니다.
+    """
+    # 파일 열기와 (처음 한 번의) 폴더 읽기가 이벤트 루프를 막지 않도록 스레드 풀에서 실행합니다.
+    pdf_file = await run_in_threadpool(pdf_cache.open, note_id, note_content_hash(note_data))
+    if pdf_file is not None:
+        return pdf_file
+
+    if only_if_idle and pdf_pool.pending:
+        raise PoolSaturatedError(f"{pdf_pool.name} 풀이 사용 중입니다.")
+
+    started = time.perf_counter()
+    pdf = await pdf_pool.run(_render_in_worker, note_id, note_data)
+    logger.info(f"PDF 렌더링 완료 ({note_id}, {(time.perf_counter() - started) * 1000:.0f}ms)")
+    if isinstance(pdf, str):
+        return await run_in_threadpool(pdf_cache.add, pdf)
+    return pdf
+
+
+def load_pdf_bytes(pdf: Union[BinaryIO, bytes]) -> bytes:
+    """get_note_pdf의 결과를 바이트로 읽습니다. 파일 핸들은 읽은 뒤 닫습니다."""
+    if isinstance(pdf, bytes):
+        return pdf
+    with pdf:
+        return pdf.read()
+
+
+# 실행 중인 미리 생성 작업 (완료 전에 가비지 컬렉션되지 않도록 참조를 보관)
+_prerender_tasks: Set[asyncio.Task] = set()
+
+
+async def _prerender(note_id: uuid.UUID, note_data: Dict[str, Any]) -> None:
+    try:
+        # 미리 생성이 대기열 자리를 차지해 사용자 다운로드가 503으로 거절되지 않도록,
+        # 풀이 완전히 비어 있을 때만 렌더링합니다.
+        pdf = await get_note_pdf(note_id, note_data, only_if_idle=True)
+        if not isinstance(pdf, bytes):
+            pdf.close()
+    except PoolSaturatedError:
+        logger.info(f"PDF 렌더링 풀이 바빠 미리 생성을 건너뜁니다 ({note_id}).")
+    except Exception as e:
+        logger.warning(f"PDF 미리 생성 실패 ({note_id}): {e}")
+
+
+def schedule_prerender(note) -> None:
+    """
+    새로 만든 노트의 PDF를 백그라운드에서 미리 만들어 둡니다.
+    이벤트 루프 안에서 호출되어야 하며, 그렇지 않으면 아무것도 하지 않습니다.
+    """
+    if not (settings.PDF_PRERENDER and pdf_cache.enabled):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_prerender(note.id, note_to_pdf_data(note)))
+    _prerender_tasks.add(task)
+    task.add_done_callback(_prerender_tasks.discard)
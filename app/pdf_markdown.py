@@ -0,0 +1,175 @@
+# /TINO-TE.ai-BETA-backend/app/pdf_markdown.py
+
+import re
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Flowable, HRFlowable, Paragraph
+
+# --- 코드 설명 ---
+# 이 파일은 노트 요약(마크다운)과 원문(일반 텍스트)을 ReportLab 플로어블 목록으로 변환합니다.
+# 한 줄씩 한 번만 읽으면서 제목, 글머리 기호 목록, 문단을 각각 작은 Paragraph로 만들기 때문에
+# 긴 노트도 하나의 거대한 Paragraph 없이 레이아웃되어 처리 시간이 길이에 비례합니다.
+# 모든 텍스트는 XML 이스케이프한 뒤 굵게/기울임/코드 태그만 짝을 맞춰 추가합니다.
+
+# 하나의 Paragraph에 넣을 최대 글자 수 (넘으면 여러 Paragraph로 나눕니다)
+MAX_PARAGRAPH_CHARS = 1500
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+BULLET_RE = re.compile(r"^(\s*)[-*+•]\s+(.*)$")
+ORDERED_RE = re.compile(r"^(\s*)(\d+)[.)]\s+(.*)$")
+RULE_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+INLINE_RE = re.compile(
+    r"\*\*(?P<bold>.+?)\*\*"
+    r"|__(?P<bold2>.+?)__"
+    r"|`(?P<code>[^`]+)`"
+    r"|(?<![\w*])\*(?P<italic>[^\s*](?:[^*]*[^\s*])?)\*(?![\w*])"
+)
+
+
+class MarkdownStyles:
+    """마크다운 요소별 ParagraphStyle 모음"""
+
+    def __init__(
+        self,
+        body: ParagraphStyle,
+        headings: Dict[int, ParagraphStyle],
+        bullets: List[ParagraphStyle],
+        code_font: str = "Courier",
+    ):
+        self.body = body
+        self.headings = headings  # 제목 수준(1~6) → 스타일 (없는 수준은 가장 가까운 하위 수준 사용)
+        self.bullets = bullets  # 들여쓰기 수준별 목록 스타일
+        self.code_font = code_font
+
+    def heading(self, level: int) -> ParagraphStyle:
+        for candidate in range(level, 0, -1):
+            if candidate in self.headings:
+                return self.headings[candidate]
+        return self.body
+
+    def bullet(self, depth: int) -> ParagraphStyle:
+        return self.bullets[min(depth, len(self.bullets) - 1)]
+
+
+def render_inline(text: str, code_font: str = "Courier") -> str:
+    """한 줄의 텍스트를 이스케이프하고 굵게/기울임/코드 표시를 ReportLab 태그로 바꿉니다."""
+    parts = []
+    position = 0
+    for match in INLINE_RE.finditer(text):
+        parts.append(escape(text[position:match.start()]))
+        if match.group("bold") is not None or match.group("bold2") is not None:
+            inner = match.group("bold") if match.group("bold") is not None else match.group("bold2")
+            parts.append(f"<b>{render_inline(inner, code_font)}</b>")
+        elif match.group("code") is not None:
+            parts.append(f'<font face="{code_font}">{escape(match.group("code"))}</font>')
+        else:
+            parts.append(f"<i>{render_inline(match.group('italic'), code_font)}</i>")
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return "".join(parts)
+
+
+def _split_long_line(line: str, limit: int) -> List[str]:
+    """너무 긴 한 줄을 공백 위치에서 limit 글자 이하로 나눕니다."""
+    pieces = []
+    while len(line) > limit:
+        cut = line.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip()
+    pieces.append(line)
+    return pieces
+
+
+class _ParagraphBuffer:
+    """이어지는 줄을 모아 MAX_PARAGRAPH_CHARS 이하의 Paragraph로 내보냅니다."""
+
+    def __init__(self, flowables: List[Flowable], style: ParagraphStyle):
+        self.flowables = flowables
+        self.style = style
+        self.lines: List[str] = []
+        self.size = 0
+
+    def add(self, markup: str) -> None:
+        if self.lines and self.size + len(markup) > MAX_PARAGRAPH_CHARS:
+            self.flush()
+        self.lines.append(markup)
+        self.size += len(markup)
+
+    def flush(self) -> None:
+        if self.lines:
+            self.flowables.append(Paragraph("<br/>".join(self.lines), self.style))
+            self.lines = []
+            self.size = 0
+
+
+def markdown_to_flowables(text: Optional[str], styles: MarkdownStyles) -> List[Flowable]:
+    """
+    마크다운 텍스트를 플로어블 목록으로 변환합니다.
+    지원: # 제목, -/*/+ 글머리 목록, 1. 번호 목록, --- 구분선, **굵게**, *기울임*, `코드`
+    """
+    flowables: List[Flowable] = []
+    paragraph = _ParagraphBuffer(flowables, styles.body)
+
+    for raw_line in (text or "").splitlines():
+        line = raw_line.rstrip()
+        if not line.strip():
+            paragraph.flush()
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            paragraph.flush()
+            level = len(heading.group(1))
+            flowables.append(Paragraph(render_inline(heading.group(2), styles.code_font), styles.heading(level)))
+            continue
+
+        if RULE_RE.match(line):
+            paragraph.flush()
+            flowables.append(HRFlowable(width="100%", thickness=0.5, spaceBefore=4, spaceAfter=8))
+            continue
+
+        bullet = BULLET_RE.match(line)
+        ordered = None if bullet else ORDERED_RE.match(line)
+        if bullet or ordered:
+            paragraph.flush()
+            indent = (bullet or ordered).group(1)
+            depth = len(indent.expandtabs(4)) // 2
+            if bullet:
+                marker, content = "•", bullet.group(2)
+            else:
+                marker, content = f"{ordered.group(2)}.", ordered.group(3)
+            for index, piece in enumerate(_split_long_line(content, MAX_PARAGRAPH_CHARS)):
+                flowables.append(Paragraph(
+                    render_inline(piece, styles.code_font),
+                    styles.bullet(depth),
+                    bulletText=marker if index == 0 else None,
+                ))
+            continue
+
+        for piece in _split_long_line(line.strip(), MAX_PARAGRAPH_CHARS):
+            paragraph.add(render_inline(piece, styles.code_font))
+
+    paragraph.flush()
+    return flowables
+
+
+def plain_text_to_flowables(text: Optional[str], style: ParagraphStyle) -> List[Flowable]:
+    """
+    전사 내용 같은 일반 텍스트를 플로어블 목록으로 변환합니다.
+    마크다운 기호는 해석하지 않고 그대로 표시하며, 빈 줄마다 문단을 나눕니다.
+    """
+    flowables: List[Flowable] = []
+    paragraph = _ParagraphBuffer(flowables, style)
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            paragraph.flush()
+            continue
+        for piece in _split_long_line(line, MAX_PARAGRAPH_CHARS):
+            paragraph.add(escape(piece))
+    paragraph.flush()
+    return flowables
@@ -2,7 +2,11 @@
 
 import io
 import base64
-from typing import Dict, Any
+import hashlib
+import threading
+from typing import BinaryIO, Dict, Any, Iterator, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape
 from fastapi import HTTPException
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -13,23 +17,34 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import os
 
+from app.pdf_markdown import MarkdownStyles, markdown_to_flowables, plain_text_to_flowables
+
 
 # 한글 폰트 설정 (AWS Lambda에서 사용 가능한 방법)
+KOREAN_FONT_NAME = "Korean"
+
+# 한글 폰트 후보 경로 (앞에서부터 처음 발견된 폰트를 사용)
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",  # Ubuntu/Debian
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Railway 기본
+    "/System/Library/Fonts/AppleGothic.ttf",  # macOS
+    "C:/Windows/Fonts/malgun.ttf",  # Windows
+]
+
+
 def setup_korean_font():
-    """한글 폰트를 설정합니다. Railway 환경에서도 작동합니다."""
+    """
+    한글 폰트를 설정합니다. Railway 환경에서도 작동합니다.
+    TTF 파일 파싱은 오래 걸리므로 프로세스당 한 번만 등록하고, 이후에는 등록된 폰트를 그대로 사용합니다.
+    """
+    if KOREAN_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return KOREAN_FONT_NAME
     try:
         # Railway/클라우드 환경용 폰트 경로들
-        font_paths = [
-            "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",  # Ubuntu/Debian
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Railway 기본
-            "/System/Library/Fonts/AppleGothic.ttf",  # macOS
-            "C:/Windows/Fonts/malgun.ttf",  # Windows
-        ]
-
-        for font_path in font_paths:
+        for font_path in FONT_PATHS:
             if os.path.exists(font_path):
-                pdfmetrics.registerFont(TTFont("Korean", font_path))
-                return "Korean"
+                pdfmetrics.registerFont(TTFont(KOREAN_FONT_NAME, font_path))
+                return KOREAN_FONT_NAME
 
         # 폰트를 찾지 못한 경우 기본 폰트 사용
         return "Helvetica"
@@ -38,91 +53,145 @@ def setup_korean_font():
         return "Helvetica"
 
 
-def create_pdf_from_note(note_data: Dict[str, Any]) -> bytes:
+class PdfRenderContext:
     """
-    노트 데이터로부터 PDF를 생성합니다.
-    AWS Lambda에서도 작동하도록 설계되었습니다.
+    PDF 렌더링에 필요한 폰트와 스타일을 미리 준비해 두는 객체.
+    폰트 등록과 스타일시트 생성은 한 번만 하고, 모든 PDF 생성에서 재사용합니다.
     """
-    try:
-        # 메모리 버퍼 생성
-        buffer = io.BytesIO()
 
-        # PDF 문서 생성
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18,
-        )
-
-        # 스타일 설정
-        styles = getSampleStyleSheet()
-        korean_font = setup_korean_font()
+    def __init__(self):
+        self.font_name = setup_korean_font()
+        self.styles = getSampleStyleSheet()
 
         # 커스텀 스타일 생성
-        title_style = ParagraphStyle(
+        self.title_style = ParagraphStyle(
             "CustomTitle",
-            parent=styles["Heading1"],
-            fontName=korean_font,
+            parent=self.styles["Heading1"],
+            fontName=self.font_name,
             fontSize=18,
             spaceAfter=30,
             alignment=TA_CENTER,
         )
 
-        heading_style = ParagraphStyle(
+        self.heading_style = ParagraphStyle(
             "CustomHeading",
-            parent=styles["Heading2"],
-            fontName=korean_font,
+            parent=self.styles["Heading2"],
+            fontName=self.font_name,
             fontSize=14,
             spaceAfter=12,
             spaceBefore=20,
         )
 
-        body_style = ParagraphStyle(
+        self.body_style = ParagraphStyle(
             "CustomBody",
-            parent=styles["Normal"],
-            fontName=korean_font,
+            parent=self.styles["Normal"],
+            fontName=self.font_name,
             fontSize=10,
             spaceAfter=12,
             leading=14,
         )
 
+        # 요약(마크다운) 안의 제목과 목록용 스타일
+        self.markdown_styles = MarkdownStyles(
+            body=ParagraphStyle(
+                "MarkdownBody", parent=self.body_style, spaceAfter=6,
+            ),
+            headings={
+                level: ParagraphStyle(
+                    f"MarkdownHeading{level}",
+                    parent=self.body_style,
+                    fontSize=size,
+                    leading=size + 4,
+                    spaceBefore=10,
+                    spaceAfter=4,
+                )
+                for level, size in ((1, 14), (2, 12.5), (3, 11))
+            },
+            bullets=[
+                ParagraphStyle(
+                    f"MarkdownBullet{depth}",
+                    parent=self.body_style,
+                    leftIndent=14 + depth * 14,
+                    bulletIndent=4 + depth * 14,
+                    spaceAfter=3,
+                )
+                for depth in range(3)
+            ],
+        )
+
+
+_render_context: Optional[PdfRenderContext] = None
+_render_context_lock = threading.Lock()
+
+
+def get_render_context() -> PdfRenderContext:
+    """
+    프로세스에서 공유하는 렌더링 컨텍스트를 반환합니다.
+    서버 시작 시 미리 만들어 두며, 다른 프로세스(작업 풀 등)에서는 처음 사용할 때 만들어집니다.
+    """
+    global _render_context
+    if _render_context is None:
+        with _render_context_lock:
+            if _render_context is None:
+                _render_context = PdfRenderContext()
+    return _render_context
+
+
+def create_pdf_from_note(note_data: Dict[str, Any]) -> bytes:
+    """
+    노트 데이터로부터 PDF를 생성합니다.
+    AWS Lambda에서도 작동하도록 설계되었습니다.
+    """
+    try:
+        # 메모리 버퍼 생성
+        buffer = io.BytesIO()
+
+        # PDF 문서 생성
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18,
+        )
+
+        # 미리 준비된 폰트와 스타일 사용
+        context = get_render_context()
+        title_style = context.title_style
+        heading_style = context.heading_style
+        body_style = context.body_style
+
         # PDF 내용 구성
         story = []
 
         # 제목
-        story.append(Paragraph(note_data.get("title", "제목 없음"), title_style))
+        story.append(Paragraph(escape(note_data.get("title") or "제목 없음"), title_style))
         story.append(Spacer(1, 12))
 
         # 메타 정보
-        meta_info = f"생성일: {note_data.get('created_at', '')}<br/>타입: {note_data.get('note_type', '').upper()}"
+        meta_info = (
+            f"생성일: {escape(str(note_data.get('created_at') or ''))}"
+            f"<br/>타입: {escape((note_data.get('note_type') or '').upper())}"
+        )
         story.append(Paragraph(meta_info, body_style))
         story.append(Spacer(1, 20))
 
-        # 요약 섹션
+        # 요약 섹션 (마크다운을 제목/목록/문단 단위의 작은 플로어블로 변환)
         story.append(Paragraph("📝 요약", heading_style))
-        summary_text = note_data.get("summary", "요약 내용이 없습니다.")
-        # HTML 태그 제거 및 마크다운 간단 처리
-        summary_text = summary_text.replace("**", "<b>").replace("**", "</b>")
-        summary_text = summary_text.replace("###", "<br/><b>").replace("\n", "<br/>")
-        story.append(Paragraph(summary_text, body_style))
+        summary_text = note_data.get("summary") or "요약 내용이 없습니다."
+        story.extend(markdown_to_flowables(summary_text, context.markdown_styles))
         story.append(Spacer(1, 20))
 
-        # 원본 텍스트 섹션
+        # 원본 텍스트 섹션 (문단 단위로 나누므로 길이 제한 없이 전체를 넣습니다)
         original_title = (
             "🎤 전사 내용"
             if note_data.get("note_type") == "audio"
             else "📄 원본 텍스트"
         )
         story.append(Paragraph(original_title, heading_style))
-        original_text = note_data.get("original_transcription", "원본 내용이 없습니다.")
-        # 긴 텍스트 처리
-        if len(original_text) > 3000:
-            original_text = original_text[:3000] + "...(내용이 길어 일부만 표시됩니다)"
-        original_text = original_text.replace("\n", "<br/>")
-        story.append(Paragraph(original_text, body_style))
+        original_text = note_data.get("original_transcription") or "원본 내용이 없습니다."
+        story.extend(plain_text_to_flowables(original_text, body_style))
 
         # PDF 생성
         doc.build(story)
@@ -149,7 +218,7 @@ def create_pdf_endpoint_handler(note_data: Dict[str, Any]) -> Dict[str, str]:
 
         return {
             "pdf_data": pdf_base64,
-            "filename": f"{note_data.get('title', 'note')}.pdf",
+            "filename": pdf_filename(note_data),
             "content_type": "application/pdf",
         }
 
@@ -157,26 +226,55 @@ def create_pdf_endpoint_handler(note_data: Dict[str, Any]) -> Dict[str, str]:
         raise HTTPException(status_code=500, detail=f"PDF 생성 실패: {str(e)}")
 
 
-# AWS Lambda용 경량화 버전
-def create_simple_pdf(title: str, summary: str, content: str) -> bytes:
+# PDF 레이아웃이 바뀌면 올려서 캐시된 이전 PDF를 사용하지 않도록 합니다.
+PDF_TEMPLATE_VERSION = "2"
+
+# 스트리밍 응답으로 PDF를 보낼 때 한 번에 전송할 크기
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def note_to_pdf_data(note) -> Dict[str, Any]:
+    """노트 모델을 PDF 생성에 필요한 딕셔너리로 변환합니다. (원문/요약이 로드되어 있어야 합니다)"""
+    return {
+        "title": note.title,
+        "summary": note.summary,
+        "original_transcription": note.original_transcription,
+        "note_type": note.note_type,
+        "created_at": note.created_at.strftime("%Y-%m-%d %H:%M:%S") if note.created_at else "",
+    }
+
+
+def note_content_hash(note_data: Dict[str, Any]) -> str:
+    """PDF에 들어가는 노트 내용으로 SHA-256 해시를 만듭니다. 내용이 같으면 PDF도 같습니다."""
+    digest = hashlib.sha256()
+    for field in ("title", "created_at", "note_type", "summary", "original_transcription"):
+        value = str(note_data.get(field) or "")
+        digest.update(value.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def pdf_filename(note_data: Dict[str, Any]) -> str:
+    return f"{note_data.get('title') or 'note'}.pdf"
+
+
+def content_disposition(filename: str) -> str:
     """
-    AWS Lambda 환경을 위한 간단한 PDF 생성 함수
+    한글 파일명도 깨지지 않도록 RFC 5987 형식(filename*)을 함께 넣은 Content-Disposition 값을 만듭니다.
     """
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-
-    styles = getSampleStyleSheet()
-    story = []
-
-    # 간단한 구조로 PDF 생성
-    story.append(Paragraph(title, styles["Title"]))
-    story.append(Spacer(1, 12))
-    story.append(Paragraph("요약", styles["Heading2"]))
-    story.append(Paragraph(summary, styles["Normal"]))
-    story.append(Spacer(1, 12))
-    story.append(Paragraph("내용", styles["Heading2"]))
-    story.append(Paragraph(content[:2000], styles["Normal"]))  # 길이 제한
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace('"', "'")
+    return f'attachment; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename)}'
+
+
+def iter_pdf_chunks(pdf_bytes: bytes) -> Iterator[bytes]:
+    """PDF 바이트를 일정 크기로 나누어 전달합니다. 전체를 다시 복사하지 않고 조각만 만듭니다."""
+    view = memoryview(pdf_bytes)
+    for start in range(0, len(view), PDF_STREAM_CHUNK_SIZE):
+        yield bytes(view[start:start + PDF_STREAM_CHUNK_SIZE])
+
+
+def iter_pdf_file(pdf_file: BinaryIO) -> Iterator[bytes]:
+    """열린 PDF 파일을 일정 크기로 나누어 전달하고, 다 읽으면 닫습니다."""
+    with pdf_file:
+        while chunk := pdf_file.read(PDF_STREAM_CHUNK_SIZE):
+            yield chunk
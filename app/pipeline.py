@@ -0,0 +1,130 @@
+# /TINO-TE.ai-BETA-backend/app/pipeline.py
+
+import os
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud_async, models, schemas, upstream
+from app.cache import transcribe_media_cached, extract_document_text_cached, summarize_text_cached
+from app.ingestion import IngestedUpload
+from app.pdf_cache import schedule_prerender
+
+# --- 코드 설명 ---
+# 이 파일은 업로드된 파일로부터 노트를 만드는 전체 과정(전사/추출 → 요약 → 저장)을 담고 있습니다.
+# 동기 API(/api/v1/notes/from-*)와 백그라운드 작업(jobs.py)이 같은 과정을 공유합니다.
+# 업로드 파일은 호출하는 쪽에서 ingestion.ingest_upload로 받아(크기/형식 확인, 해시 계산) 전달하고,
+# 크레딧은 credits.credit_reservation으로 미리 예약합니다.
+
+MEDIA_NOTE_CREDITS = 10
+DOCUMENT_NOTE_CREDITS = 5
+NOTE_CREDITS = {"media": MEDIA_NOTE_CREDITS, "document": DOCUMENT_NOTE_CREDITS}
+
+DOCUMENT_EXTENSIONS = ['.pdf', '.docx', '.doc', '.txt']
+
+# 진행 단계와 진행률(%)을 전달받는 콜백 타입
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+
+async def _report(progress: Optional[ProgressCallback], stage: str, percent: int) -> None:
+    if progress is not None:
+        await progress(stage, percent)
+
+
+def validate_media_file(file: UploadFile) -> None:
+    """오디오/비디오 파일인지 확인합니다."""
+    content_type = file.content_type or ""
+    if not content_type.startswith("audio/") and not content_type.startswith("video/"):
+        raise HTTPException(
+            status_code=400,
+            detail="지원하지 않는 파일 형식입니다. 오디오 또는 비디오 파일을 업로드해주세요."
+        )
+
+
+def validate_document_file(file: UploadFile) -> None:
+    """지원하는 문서 확장자인지 확인합니다."""
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    if file_extension not in DOCUMENT_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail="지원하지 않는 파일 형식입니다. PDF, DOCX, DOC, TXT 파일만 업로드해주세요."
+        )
+
+
+async def save_note(
+    db: AsyncSession,
+    user_id: int,
+    title: str,
+    text: str,
+    summary: str,
+    note_type: str,
+    media_duration_seconds: Optional[float] = None,
+) -> models.Note:
+    """요약 결과로 노트를 만들어 저장합니다. 미디어 길이를 알 수 없으면 0으로 기록합니다."""
+    note_data = schemas.Note(
+        id=uuid.uuid4(),
+        title=title,
+        original_transcription=text,
+        summary=summary,
+        media_duration_seconds=media_duration_seconds or 0,
+        note_type=note_type,
+        created_at=datetime.now()
+    )
+    created_note = await crud_async.create_note_for_user(db=db, note=note_data, user_id=user_id)
+    # 다운로드 요청이 오기 전에 PDF를 백그라운드에서 미리 만들어 둡니다.
+    schedule_prerender(created_note)
+    return created_note
+
+
+async def build_note_from_media(
+    db: AsyncSession, user_id: int, upload: IngestedUpload, progress: Optional[ProgressCallback] = None
+) -> models.Note:
+    """미디어 파일을 전사하고 요약하여 노트를 저장합니다."""
+    # 이 작업의 AI 요청을 사용자별 공정 대기열에 줄 세웁니다.
+    upstream.set_current_user(user_id)
+    await _report(progress, "transcribing", 10)
+    # 같은 파일/텍스트의 결과가 캐시에 있으면 외부 API를 호출하지 않습니다.
+    transcription = await transcribe_media_cached(db, upload)
+
+    await _report(progress, "summarizing", 60)
+    summarized_result = await summarize_text_cached(db, transcription)
+
+    await _report(progress, "saving", 90)
+    created_note = await save_note(
+        db, user_id, summarized_result["title"], transcription, summarized_result["summary"], "audio",
+        upload.duration_seconds
+    )
+    return created_note
+
+
+async def build_note_from_document(
+    db: AsyncSession, user_id: int, upload: IngestedUpload, progress: Optional[ProgressCallback] = None
+) -> models.Note:
+    """문서에서 텍스트를 추출하고 요약하여 노트를 저장합니다."""
+    upstream.set_current_user(user_id)
+    try:
+        # 문서에서 텍스트 추출
+        await _report(progress, "extracting", 10)
+        text = await extract_document_text_cached(db, upload)
+
+        # OpenAI API로 요약 (긴 문서는 잘라내지 않고 map-reduce로 요약)
+        await _report(progress, "summarizing", 40)
+        summarized_result = await summarize_text_cached(db, text)
+
+        # 노트 생성
+        await _report(progress, "saving", 90)
+        created_note = await save_note(
+            db, user_id, summarized_result["title"], text, summarized_result["summary"], "document"
+        )
+        return created_note
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"문서 처리 중 오류가 발생했습니다: {str(e)}"
+        )
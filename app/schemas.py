@@ -1,6 +1,7 @@
 # /TINO-TE.ai-BETA-backend/app/schemas.py
 
 from pydantic import BaseModel
+from typing import List, Literal, Optional
 import uuid
 from datetime import datetime
 
@@ -22,6 +23,56 @@ class Note(NoteBase):
         from_attributes = True
 
 
+class NoteSummary(BaseModel):
+    """노트 목록에 표시할 요약 정보 (긴 본문 없이 미리보기만 포함)"""
+
+    id: uuid.UUID
+    title: str
+    note_type: str
+    created_at: datetime
+    preview: str = ""  # 요약의 앞부분
+
+    class Config:
+        from_attributes = True
+
+
+class NotePage(BaseModel):
+    """커서 기반 노트 목록 한 페이지"""
+
+    items: List[NoteSummary]
+    next_cursor: Optional[str] = None  # 다음 페이지를 요청할 때 cursor로 전달 (없으면 마지막 페이지)
+
+
+class NoteExportRequest(BaseModel):
+    """
+    노트 일괄 내보내기 요청.
+    note_ids를 지정하거나, 생성일 범위(created_from ~ created_to)로 노트를 고릅니다.
+    """
+
+    note_ids: Optional[List[uuid.UUID]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    formats: List[Literal["pdf", "markdown"]] = ["pdf"]
+
+
+class Job(BaseModel):
+    """노트 생성 백그라운드 작업의 상태를 나타내는 모델"""
+
+    id: uuid.UUID
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    stage: str
+    progress: int
+    filename: Optional[str] = None
+    note_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # --- [추가] 로그인 및 사용자 생성을 위한 모델 ---
 
 
@@ -55,12 +106,16 @@ class Token(BaseModel):
 
 
 class User(UserBase):
-    """데이터베이스에서 읽어온 사용자 정보를 나타내는 모델"""
+    """
+    데이터베이스에서 읽어온 사용자 정보를 나타내는 모델.
+    노트 본문은 포함하지 않으며, 노트 수와 노트 요약 목록은 요청한 경우에만 채워집니다.
+    """
 
-    id: uuid.UUID
+    id: int
     api_key: str
     daily_credits: int  # 데이터베이스 필드명과 일치
-    notes: list[Note] = []  # 사용자가 작성한 노트 목록
+    note_count: Optional[int] = None  # 사용자가 작성한 노트 수
+    notes: Optional[List[NoteSummary]] = None  # ?include=notes_summary로 요청한 경우의 노트 요약 목록
 
     class Config:
         from_attributes = True
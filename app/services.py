@@ -1,15 +1,23 @@
 # /TINO-TE.ai-BETA-backend/app/services.py
 
-import httpx
+import asyncio
 import os
-import tempfile
-from fastapi import HTTPException, UploadFile
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, List, Optional, Union
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 import PyPDF2
 import docx
 import io
 
 # 우리가 만든 설정 파일에서 API 키를 안전하게 가져옵니다.
 from app.config import settings
+from app.http_client import get_http_client
+from app import media, upstream
+from app.ingestion import IngestedUpload
+from app.logging_config import logger
+from app.workers import WorkerCrashedError, extraction_pool
 
 # --- 코드 설명 ---
 # 이 파일은 외부 서비스(OpenAI, DeepSeek)와 통신하는
@@ -20,121 +28,293 @@ from app.config import settings
 WHISPER_API_URL = "https://api.openai.com/v1/audio/transcriptions"
 DEEPSEEK_API_URL = "https://api.deepseek.com/chat/completions"
 
-async def transcribe_media_with_whisper(file: UploadFile) -> str:
-    """Whisper API를 호출하여 미디어 파일의 음성을 텍스트로 변환합니다."""
+WHISPER_MODEL = "whisper-1"
+TRANSCRIPTION_LANGUAGE = "ko"
+SUMMARY_MODEL = "gpt-4o-mini"
+
+# 프롬프트나 결과 형식을 바꾸면 버전을 올려야 이전 캐시 결과가 재사용되지 않습니다.
+TRANSCRIPTION_PROMPT_VERSION = "1"
+SUMMARY_PROMPT_VERSION = "1"
+
+async def _request_whisper(
+    filename: str,
+    content: Union[bytes, BinaryIO],
+    content_type: str,
+    size: int,
+    prompt: Optional[str] = None,
+    seconds: Optional[float] = None,
+) -> str:
+    """
+    오디오 데이터 하나를 Whisper API로 전송하고 전사 결과를 반환합니다.
+    content가 파일 핸들이면 요청 본문을 만들 때 파일에서 조금씩 읽어 전송합니다.
+    요청은 upstream 스케줄러의 Whisper 대기열을 거치며, 오디오 길이(seconds)가 짧을수록 먼저 전송됩니다.
+    """
+    # 프로세스 전체에서 공유하는 HTTP 클라이언트(연결 풀)를 사용합니다.
+    client = get_http_client()
+    logger.debug(f"Whisper 전송 파일: {size} bytes, {content_type}")
+
+    # Whisper API는 'multipart/form-data' 형식으로 파일을 받습니다.
+    files = {'file': (filename, content, content_type)}
+    headers = {'Authorization': f'Bearer {settings.OPENAI_API_KEY}'}
+
+    # 최적화된 전사 설정 (속도와 품질의 균형)
+    data = {
+        'model': WHISPER_MODEL,
+        'language': TRANSCRIPTION_LANGUAGE,  # 한국어 설정으로 전사 품질 향상
+        'temperature': 0.0,  # 가장 일관성 있는 전사를 위해 0으로 설정
+        'response_format': 'text'  # 텍스트 형식으로 응답 (JSON보다 빠름)
+    }
+    if prompt:
+        data['prompt'] = prompt
+
+    async def request():
+        # 429 응답 후 재시도할 때는 파일을 처음부터 다시 보냅니다.
+        if not isinstance(content, bytes):
+            content.seek(0)
+        logger.debug("Whisper API 요청 시작")
+        return await client.post(
+            WHISPER_API_URL, headers=headers, files=files, data=data, timeout=180
+        )
+
+    # 길이를 모르면 파일 크기로 추정해 대기열 순서를 정합니다.
+    cost = seconds if seconds else size / upstream.WHISPER_BYTES_PER_SECOND
+    response = await upstream.send(WHISPER_MODEL, request, cost)
+
+    # 요청이 실패하면 에러를 발생시킵니다.
+    if response.status_code != 200:
+        logger.warning(f"Whisper API 오류: {response.status_code} {response.text[:500]}")
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Whisper API Error: {response.text}"
+        )
+
+    # 성공하면, JSON 응답에서 'text' 필드를 추출하여 반환합니다.
+    if response.headers.get('content-type', '').startswith('application/json'):
+        result = response.json()
+        transcription = result.get("text", "")
+    else:
+        # response_format이 'text'인 경우 직접 텍스트 반환
+        transcription = response.text
+
+    # 전사 내용은 사용자 데이터이므로 로그에는 길이만 남깁니다.
+    logger.info(f"Whisper 전사 완료: {len(transcription)}자")
+    return transcription
+
+async def _transcribe_in_segments(path: str, duration: float, prompt: Optional[str] = None) -> str:
+    """
+    긴 미디어를 겹치는 시간 구간으로 나누어 동시에 전사한 뒤 순서대로 이어 붙입니다.
+    동시에 진행되는 구간 수는 세마포어로 제한합니다.
+    """
+    segments = media.plan_segments(
+        duration,
+        settings.WHISPER_SEGMENT_SECONDS,
+        settings.WHISPER_SEGMENT_OVERLAP_SECONDS,
+    )
+    logger.info(f"구간 전사 시작: {duration:.1f}초, {len(segments)}개 구간")
+    semaphore = asyncio.Semaphore(settings.WHISPER_MAX_PARALLEL_SEGMENTS)
+
+    extension, content_type, _, _ = media.audio_format()
+
+    async def transcribe_segment(index: int, start: float, length: float) -> str:
+        async with semaphore:
+            audio = await media.extract_audio_segment(path, start, length)
+            return await _request_whisper(
+                f"segment_{index}{extension}", audio, content_type, len(audio), prompt, seconds=length
+            )
+
+    parts = await asyncio.gather(
+        *(transcribe_segment(i, start, length) for i, (start, length) in enumerate(segments))
+    )
+    return media.stitch_transcripts(parts)
+
+async def _transcribe_file(
+    path: str,
+    filename: str,
+    content_type: str,
+    size: int,
+    prompt: Optional[str] = None,
+    duration: Optional[float] = None,
+) -> str:
+    """
+    디스크의 미디어 파일을 길이에 따라 한 번에 또는 구간별로 전사합니다.
+    duration을 이미 알고 있으면 ffprobe를 다시 실행하지 않습니다.
+    """
+    if duration is None:
+        duration = await media.probe_duration(path)
+    is_short = duration is not None and duration <= settings.WHISPER_SEGMENT_SECONDS
+    if size <= settings.WHISPER_MAX_UPLOAD_BYTES and (duration is None or is_short):
+        with open(path, "rb") as audio_file:
+            return await _request_whisper(filename, audio_file, content_type, size, prompt, seconds=duration)
+
+    if duration is None:
+        raise HTTPException(
+            status_code=400,
+            detail="미디어 길이를 확인할 수 없는 파일입니다."
+        )
+    return await _transcribe_in_segments(path, duration, prompt)
+
+async def transcribe_media_with_whisper(upload: IngestedUpload, prompt: Optional[str] = None) -> str:
+    """
+    Whisper API를 호출하여 미디어 파일의 음성을 텍스트로 변환합니다.
+    업로드 시 헤더로 확인한 길이가 MEDIA_DIRECT_MAX_SECONDS 이하인 작은 오디오 파일은 변환 없이 바로 전송하고,
+    동영상과 긴 파일은 ffmpeg가 있으면 오디오 트랙만 작은 형식으로 압축한 뒤
+    짧으면 한 번에 전송하고 길면 구간별로 나누어 병렬로 전사합니다.
+    """
     
     try:
-        # httpx를 사용해 비동기 HTTP 클라이언트를 생성합니다.
-        async with httpx.AsyncClient() as client:
-            # 파일 내용을 읽습니다
-            file_content = await file.read()
-            print(f"파일 크기: {len(file_content)} bytes")
-            print(f"파일 타입: {file.content_type}")
-            
-            # Whisper API는 'multipart/form-data' 형식으로 파일을 받습니다.
-            files = {'file': (file.filename, file_content, file.content_type)}
-            headers = {'Authorization': f'Bearer {settings.OPENAI_API_KEY}'}
-            
-            # 최적화된 전사 설정 (속도와 품질의 균형)
-            data = {
-                'model': 'whisper-1',
-                'language': 'ko',  # 한국어 설정으로 전사 품질 향상
-                'temperature': 0.0,  # 가장 일관성 있는 전사를 위해 0으로 설정
-                'response_format': 'text'  # 텍스트 형식으로 응답 (JSON보다 빠름)
-            }
-
-            print(f"Whisper API 요청 시작...")
-            
-            # Whisper API에 POST 요청을 보냅니다.
-            response = await client.post(
-                WHISPER_API_URL, headers=headers, files=files, data=data, timeout=180
+        is_short_audio = (
+            upload.content_type.startswith("audio/")
+            and upload.duration_seconds is not None
+            and upload.duration_seconds <= settings.MEDIA_DIRECT_MAX_SECONDS
+            and upload.size <= settings.WHISPER_MAX_UPLOAD_BYTES
+        )
+        # 짧은 오디오 파일이나 ffmpeg가 없을 때(구간 분할 불가)는 원본을 한 번에 전송합니다.
+        if is_short_audio or not media.ffmpeg_available():
+            if upload.size > settings.WHISPER_MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail="파일 크기가 너무 큽니다. 25MB 이하의 파일을 업로드해주세요."
+                )
+            return await _request_whisper(
+                upload.filename, upload.rewind(), upload.content_type, upload.size, prompt,
+                seconds=upload.duration_seconds
             )
 
-            print(f"Whisper API 응답 상태: {response.status_code}")
-            
-            # 요청이 실패하면 에러를 발생시킵니다.
-            if response.status_code != 200:
-                print(f"Whisper API 오류: {response.text}")
+        async with upload.as_path() as source_path:
+            # 헤더로 길이를 알 수 없는 형식(AVI, AAC 등)은 ffprobe로 한 번만 조회해 노트에도 기록합니다.
+            if upload.duration_seconds is None:
+                upload.duration_seconds = await media.probe_duration(source_path)
+
+            if not settings.MEDIA_PREPROCESS:
+                return await _transcribe_file(
+                    source_path, upload.filename, upload.content_type, upload.size, prompt,
+                    duration=upload.duration_seconds
+                )
+
+            # 오디오 트랙만 모노 16kHz로 압축해 전송할 데이터를 줄입니다.
+            try:
+                async with media.compact_audio(
+                    source_path, settings.MEDIA_TRIM_SILENCE, upload.duration_seconds
+                ) as audio:
+                    if audio is None:
+                        return await _transcribe_file(
+                            source_path, upload.filename, upload.content_type, upload.size, prompt,
+                            duration=upload.duration_seconds
+                        )
+                    base_name = os.path.splitext(upload.filename or "audio")[0]
+                    if not settings.VAD_ENABLED:
+                        return await _transcribe_file(
+                            audio.path, f"{base_name}{audio.extension}", audio.content_type,
+                            os.path.getsize(audio.path), prompt, duration=audio.duration
+                        )
+                    # 긴 무음을 빼고 말소리 구간만 전송합니다.
+                    # 전사 결과는 시각 정보 없는 텍스트로 저장하므로 원본 시각 변환(TimestampMap)은 쓰지 않습니다.
+                    async with media.speech_only_audio(audio) as (speech, _):
+                        return await _transcribe_file(
+                            speech.path, f"{base_name}{speech.extension}", speech.content_type,
+                            os.path.getsize(speech.path), prompt, duration=speech.duration
+                        )
+            except media.NoAudioStreamError:
                 raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Whisper API Error: {response.text}"
+                    status_code=400,
+                    detail="오디오 트랙이 없는 파일입니다."
                 )
 
-            # 성공하면, JSON 응답에서 'text' 필드를 추출하여 반환합니다.
-            if response.headers.get('content-type', '').startswith('application/json'):
-                result = response.json()
-                transcription = result.get("text", "")
-            else:
-                # response_format이 'text'인 경우 직접 텍스트 반환
-                transcription = response.text
-                
-            print(f"전사 결과: {transcription[:100]}...")
-            return transcription
-            
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Whisper API 호출 중 예외 발생: {str(e)}")
+        logger.error(f"Whisper API 호출 중 예외 발생: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"음성 전사 중 오류가 발생했습니다: {str(e)}"
         )
 
-async def extract_text_from_document(file: UploadFile) -> str:
+def _open_source(source: Union[bytes, str]):
+    """프로세스 풀에 전달된 문서(작은 파일은 바이트, 큰 파일은 경로)를 읽을 수 있는 형태로 바꿉니다."""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def _count_pdf_pages(source: Union[bytes, str]) -> int:
+    """PDF의 전체 페이지 수를 반환합니다. (프로세스 풀에서 실행)"""
+    return len(PyPDF2.PdfReader(_open_source(source)).pages)
+
+def _extract_pdf_pages(source: Union[bytes, str], start: int, end: int) -> str:
+    """PDF의 [start, end) 페이지 텍스트를 추출합니다. (프로세스 풀에서 실행)"""
+    pdf_reader = PyPDF2.PdfReader(_open_source(source))
+    return "".join(pdf_reader.pages[page_num].extract_text() + "\n" for page_num in range(start, end))
+
+def _extract_docx_text(source: Union[bytes, str]) -> str:
+    """Word 문서의 문단 텍스트를 추출합니다. (프로세스 풀에서 실행)"""
+    doc = docx.Document(_open_source(source))
+    return "\n".join([para.text for para in doc.paragraphs])
+
+def _plan_page_shards(page_count: int, workers: int, min_pages: int) -> List[tuple]:
+    """페이지를 워커 수만큼 연속된 구간으로 나눕니다. 구간이 너무 작으면 프로세스 간 전송 비용이 더 큽니다."""
+    shard_size = max(min_pages, -(-page_count // workers))
+    return [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+
+@asynccontextmanager
+async def _document_source(upload: IngestedUpload) -> AsyncIterator[Union[bytes, str]]:
+    """
+    프로세스 풀에 넘길 문서를 준비합니다. 메모리에 둘 만큼 작은 문서는 바이트로,
+    큰 문서는 파일 경로로 넘겨 구간마다 전체 내용을 프로세스 간에 복사하지 않도록 합니다.
+    """
+    if upload.path is None and upload.size <= settings.INGEST_MEMORY_THRESHOLD_BYTES:
+        yield upload.read_all()
+        return
+    async with upload.as_path() as path:
+        yield path
+
+async def extract_text_from_document(upload: IngestedUpload) -> str:
     """
     다양한 문서 형식(PDF, DOCX 등)에서 텍스트를 추출합니다.
+    PDF는 페이지 구간별로 나누어 프로세스 풀에서 병렬로 추출하므로 이벤트 루프를 막지 않습니다.
     """
-    content = await file.read()
-    file_extension = os.path.splitext(file.filename)[1].lower()
+    file_extension = upload.extension
     
     try:
         if file_extension == '.pdf':
-            # PDF 파일 처리
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-            
-            text = ""
-            with open(temp_file_path, 'rb') as pdf_file:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                for page_num in range(len(pdf_reader.pages)):
-                    text += pdf_reader.pages[page_num].extract_text() + "\n"
-            
-            os.unlink(temp_file_path)  # 임시 파일 삭제
-            return text
+            async with _document_source(upload) as source:
+                page_count = await extraction_pool.run(_count_pdf_pages, source)
+                shards = _plan_page_shards(
+                    page_count, extraction_pool.max_workers, settings.EXTRACTION_MIN_PAGES_PER_SHARD
+                )
+                texts = await asyncio.gather(
+                    *(extraction_pool.run(_extract_pdf_pages, source, start, end) for start, end in shards)
+                )
+            return "".join(texts)
             
         elif file_extension in ['.docx', '.doc']:
             # Word 문서 처리
-            doc = docx.Document(io.BytesIO(content))
-            return "\n".join([para.text for para in doc.paragraphs])
+            async with _document_source(upload) as source:
+                return await extraction_pool.run(_extract_docx_text, source)
             
         elif file_extension in ['.txt']:
-            # 텍스트 파일 처리
-            return content.decode('utf-8')
+            # 텍스트 파일 처리 (크기 제한 안의 문서이므로 한 번에 읽습니다)
+            return (await run_in_threadpool(upload.read_all)).decode('utf-8')
             
         else:
             raise HTTPException(
                 status_code=400,
                 detail=f"지원하지 않는 파일 형식입니다: {file_extension}"
             )
+    except HTTPException:
+        raise
+    except WorkerCrashedError:
+        raise HTTPException(
+            status_code=503,
+            detail="문서 처리 중 작업 프로세스가 종료되었습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"문서 처리 중 오류가 발생했습니다: {str(e)}"
         )
 
-async def summarize_text_with_openai(text: str) -> dict:
-    """
-    OpenAI GPT-4o-mini API를 호출하여 텍스트를 학습 노트 형식으로 변환합니다.
-    """
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {settings.OPENAI_API_KEY}'
-            }
-            
-            # 이모지와 직관적 표현을 활용한 프롬프트
-            system_prompt = """당신은 최고 수준의 학습 노트 작성 전문가입니다. 
+OPENAI_CHAT_API_URL = "https://api.openai.com/v1/chat/completions"
+
+# 이모지와 직관적 표현을 활용한 프롬프트
+NOTE_SYSTEM_PROMPT = """당신은 최고 수준의 학습 노트 작성 전문가입니다. 
 주어진 텍스트를 학생들이 효과적으로 학습할 수 있는 체계적이고 실용적인 노트로 변환하는 것이 목표입니다.
 
 **응답 형식 (이모지와 직관적 표현 사용):**
@@ -167,7 +347,20 @@ async def summarize_text_with_openai(text: str) -> dict:
 
 모든 응답은 한국어로 작성하며, 대학생 수준에서 이해하기 쉽고 기억하기 좋은 형태로 구성해주세요."""
 
-            user_prompt = f"""다음 텍스트를 효과적인 학습 노트로 변환해주세요:
+# 긴 텍스트를 나눈 조각(chunk)마다 중간 노트를 만들 때 사용하는 프롬프트
+PARTIAL_NOTE_SYSTEM_PROMPT = """당신은 강의/교재 내용을 정리하는 학습 노트 작성 전문가입니다.
+주어진 텍스트는 긴 자료의 일부분입니다. 이 부분에 나오는 핵심 개념, 정의, 공식, 예시, 주의사항을
+빠짐없이 간결한 불릿 목록으로 정리해주세요. 제목이나 서론 없이 정리된 내용만 한국어로 작성합니다."""
+
+
+def build_note_user_prompt(text: str, from_partials: bool = False) -> str:
+    """최종 학습 노트를 요청하는 사용자 프롬프트를 만듭니다."""
+    if from_partials:
+        intro = "다음은 긴 자료를 여러 부분으로 나누어 정리한 중간 노트들입니다. 이를 하나의 효과적인 학습 노트로 통합해주세요:"
+    else:
+        intro = "다음 텍스트를 효과적인 학습 노트로 변환해주세요:"
+
+    return f"""{intro}
 
 {text}
 
@@ -179,81 +372,241 @@ async def summarize_text_with_openai(text: str) -> dict:
 - 실제 적용 가능한 예시나 팁이 있다면 포함
 
 학습자가 이 노트만 보고도 핵심 내용을 완전히 이해하고 활용할 수 있도록 작성해주세요."""
-            
-            # OpenAI GPT-4o-mini API에 보낼 요청 본문 구성
-            payload = {
-                "model": "gpt-4o-mini",  # OpenAI GPT-4o-mini 모델 사용
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "temperature": 0.2,  # 창의성과 일관성의 균형
-                "max_tokens": 3000,  # 더 상세한 노트를 위해 토큰 수 증가
-                "top_p": 0.8,  # 다양성과 품질의 균형
-                "frequency_penalty": 0.2,  # 반복 줄이기
-                "presence_penalty": 0.1   # 새로운 주제 도입 장려
-            }
-
-            print(f"OpenAI API 요청 시작...")
-            
-            # OpenAI API에 POST 요청을 보냅니다.
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions", headers=headers, json=payload, timeout=180
-            )
-            
-            print(f"OpenAI API 응답 상태: {response.status_code}")
-            
-            if response.status_code != 200:
-                print(f"OpenAI API 오류: {response.text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"OpenAI API Error: {response.text}"
-                )
-                
-            # 응답에서 요약된 내용을 추출합니다.
-            ai_response = response.json()["choices"][0]["message"]["content"]
-            print(f"OpenAI 응답: {ai_response[:200]}...")
-            
-            # AI 응답을 파싱하여 제목과 요약을 분리
-            try:
-                lines = ai_response.strip().split('\n')
-                title = ""
-                summary = ""
-                
-                # 제목 찾기 (### 또는 # 으로 시작하는 라인)
-                for i, line in enumerate(lines):
-                    if line.startswith('###') or line.startswith('#'):
-                        title = line.replace('#', '').strip()
-                        # 제목 다음부터 요약 내용 추출
-                        summary = '\n'.join(lines[i+1:]).strip()
-                        break
-                
-                # 제목을 찾지 못한 경우 첫 번째 줄을 제목으로 사용
-                if not title:
-                    title = lines[0].strip() if lines else "AI 생성 노트"
-                    summary = '\n'.join(lines[1:]).strip() if len(lines) > 1 else ai_response
-                
-                # 빈 요약인 경우 전체 응답을 요약으로 사용
-                if not summary:
-                    summary = ai_response
-                    
-                return {
-                    "title": title[:100],  # 제목 길이 제한
-                    "summary": summary
-                }
-                
-            except Exception as parse_error:
-                print(f"응답 파싱 오류: {parse_error}")
-                # 파싱에 실패한 경우 전체 응답을 사용
-                return {
-                    "title": "AI 생성 학습 노트",
-                    "summary": ai_response
-                }
+
+
+def estimate_payload_tokens(payload: dict) -> int:
+    """Chat Completions 요청이 TPM 한도에서 차지할 토큰 수 (입력 추정치 + 최대 출력 토큰 수)"""
+    prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in payload.get("messages", []))
+    return prompt_tokens + payload.get("max_tokens", 0)
+
+
+async def _request_chat_completion(payload: dict) -> str:
+    """
+    OpenAI Chat Completions API를 호출하고 응답 메시지 내용을 반환합니다.
+    요청은 upstream 스케줄러의 모델별 대기열을 거치며, 토큰 수가 적은 요청이 먼저 전송됩니다.
+    """
+    client = get_http_client()
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {settings.OPENAI_API_KEY}'
+    }
+
+    async def request():
+        logger.debug(f"OpenAI API 요청 시작 ({payload['model']})")
+        return await client.post(
+            OPENAI_CHAT_API_URL, headers=headers, json=payload, timeout=180
+        )
+
+    tokens = estimate_payload_tokens(payload)
+    response = await upstream.send(payload["model"], request, tokens, tokens)
+
+    if response.status_code != 200:
+        logger.warning(f"OpenAI API 오류: {response.status_code} {response.text[:500]}")
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"OpenAI API Error: {response.text}"
+        )
+
+    # 응답에서 요약된 내용을 추출합니다.
+    ai_response = response.json()["choices"][0]["message"]["content"]
+    # 응답 내용은 사용자 데이터이므로 로그에는 길이만 남깁니다.
+    logger.info(f"OpenAI 응답 완료 ({payload['model']}): {len(ai_response)}자")
+    return ai_response
+
+
+def parse_note_response(ai_response: str) -> dict:
+    """AI 응답을 파싱하여 제목과 요약을 분리합니다."""
+    try:
+        lines = ai_response.strip().split('\n')
+        title = ""
+        summary = ""
+
+        # 제목 찾기 (### 또는 # 으로 시작하는 라인)
+        for i, line in enumerate(lines):
+            if line.startswith('###') or line.startswith('#'):
+                title = line.replace('#', '').strip()
+                # 제목 다음부터 요약 내용 추출
+                summary = '\n'.join(lines[i+1:]).strip()
+                break
+
+        # 제목을 찾지 못한 경우 첫 번째 줄을 제목으로 사용
+        if not title:
+            title = lines[0].strip() if lines else "AI 생성 노트"
+            summary = '\n'.join(lines[1:]).strip() if len(lines) > 1 else ai_response
+
+        # 빈 요약인 경우 전체 응답을 요약으로 사용
+        if not summary:
+            summary = ai_response
+
+        return {
+            "title": title[:100],  # 제목 길이 제한
+            "summary": summary
+        }
+
+    except Exception as parse_error:
+        logger.warning(f"응답 파싱 오류: {parse_error}")
+        # 파싱에 실패한 경우 전체 응답을 사용
+        return {
+            "title": "AI 생성 학습 노트",
+            "summary": ai_response
+        }
+
+
+async def summarize_text_with_openai(text: str, from_partials: bool = False) -> dict:
+    """
+    OpenAI GPT-4o-mini API를 호출하여 텍스트를 학습 노트 형식으로 변환합니다.
+    from_partials가 True이면 text는 map 단계에서 만든 중간 노트들의 모음입니다.
+    """
+    
+    try:
+        # OpenAI GPT-4o-mini API에 보낼 요청 본문 구성
+        payload = {
+            "model": SUMMARY_MODEL,  # OpenAI GPT-4o-mini 모델 사용
+            "messages": [
+                {"role": "system", "content": NOTE_SYSTEM_PROMPT},
+                {"role": "user", "content": build_note_user_prompt(text, from_partials)}
+            ],
+            "temperature": 0.2,  # 창의성과 일관성의 균형
+            "max_tokens": 3000,  # 더 상세한 노트를 위해 토큰 수 증가
+            "top_p": 0.8,  # 다양성과 품질의 균형
+            "frequency_penalty": 0.2,  # 반복 줄이기
+            "presence_penalty": 0.1   # 새로운 주제 도입 장려
+        }
+
+        ai_response = await _request_chat_completion(payload)
+        return parse_note_response(ai_response)
                 
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"OpenAI API 호출 중 예외 발생: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"텍스트 요약 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+# --- 긴 텍스트를 위한 map-reduce 요약 ---
+# 긴 자료를 잘라버리는 대신 문단 단위 조각으로 나누어 각각 중간 노트를 만들고(map),
+# 중간 노트들을 모아 기존 형식의 최종 노트 하나로 통합합니다(reduce).
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수를 보수적으로 추정합니다.
+    영문/숫자는 약 4글자당 1토큰, 한글 등 그 외 문자는 글자당 1토큰으로 계산합니다.
+    """
+    ascii_chars = len(text.encode('ascii', errors='ignore'))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """한 문단이 예산보다 크면 문장 단위로, 문장도 크면 글자 수로 나눕니다."""
+    pieces = []
+    for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        # 문장 하나가 예산을 넘는 경우(문장부호 없는 전사 등) 글자 수로 자릅니다.
+        step = max(1, max_tokens)
+        pieces.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+    return pieces
+
+
+def split_text_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """텍스트를 문단 경계에서 나누어 각 조각이 max_tokens를 넘지 않도록 묶습니다."""
+    units = []
+    for paragraph in re.split(r'\n\s*\n|\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append(paragraph)
+        else:
+            units.extend(_split_oversized(paragraph, max_tokens))
+
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+async def _summarize_chunk(chunk: str, index: int, total: int) -> str:
+    """조각 하나를 중간 노트(불릿 목록)로 정리합니다."""
+    payload = {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": PARTIAL_NOTE_SYSTEM_PROMPT},
+            {"role": "user", "content": f"[전체 {total}개 중 {index + 1}번째 부분]\n\n{chunk}"}
+        ],
+        "temperature": 0.2,
+        "max_tokens": settings.SUMMARY_PARTIAL_MAX_TOKENS,
+    }
+    partial = await _request_chat_completion(payload)
+    return f"### 부분 {index + 1}\n{partial.strip()}"
+
+
+async def condense_text_for_summary(text: str) -> Optional[str]:
+    """
+    텍스트가 한 번의 요약 요청에 들어가기에 너무 길면 map 단계를 실행해
+    중간 노트들을 합친 텍스트를 반환합니다. 충분히 짧으면 None을 반환합니다.
+    중간 노트 모음도 여전히 길면 같은 과정을 반복해 줄입니다.
+    """
+    total_tokens = estimate_tokens(text)
+    if total_tokens <= settings.SUMMARY_CHUNK_TOKENS:
+        return None
+
+    # 작업 하나가 사용할 수 있는 입력 토큰 수를 제한합니다. 내용을 몰래 자르지 않고 명확히 거절합니다.
+    if total_tokens > settings.SUMMARY_MAX_INPUT_TOKENS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"텍스트가 너무 깁니다. (약 {total_tokens:,} 토큰, 최대 {settings.SUMMARY_MAX_INPUT_TOKENS:,} 토큰)"
+        )
+
+    semaphore = asyncio.Semaphore(settings.SUMMARY_MAX_PARALLEL_CHUNKS)
+
+    async def summarize_bounded(chunk: str, index: int, total: int) -> str:
+        async with semaphore:
+            return await _summarize_chunk(chunk, index, total)
+
+    condensed = text
+    while estimate_tokens(condensed) > settings.SUMMARY_CHUNK_TOKENS:
+        chunks = split_text_into_chunks(condensed, settings.SUMMARY_CHUNK_TOKENS)
+        logger.info(f"map 단계 요약 시작: {len(chunks)}개 조각")
+        partials = await asyncio.gather(
+            *(summarize_bounded(chunk, i, len(chunks)) for i, chunk in enumerate(chunks))
+        )
+        condensed = "\n\n".join(partials)
+    return condensed
+
+
+async def summarize_long_text(text: str) -> dict:
+    """
+    길이에 상관없이 텍스트 전체를 학습 노트로 요약합니다.
+    짧은 텍스트는 한 번에 요약하고, 긴 텍스트는 map-reduce 방식으로 요약합니다.
+    """
+    try:
+        condensed = await condense_text_for_summary(text)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"OpenAI API 호출 중 예외 발생: {str(e)}")
+        logger.error(f"OpenAI API 호출 중 예외 발생: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"텍스트 요약 중 오류가 발생했습니다: {str(e)}"
         )
 
+    if condensed is None:
+        return await summarize_text_with_openai(text)
+    return await summarize_text_with_openai(condensed, from_partials=True)
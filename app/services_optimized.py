@@ -1,55 +1,38 @@
 # 최적화된 서비스 - 비동기 처리 및 스트리밍 응답
 
 import asyncio
-import httpx
+import itertools
 import os
 import tempfile
-from fastapi import HTTPException, UploadFile
+from fastapi import HTTPException
 from typing import AsyncGenerator
 import json
 
-async def transcribe_media_with_whisper_optimized(file: UploadFile) -> str:
+from app import upstream
+from app.config import settings
+from app.http_client import get_http_client
+from app.services import (
+    DEEPSEEK_API_URL,
+    OPENAI_CHAT_API_URL,
+    NOTE_SYSTEM_PROMPT,
+    SUMMARY_MODEL,
+    build_note_user_prompt,
+    condense_text_for_summary,
+    estimate_payload_tokens,
+    transcribe_media_with_whisper,
+)
+from app.ingestion import IngestedUpload
+
+async def transcribe_media_with_whisper_optimized(upload: IngestedUpload) -> str:
     """최적화된 Whisper API 호출"""
     
     try:
-        async with httpx.AsyncClient(timeout=300) as client:  # 타임아웃 증가
-            file_content = await file.read()
-            
-            # 파일 크기 체크 및 압축
-            if len(file_content) > 25 * 1024 * 1024:  # 25MB 초과시
-                raise HTTPException(
-                    status_code=413,
-                    detail="파일 크기가 너무 큽니다. 25MB 이하의 파일을 업로드해주세요."
-                )
-            
-            files = {'file': (file.filename, file_content, file.content_type)}
-            headers = {'Authorization': f'Bearer {settings.OPENAI_API_KEY}'}
-            
-            # 최적화된 설정
-            data = {
-                'model': 'whisper-1',
-                'language': 'ko',
-                'temperature': 0.0,
-                'response_format': 'text',
-                # 간단한 프롬프트로 처리 시간 단축
-                'prompt': '한국어 교육 콘텐츠. 전문용어와 숫자를 정확히 전사해주세요.'
-            }
-
-            response = await client.post(
-                WHISPER_API_URL, 
-                headers=headers, 
-                files=files, 
-                data=data,
-                timeout=300  # 5분 타임아웃
-            )
-
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"음성 전사 실패: {response.text}"
-                )
-
-            return response.text
+        # 25MB를 넘는 긴 파일도 구간 분할 전사로 처리됩니다.
+        # 간단한 프롬프트로 처리 시간 단축
+        return await transcribe_media_with_whisper(
+            upload,
+            prompt='한국어 교육 콘텐츠. 전문용어와 숫자를 정확히 전사해주세요.'
+        )
             
     except asyncio.TimeoutError:
         raise HTTPException(
@@ -57,18 +40,90 @@ async def transcribe_media_with_whisper_optimized(file: UploadFile) -> str:
             detail="음성 전사 시간이 초과되었습니다. 더 짧은 파일을 시도해주세요."
         )
 
+async def stream_chat_completion_deltas(url: str, api_key: str, payload: dict) -> AsyncGenerator[str, None]:
+    """
+    OpenAI 호환(OpenAI, DeepSeek) 스트리밍 응답을 파싱하여 새로 생성된 텍스트 조각만 전달합니다.
+    응답은 'data: {json}' 줄들로 오며, 마지막에 'data: [DONE]'이 옵니다.
+    스트림을 다 읽을 때까지 upstream 스케줄러의 자리를 유지하고, 첫 응답이 429이면 다시 줄을 서서 재시도합니다.
+    """
+    client = get_http_client()
+    headers = {
+        'Content-Type': 'application/json',
+        'Authorization': f'Bearer {api_key}'
+    }
+    tokens = estimate_payload_tokens(payload)
+
+    for attempt in itertools.count():
+        async with upstream.upstream_slot(payload["model"], tokens, tokens) as slot:
+            async with client.stream('POST', url, headers=headers, json=payload, timeout=300) as response:
+                if response.status_code == 429 and attempt < settings.AI_RATE_LIMIT_RETRIES:
+                    slot.rate_limited(upstream.retry_after_seconds(response.headers))
+                    continue
+                if response.status_code != 200:
+                    raise HTTPException(
+                        status_code=response.status_code,
+                        detail=f"요약 생성 실패: {(await response.aread()).decode('utf-8', errors='ignore')}"
+                    )
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+
+                    choices = chunk.get("choices") or []
+                    if not choices:
+                        continue
+                    # deepseek-reasoner의 reasoning_content(추론 과정)는 노트에 포함하지 않습니다.
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+                return
+
+async def summarize_text_with_openai_streaming(text: str) -> AsyncGenerator[str, None]:
+    """기존 학습 노트 형식 그대로 GPT-4o-mini 요약을 스트리밍으로 생성합니다."""
+    
+    try:
+        # 긴 텍스트는 map 단계로 중간 노트를 만든 뒤 최종 노트만 스트리밍합니다.
+        condensed = await condense_text_for_summary(text)
+        payload = {
+            "model": SUMMARY_MODEL,
+            "messages": [
+                {"role": "system", "content": NOTE_SYSTEM_PROMPT},
+                {"role": "user", "content": build_note_user_prompt(condensed or text, condensed is not None)}
+            ],
+            "temperature": 0.2,
+            "max_tokens": 3000,
+            "top_p": 0.8,
+            "frequency_penalty": 0.2,
+            "presence_penalty": 0.1,
+            "stream": True
+        }
+
+        async for delta in stream_chat_completion_deltas(OPENAI_CHAT_API_URL, settings.OPENAI_API_KEY, payload):
+            yield delta
+
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=408,
+            detail="요약 생성 시간이 초과되었습니다."
+        )
+
 async def summarize_text_with_deepseek_streaming(text: str) -> AsyncGenerator[str, None]:
-    """스트리밍 방식으로 요약 생성"""
+    """스트리밍 방식으로 요약 생성 (파싱된 텍스트 조각을 순서대로 전달)"""
     
     try:
-        async with httpx.AsyncClient(timeout=300) as client:
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {settings.DEEPSEEK_API_KEY}'
-            }
+        # 긴 텍스트는 잘라내지 않고 map 단계로 중간 노트를 만든 뒤 그것을 스트리밍 요약합니다.
+        condensed = await condense_text_for_summary(text)
+        source_text = condensed if condensed is not None else text
             
-            # 간소화된 프롬프트로 처리 시간 단축
-            system_prompt = """학습 노트 작성 전문가입니다. 
+        # 간소화된 프롬프트로 처리 시간 단축
+        system_prompt = """학습 노트 작성 전문가입니다. 
 주어진 텍스트를 다음 형식으로 변환하세요:
 
 ### [제목]
@@ -80,52 +135,22 @@ async def summarize_text_with_deepseek_streaming(text: str) -> AsyncGenerator[st
 
 간결하고 실용적으로 작성해주세요."""
 
-            payload = {
-                "model": "deepseek-reasoner",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"다음을 학습 노트로 변환: {text[:2000]}"}  # 텍스트 길이 제한
-                ],
-                "temperature": 0.1,  # 더 일관된 결과
-                "max_tokens": 1500,  # 토큰 수 감소
-                "stream": True  # 스트리밍 활성화
-            }
-
-            async with client.stream(
-                'POST', 
-                DEEPSEEK_API_URL, 
-                headers=headers, 
-                json=payload,
-                timeout=300
-            ) as response:
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"요약 생성 실패: {await response.aread()}"
-                    )
-                
-                async for chunk in response.aiter_text():
-                    if chunk.strip():
-                        yield chunk
+        payload = {
+            "model": "deepseek-reasoner",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"다음을 학습 노트로 변환: {source_text}"}
+            ],
+            "temperature": 0.1,  # 더 일관된 결과
+            "max_tokens": 1500,  # 토큰 수 감소
+            "stream": True  # 스트리밍 활성화
+        }
+
+        async for delta in stream_chat_completion_deltas(DEEPSEEK_API_URL, settings.DEEPSEEK_API_KEY, payload):
+            yield delta
                         
     except asyncio.TimeoutError:
         raise HTTPException(
             status_code=408,
             detail="요약 생성 시간이 초과되었습니다."
         )
-
-# 백그라운드 작업을 위한 큐 시스템 (Railway에서는 비활성화)
-# import redis
-# from celery import Celery
-
-# Railway 환경에서는 Redis/Celery 대신 간단한 백그라운드 처리 사용
-# redis_client = redis.Redis(host='localhost', port=6379, db=0)
-# celery_app = Celery('tino_te', broker='redis://localhost:6379')
-
-# @celery_app.task
-async def process_note_background(file_path: str, user_id: int):
-    """백그라운드에서 노트 처리 (Railway용 간소화 버전)"""
-    # Railway에서는 간단한 비동기 처리로 대체
-    # 파일 처리 로직
-    # 완료 후 사용자에게 알림 또는 이메일 발송
-    pass
\ No newline at end of file
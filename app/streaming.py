@@ -0,0 +1,115 @@
+# /TINO-TE.ai-BETA-backend/app/streaming.py
+
+import asyncio
+import json
+from typing import AsyncGenerator
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas, services, services_optimized, upstream
+from app.cache import (
+    transcribe_media_cached,
+    extract_document_text_cached,
+    get_cached_summary,
+    store_summary,
+)
+from app.database import AsyncSessionLocal
+from app.ingestion import IngestedUpload
+from app.logging_config import logger
+from app.credits import CreditReservation
+from app.pipeline import save_note
+
+# --- 코드 설명 ---
+# 이 파일은 요약 결과를 생성되는 즉시 브라우저로 전달하는 Server-Sent Events 스트림을 만듭니다.
+# 전체 요약이 끝날 때까지 기다리지 않고 첫 토큰부터 보여주므로 체감 대기 시간이 크게 줄어듭니다.
+# 스트림이 끝나면 완성된 노트를 저장하고 note 이벤트로 전달합니다.
+#
+# 이벤트 종류
+# - stage: 현재 진행 단계 ({"stage": "transcribing" | "extracting" | "summarizing" | "saving"})
+# - token: 새로 생성된 요약 텍스트 조각 ({"text": "..."})
+# - note:  저장이 끝난 노트 (schemas.Note)
+# - error: 처리 중 오류 ({"detail": "..."})
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Server-Sent Events 형식의 메시지 하나를 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def release_stream_resources(upload: IngestedUpload, reservation: CreditReservation) -> None:
+    """
+    스트림이 크레딧을 확정하지 못하고 끝났으면 환불하고 임시 파일을 닫습니다. 이미 처리되었으면 아무것도 하지 않습니다.
+    클라이언트가 본문을 받기 전에 연결을 끊으면 스트림 생성기가 시작조차 되지 않으므로,
+    응답의 BackgroundTask로 등록해 스트림 실행 여부와 관계없이 호출되게 합니다.
+    """
+    if not reservation.settled:
+        async with AsyncSessionLocal() as db:
+            await reservation.refund(db)
+    upload.close()
+
+
+async def _finish_stream(db: AsyncSession, upload: IngestedUpload, reservation: CreditReservation) -> None:
+    # 클라이언트 연결 종료 등으로 저장 전에 스트림이 중단된 경우에도 환불합니다.
+    try:
+        await reservation.refund(db)
+    finally:
+        await db.close()
+        upload.close()
+
+
+async def stream_note_from_upload(
+    user_id: int, upload: IngestedUpload, kind: str, reservation: CreditReservation
+) -> AsyncGenerator[str, None]:
+    """
+    업로드 파일로 노트를 만들면서 진행 단계와 요약 토큰을 SSE로 전달합니다.
+    kind는 "media" 또는 "document"입니다. 미리 예약된 크레딧은 노트가 저장되면 확정되고,
+    중간에 실패하거나 클라이언트가 연결을 끊으면 환불됩니다.
+    스트리밍 응답은 요청 처리 함수가 끝난 뒤에도 계속되므로 자체 DB 세션을 사용합니다.
+    """
+    db = AsyncSessionLocal()
+    upstream.set_current_user(user_id)
+    try:
+        if kind == "media":
+            yield format_sse("stage", {"stage": "transcribing"})
+            text = await transcribe_media_cached(db, upload)
+        else:
+            yield format_sse("stage", {"stage": "extracting"})
+            text = await extract_document_text_cached(db, upload)
+
+        yield format_sse("stage", {"stage": "summarizing"})
+        summarized_result = await get_cached_summary(db, text)
+        if summarized_result is not None:
+            # 캐시 적중 시 저장된 요약을 한 번에 전달합니다.
+            yield format_sse("token", {"text": summarized_result["summary"]})
+        else:
+            parts = []
+            async for delta in services_optimized.summarize_text_with_openai_streaming(text):
+                parts.append(delta)
+                yield format_sse("token", {"text": delta})
+            summarized_result = services.parse_note_response("".join(parts))
+            await store_summary(db, text, summarized_result)
+
+        yield format_sse("stage", {"stage": "saving"})
+        note_type = "audio" if kind == "media" else "document"
+        created_note = await save_note(
+            db, user_id, summarized_result["title"], text, summarized_result["summary"], note_type,
+            upload.duration_seconds
+        )
+        reservation.commit()
+
+        note = schemas.Note.model_validate(created_note).model_dump(mode="json")
+        yield format_sse("note", note)
+
+    except HTTPException as e:
+        await db.rollback()
+        await reservation.refund(db)
+        yield format_sse("error", {"detail": str(e.detail)})
+    except Exception as e:
+        logger.error(f"스트리밍 노트 생성 실패: {e}")
+        await db.rollback()
+        await reservation.refund(db)
+        yield format_sse("error", {"detail": f"노트 생성 중 오류가 발생했습니다: {str(e)}"})
+    finally:
+        # 연결 종료로 스트림이 취소되어도 환불과 정리가 중간에 끊기지 않도록 보호합니다.
+        await asyncio.shield(_finish_stream(db, upload, reservation))
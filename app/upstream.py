@@ -0,0 +1,318 @@
+# /TINO-TE.ai-BETA-backend/app/upstream.py
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional
+
+import httpx
+
+from app.config import settings
+from app.logging_config import logger
+
+# --- 코드 설명 ---
+# 이 파일은 외부 AI API(Whisper, Chat Completions) 호출을 모델별 대기열로 보내는 스케줄러입니다.
+# 강의가 끝난 직후 수백 명이 한꺼번에 업로드해도 모델별 동시 요청 수와 분당 요청 수(RPM)/토큰 수(TPM)
+# 한도 안에서만 요청을 보내고, 나머지는 실패시키지 않고 프로세스 안의 대기열에서 차례를 기다리게 합니다.
+# 대기열은 사용자별 가중 공정 큐(WFQ)입니다. 요청마다 크기(오디오 길이, 토큰 수)만큼 사용자의 가상 시각을
+# 앞으로 보내고 가상 종료 시각이 빠른 요청부터 보내므로, 짧은 작업은 긴 강의 뒤에 오래 밀리지 않고
+# 한 사용자가 요청을 많이 넣어도 다른 사용자의 차례를 막지 못합니다.
+# 429(요청 한도 초과) 응답을 받으면 해당 모델의 요청을 잠시 멈추고 다시 줄을 세워 재시도합니다.
+
+# 길이를 모르는 오디오의 재생 시간을 크기로 추정할 때 사용하는 바이트/초 (약 128kbps)
+WHISPER_BYTES_PER_SECOND = 16000
+
+# 요청을 보낸 사용자 (pipeline.py, streaming.py에서 설정, 없으면 시스템 요청)
+_current_user: ContextVar[Optional[int]] = ContextVar("upstream_user", default=None)
+
+
+def set_current_user(user_id: Optional[int]) -> None:
+    """
+    이후 같은 작업(및 그 작업이 만든 하위 태스크)에서 보내는 AI 요청을 user_id의 요청으로 줄 세웁니다.
+    요청 처리와 백그라운드 작업은 각자의 컨텍스트에서 실행되므로 다른 요청에 영향을 주지 않습니다.
+    """
+    _current_user.set(user_id)
+
+
+class TokenBucket:
+    """분당 한도를 1초마다 조금씩 채우는 토큰 버킷 (한도가 0이면 제한 없음)"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(0, per_minute))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def available(self, now: float) -> float:
+        if self.unlimited:
+            return float("inf")
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+        return self._tokens
+
+    def wait_seconds(self, amount: float, now: float) -> float:
+        """amount만큼 쓸 수 있을 때까지 기다려야 하는 시간(초). 한도보다 큰 요청은 한도만큼만 기다립니다."""
+        if self.unlimited:
+            return 0.0
+        missing = min(amount, self.capacity) - self.available(now)
+        return max(0.0, missing * 60.0 / self.capacity)
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._tokens = self.available(now) - min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """추정치와 실제 사용량의 차이를 되돌려 줍니다. (음수면 더 차감)"""
+        if not self.unlimited:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class UpstreamSlot:
+    """대기열에서 차례를 받은 요청 하나"""
+
+    def __init__(self, lane: "ModelLane", user: Optional[int], cost: float, tokens: int, start_tag: float):
+        self.lane = lane
+        self.user = user
+        self.cost = cost
+        self.tokens = tokens
+        self.start_tag = start_tag
+        self.finish_tag = start_tag + cost
+        self.enqueued_at = time.monotonic()
+        self.future: Optional[asyncio.Future] = None
+
+    def settle(self, actual_tokens: int) -> None:
+        """응답에 포함된 실제 토큰 사용량으로 TPM 예산을 바로잡습니다."""
+        self.lane.tpm.adjust(self.tokens - actual_tokens)
+
+    def rate_limited(self, retry_after: float) -> None:
+        """429 응답을 받았음을 알리고, retry_after초 동안 이 모델의 요청을 멈춥니다."""
+        self.lane.pause(retry_after)
+
+
+class ModelLane:
+    """모델 하나의 동시 요청 수, RPM/TPM 예산, 사용자별 공정 대기열을 관리합니다."""
+
+    def __init__(self, model: str, max_concurrency: int, rpm: int = 0, tpm: int = 0):
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._user_finish: Dict[Optional[int], float] = {}
+        self._queued_by_user: Dict[Optional[int], int] = {}
+        self._running = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 통계 (관리자 API에서 확인)
+        self._served = 0
+        self._rate_limited = 0
+        self._peak_queued = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def queued(self) -> int:
+        """차례를 기다리는 요청 수"""
+        return sum(self._queued_by_user.values())
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        # 대기열의 Future는 이벤트 루프에 묶이므로 루프가 바뀌면(테스트 등) 이전 대기열을 버립니다.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._heap.clear()
+            self._user_finish.clear()
+            self._queued_by_user.clear()
+            self._running = 0
+            self._timer = None
+        return loop
+
+    def _forget(self, slot: UpstreamSlot) -> None:
+        """대기열에서 빠진 요청의 사용자별 대기 수를 줄입니다."""
+        remaining = self._queued_by_user.get(slot.user, 0) - 1
+        if remaining > 0:
+            self._queued_by_user[slot.user] = remaining
+        else:
+            self._queued_by_user.pop(slot.user, None)
+
+    async def acquire(self, user: Optional[int], cost: float, tokens: int = 0) -> UpstreamSlot:
+        """
+        차례가 올 때까지 기다린 뒤 자리를 받습니다. cost는 공정 큐에서 쓰는 요청 크기이고,
+        tokens는 TPM 예산에서 차감할 추정 토큰 수입니다. 기다리는 동안 취소되면 대기열에서 빠집니다.
+        """
+        loop = self._bind_loop()
+        start_tag = max(self._virtual_time, self._user_finish.get(user, 0.0))
+        slot = UpstreamSlot(self, user, max(cost, 1.0), tokens, start_tag)
+        slot.future = loop.create_future()
+        self._user_finish[user] = slot.finish_tag
+        heapq.heappush(self._heap, (slot.finish_tag, next(self._sequence), slot))
+        self._queued_by_user[user] = self._queued_by_user.get(user, 0) + 1
+        self._peak_queued = max(self._peak_queued, self.queued)
+        self._dispatch()
+
+        try:
+            await slot.future
+        except asyncio.CancelledError:
+            if slot.future.cancelled():
+                self._forget(slot)
+            else:
+                # 자리를 받은 직후 취소되었으면 자리를 돌려줍니다.
+                self.release(slot)
+            raise
+        return slot
+
+    def release(self, slot: UpstreamSlot) -> None:
+        """요청이 끝나 자리를 돌려주고 다음 요청을 보냅니다."""
+        if slot.future is None or slot.future.get_loop() is not self._loop:
+            return
+        self._running -= 1
+        if not self._heap:
+            # 기다리는 요청이 없으면 사용자별 가상 시각을 기억할 필요가 없습니다.
+            self._user_finish.clear()
+        self._dispatch()
+
+    def pause(self, seconds: float) -> None:
+        """429 응답을 받으면 seconds초 동안 새 요청을 보내지 않습니다."""
+        self._rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.warning(f"{self.model} 요청 한도 초과(429), {seconds:.1f}초 동안 대기열을 멈춥니다.")
+
+    def _dispatch(self) -> None:
+        """자리와 예산이 남아 있는 만큼 가상 종료 시각이 빠른 요청부터 보냅니다."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        while self._heap and self._running < self.max_concurrency:
+            slot = self._heap[0][2]
+            if slot.future.done():
+                heapq.heappop(self._heap)  # 기다리다 취소된 요청
+                continue
+
+            delay = max(
+                self._paused_until - now,
+                self.rpm.wait_seconds(1, now),
+                self.tpm.wait_seconds(slot.tokens, now),
+            )
+            if delay > 0:
+                # 예산이 채워지거나 일시 중지가 끝나는 시각에 다시 확인합니다.
+                self._timer = self._loop.call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._heap)
+            self.rpm.take(1, now)
+            self.tpm.take(slot.tokens, now)
+            self._virtual_time = slot.start_tag
+            self._running += 1
+            self._forget(slot)
+
+            waited = now - slot.enqueued_at
+            self._served += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            slot.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """현재 대기열 깊이와 예산, 누적 대기 시간 통계를 반환합니다."""
+        now = time.monotonic()
+        rpm_available = self.rpm.available(now)
+        tpm_available = self.tpm.available(now)
+        return {
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "rpm_limit": int(self.rpm.capacity),
+            "tpm_limit": int(self.tpm.capacity),
+            "running": self._running,
+            "queued": self.queued,
+            "queued_users": len(self._queued_by_user),
+            "peak_queued": self._peak_queued,
+            "served": self._served,
+            "rate_limited": self._rate_limited,
+            "paused_seconds": round(max(0.0, self._paused_until - now), 1),
+            "rpm_available": None if self.rpm.unlimited else int(rpm_available),
+            "tpm_available": None if self.tpm.unlimited else int(tpm_available),
+            "avg_wait_ms": round(self._wait_total / self._served * 1000, 1) if self._served else 0.0,
+            "max_wait_ms": round(self._wait_max * 1000, 1),
+        }
+
+
+# 모델별 대기열 (설정에 없는 모델은 Chat Completions 한도로 처음 사용할 때 만듭니다)
+LANES: Dict[str, ModelLane] = {
+    "whisper-1": ModelLane("whisper-1", settings.AI_WHISPER_MAX_CONCURRENCY, settings.AI_WHISPER_RPM),
+    "gpt-4o-mini": ModelLane(
+        "gpt-4o-mini", settings.AI_CHAT_MAX_CONCURRENCY, settings.AI_CHAT_RPM, settings.AI_CHAT_TPM
+    ),
+    "deepseek-reasoner": ModelLane(
+        "deepseek-reasoner", settings.AI_DEEPSEEK_MAX_CONCURRENCY, settings.AI_DEEPSEEK_RPM, settings.AI_DEEPSEEK_TPM
+    ),
+}
+
+
+def get_lane(model: str) -> ModelLane:
+    lane = LANES.get(model)
+    if lane is None:
+        lane = LANES[model] = ModelLane(
+            model, settings.AI_CHAT_MAX_CONCURRENCY, settings.AI_CHAT_RPM, settings.AI_CHAT_TPM
+        )
+    return lane
+
+
+def lane_stats() -> List[Dict[str, Any]]:
+    return [lane.stats() for lane in LANES.values()]
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float:
+    """429 응답의 Retry-After 헤더(초 또는 밀리초)를 읽습니다. 없으면 기본 대기 시간을 반환합니다."""
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                continue
+    return settings.AI_RATE_LIMIT_BACKOFF_SECONDS
+
+
+@asynccontextmanager
+async def upstream_slot(model: str, cost: float, tokens: int = 0) -> AsyncIterator[UpstreamSlot]:
+    """
+    model의 대기열에서 차례를 받아 블록 안에서 요청을 보내고, 블록을 나가면 자리를 돌려줍니다.
+    스트리밍 응답처럼 응답을 다 읽을 때까지 자리를 유지해야 하는 경우에 사용합니다.
+    """
+    lane = get_lane(model)
+    slot = await lane.acquire(_current_user.get(), cost, tokens)
+    try:
+        yield slot
+    finally:
+        lane.release(slot)
+
+
+async def send(
+    model: str, request: Callable[[], Awaitable[httpx.Response]], cost: float, tokens: int = 0
+) -> httpx.Response:
+    """
+    차례를 받아 request()로 요청을 보냅니다. 429 응답을 받으면 모델 대기열을 잠시 멈추고
+    AI_RATE_LIMIT_RETRIES번까지 다시 줄을 서서 재시도합니다. 응답에 토큰 사용량이 있으면 TPM 예산에 반영합니다.
+    """
+    for attempt in itertools.count():
+        async with upstream_slot(model, cost, tokens) as slot:
+            response = await request()
+            if response.status_code == 429 and attempt < settings.AI_RATE_LIMIT_RETRIES:
+                slot.rate_limited(retry_after_seconds(response.headers))
+                continue
+            if tokens and response.status_code == 200 and \
+                    response.headers.get("content-type", "").startswith("application/json"):
+                usage = response.json().get("usage") or {}
+                if usage.get("total_tokens"):
+                    slot.settle(usage["total_tokens"])
+            return response
@@ -0,0 +1,160 @@
+# /TINO-TE.ai-BETA-backend/app/vad.py
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# --- 코드 설명 ---
+# 이 파일은 음성 구간 검출(VAD)을 담당합니다.
+# 16kHz 모노 PCM을 30ms 프레임으로 나누어 에너지(dB)와 영교차율(zero-crossing rate)을 NumPy로 한 번에 계산하고,
+# 말소리가 있는 구간만 골라 긴 무음(쉬는 시간, 조별 활동, 정적)을 Whisper에 보내지 않도록 합니다.
+# 잘라낸 오디오의 시각을 원본 녹음의 시각으로 바꿀 수 있도록 TimestampMap을 함께 만듭니다.
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_SECONDS)  # 480
+FRAME_BYTES = FRAME_SAMPLES * 2  # 16비트 PCM
+
+# 배경 소음 수준(전체 프레임의 하위 10%)과 말소리 수준(배경 소음보다 큰 프레임의 상위 10%)을 추정할 백분위수
+NOISE_PERCENTILE = 10
+SPEECH_PERCENTILE = 90
+# 배경 소음보다 이만큼(dB) 크면 말소리로 봅니다.
+NOISE_MARGIN_DB = 6.0
+# 조용한 말소리에 맞춰 기준을 낮추더라도 배경 소음보다 최소한 이만큼(dB)은 커야 말소리로 봅니다.
+MIN_NOISE_MARGIN_DB = 3.0
+# 말소리 수준보다 이만큼(dB) 이상 작지 않으면 말소리로 봅니다. (조용히 말하는 부분을 놓치지 않도록)
+SPEECH_DYNAMIC_RANGE_DB = 20.0
+# 이보다 작은 에너지(dBFS)는 항상 무음으로 봅니다.
+ABSOLUTE_SILENCE_DB = -60.0
+# 에너지가 기준보다 조금 낮아도 영교차율이 높으면(ㅅ, ㅎ 같은 무성음) 말소리로 봅니다.
+# 영교차율이 높은 배경 소음(잡음)을 말소리로 잘못 보지 않도록 배경 소음보다는 커야 합니다.
+ZCR_THRESHOLD = 0.25
+ZCR_ENERGY_SLACK_DB = 6.0
+
+
+def frame_features(samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    int16 샘플 배열(길이는 FRAME_SAMPLES의 배수)을 프레임으로 나누어
+    프레임별 에너지(dBFS)와 영교차율을 계산합니다.
+    """
+    frames = samples.reshape(-1, FRAME_SAMPLES).astype(np.float32) / 32768.0
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy_db, zcr
+
+
+class FrameFeatureAccumulator:
+    """ffmpeg가 조금씩 출력하는 PCM 바이트를 받아 프레임 특징만 모아 둡니다. (원본 오디오는 보관하지 않음)"""
+
+    def __init__(self):
+        self._remainder = b""
+        self._energy: List[np.ndarray] = []
+        self._zcr: List[np.ndarray] = []
+
+    def feed(self, data: bytes) -> None:
+        data = self._remainder + data
+        usable = len(data) - len(data) % FRAME_BYTES
+        self._remainder = data[usable:]
+        if usable:
+            energy_db, zcr = frame_features(np.frombuffer(data[:usable], dtype="<i2"))
+            self._energy.append(energy_db)
+            self._zcr.append(zcr)
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self._energy:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+        return np.concatenate(self._energy), np.concatenate(self._zcr)
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """True가 이어지는 구간의 [시작, 끝) 프레임 번호"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _dilate(mask: np.ndarray, pad: int) -> np.ndarray:
+    """True인 프레임의 앞뒤 pad 프레임까지 True로 넓힙니다. (누적 합으로 구간 안의 True 개수를 셈)"""
+    counts = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    index = np.arange(mask.size)
+    upper = np.minimum(index + pad + 1, mask.size)
+    lower = np.maximum(index - pad, 0)
+    return counts[upper] - counts[lower] > 0
+
+
+def _merge_gaps(starts: np.ndarray, ends: np.ndarray, keep_gap: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """keep_gap이 False인 틈은 메우고, True인 틈에서만 구간을 나눕니다."""
+    return (
+        np.concatenate((starts[:1], starts[1:][keep_gap])),
+        np.concatenate((ends[:-1][keep_gap], ends[-1:])),
+    )
+
+
+def detect_speech(
+    energy_db: np.ndarray,
+    zcr: np.ndarray,
+    min_silence_seconds: float,
+    padding_seconds: float,
+    max_regions: Optional[int] = None,
+) -> List[Tuple[float, float]]:
+    """
+    프레임 특징으로 말소리 구간 (시작, 끝) 목록(초)을 구합니다.
+    min_silence_seconds보다 짧은 쉼은 말소리 구간에 포함하고, 각 구간 앞뒤에 padding_seconds를 남깁니다.
+    max_regions를 넘으면 짧은 무음부터 메워 구간 수를 줄입니다.
+    """
+    if energy_db.size == 0:
+        return []
+
+    noise_floor = float(np.percentile(energy_db, NOISE_PERCENTILE))
+    # 녹음 대부분이 무음이면 전체 프레임의 상위 백분위수도 배경 소음 수준이 되므로,
+    # 말소리 수준은 배경 소음보다 확실히 큰 프레임만으로 추정합니다. 그런 프레임이 없으면 말소리가 없는 녹음입니다.
+    loud = energy_db[energy_db > noise_floor + NOISE_MARGIN_DB]
+    threshold = noise_floor + NOISE_MARGIN_DB
+    if loud.size:
+        speech_level = float(np.percentile(loud, SPEECH_PERCENTILE))
+        threshold = min(threshold, speech_level - SPEECH_DYNAMIC_RANGE_DB)
+    threshold = max(ABSOLUTE_SILENCE_DB, noise_floor + MIN_NOISE_MARGIN_DB, threshold)
+    weak_threshold = max(threshold - ZCR_ENERGY_SLACK_DB, noise_floor + MIN_NOISE_MARGIN_DB)
+    speech = (energy_db > threshold) | ((energy_db > weak_threshold) & (zcr > ZCR_THRESHOLD))
+
+    pad = int(round(padding_seconds / FRAME_SECONDS))
+    if pad:
+        speech = _dilate(speech, pad)
+
+    starts, ends = _runs(speech)
+    if starts.size == 0:
+        return []
+
+    min_gap = int(round(min_silence_seconds / FRAME_SECONDS))
+    starts, ends = _merge_gaps(starts, ends, (starts[1:] - ends[:-1]) >= min_gap)
+
+    if max_regions is not None and starts.size > max_regions:
+        gaps = starts[1:] - ends[:-1]
+        keep_gap = np.zeros(gaps.size, dtype=bool)
+        keep_gap[np.argsort(gaps, kind="stable")[gaps.size - (max_regions - 1):]] = True
+        starts, ends = _merge_gaps(starts, ends, keep_gap)
+
+    return [(float(s) * FRAME_SECONDS, float(e) * FRAME_SECONDS) for s, e in zip(starts, ends)]
+
+
+class TimestampMap:
+    """말소리 구간만 이어 붙인 오디오의 시각을 원본 녹음의 시각으로 바꿉니다."""
+
+    def __init__(self, regions: List[Tuple[float, float]]):
+        self.regions = regions
+        self._starts = np.array([start for start, _ in regions], dtype=np.float64)
+        lengths = np.array([end - start for start, end in regions], dtype=np.float64)
+        # 이어 붙인 오디오에서 각 구간이 시작하는 시각
+        self._offsets = np.concatenate(([0.0], np.cumsum(lengths)[:-1])) if regions else np.empty(0)
+        self.kept_seconds = float(lengths.sum()) if regions else 0.0
+
+    def to_original(self, seconds: float) -> float:
+        """이어 붙인 오디오의 seconds 시각이 원본 녹음에서 몇 초인지 반환합니다."""
+        if not self.regions:
+            return seconds
+        index = max(0, int(np.searchsorted(self._offsets, seconds, side="right")) - 1)
+        return float(self._starts[index] + (seconds - self._offsets[index]))
+
+    def to_original_range(self, start: float, length: float) -> Tuple[float, float]:
+        """이어 붙인 오디오의 [start, start + length) 구간이 원본 녹음에서 차지하는 범위"""
+        return self.to_original(start), self.to_original(start + length)
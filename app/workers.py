@@ -0,0 +1,313 @@
+# /TINO-TE.ai-BETA-backend/app/workers.py
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.logging_config import logger
+
+# --- 코드 설명 ---
+# 이 파일은 CPU를 많이 사용하는 작업(PDF/DOCX 텍스트 추출, PDF 렌더링 등)을 이벤트 루프 밖의
+# 별도 프로세스에서 실행하기 위한 프로세스 풀을 관리합니다.
+# 이벤트 루프에서 직접 실행하면 그 시간 동안 같은 워커의 다른 요청이 모두 멈추게 됩니다.
+# ffmpeg 같은 외부 프로그램은 그 자체가 별도 프로세스이므로, 동시에 실행되는 수만 SubprocessPool로 제한합니다.
+# 서버 프로세스에는 스레드 풀 등 여러 스레드가 있어 fork로 작업 프로세스를 만들면 다른 스레드가 잡고 있던
+# 잠금이 복사되어 교착될 수 있으므로, forkserver(지원하지 않는 플랫폼에서는 spawn) 방식으로 만듭니다.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class PoolSaturatedError(Exception):
+    """프로세스 풀의 대기열이 가득 차서 작업을 받을 수 없을 때 발생하는 예외"""
+
+
+class WorkerCrashedError(Exception):
+    """실행 중이던 작업 프로세스가 비정상 종료(메모리 부족 등)되었을 때 발생하는 예외"""
+
+
+class SubprocessError(Exception):
+    """SubprocessPool.stream으로 실행한 프로그램이 0이 아닌 종료 코드로 끝났을 때 발생하는 예외"""
+
+    def __init__(self, returncode: int, stderr: bytes):
+        super().__init__(f"종료 코드 {returncode}")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class ProcessPool:
+    """
+    처음 사용할 때 만들어지는 ProcessPoolExecutor 래퍼.
+    max_pending을 지정하면 실행 중 + 대기 중인 작업이 그 수에 도달했을 때
+    새 작업을 기다리게 하지 않고 PoolSaturatedError로 즉시 거절합니다.
+    작업 프로세스가 죽어 풀이 망가지면(BrokenProcessPool) 풀을 버리고 다음 작업부터 새 풀에서 실행합니다.
+    실행 중이던 작업은 WorkerCrashedError로 실패합니다. (호출하는 쪽에서 503으로 응답)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_pending: Optional[int] = None,
+        initializer: Optional[Callable[[], Any]] = None,
+    ):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        # 실행 통계 (관리자 API에서 확인)
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=_MP_CONTEXT, initializer=self.initializer
+            )
+            logger.info(f"{self.name} 프로세스 풀 생성 (workers={self.max_workers})")
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """망가진 풀을 버립니다. 같은 풀에서 실패한 다른 작업이 이미 새 풀을 만들었으면 그대로 둡니다."""
+        if self._executor is executor:
+            self._executor = None
+            self._restarts += 1
+            logger.warning(f"{self.name} 작업 프로세스가 비정상 종료되어 풀을 다시 만듭니다.")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        for _ in range(2):
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                # 이전 작업 때문에 이미 망가진 풀이면 이 작업은 실행되지 않았으므로 새 풀에 다시 제출합니다.
+                self._discard_executor(executor)
+                continue
+            try:
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool as e:
+                # 실행 중에 프로세스가 죽었으면 원인이 이 작업일 수 있으므로 다시 시도하지 않습니다.
+                self._discard_executor(executor)
+                raise WorkerCrashedError(f"{self.name} 작업 프로세스가 비정상 종료되었습니다.") from e
+        raise WorkerCrashedError(f"{self.name} 작업 프로세스를 시작할 수 없습니다.")
+
+    @property
+    def pending(self) -> int:
+        """실행 중이거나 대기 중인 작업 수"""
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """함수를 풀의 프로세스에서 실행하고 결과를 기다립니다. 함수와 인자는 pickle 가능해야 합니다."""
+        if self.max_pending is not None and self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PoolSaturatedError(f"{self.name} 작업 대기열이 가득 찼습니다.")
+
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            result = await self._submit(fn, *args)
+        except Exception:
+            self._failed += 1
+            raise
+        else:
+            elapsed = time.perf_counter() - started
+            self._completed += 1
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+            return result
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """풀 상태와 실행 시간 통계를 반환합니다. (시간은 대기 시간을 포함한 밀리초)"""
+        average = self._total_seconds / self._completed if self._completed else 0.0
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "restarts": self._restarts,
+            "avg_ms": round(average * 1000, 1),
+            "max_ms": round(self._max_seconds * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class SubprocessPool:
+    """
+    외부 프로그램(ffmpeg, ffprobe 등)을 asyncio 서브프로세스로 실행하는 풀.
+    동시에 실행되는 프로세스 수를 max_workers로 제한하고, 나머지는 자리가 날 때까지 기다립니다.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = 0
+        # 실행 통계 (관리자 API에서 확인)
+        self._completed = 0
+        self._failed = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면(테스트 등) 다시 만듭니다.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._semaphore
+
+    @property
+    def pending(self) -> int:
+        """실행 중이거나 대기 중인 프로세스 수"""
+        return self._pending
+
+    async def run(self, *args: str) -> Tuple[int, bytes, bytes]:
+        """프로그램을 실행하고 (종료 코드, 표준 출력, 표준 오류)를 반환합니다. 취소되면 프로세스를 종료합니다."""
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            async with self._get_semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                try:
+                    stdout, stderr = await process.communicate()
+                except asyncio.CancelledError:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+
+        elapsed = time.perf_counter() - started
+        if process.returncode == 0:
+            self._completed += 1
+        else:
+            self._failed += 1
+        self._total_seconds += elapsed
+        self._max_seconds = max(self._max_seconds, elapsed)
+        return process.returncode, stdout, stderr
+
+    async def stream(self, *args: str, chunk_size: int = 256 * 1024) -> AsyncIterator[bytes]:
+        """
+        프로그램을 실행하고 표준 출력을 chunk_size씩 전달합니다. 출력 전체를 메모리에 모으지 않으므로
+        긴 오디오를 디코딩한 PCM처럼 큰 출력에 사용합니다. 종료 코드가 0이 아니면 SubprocessError가 발생합니다.
+        """
+        self._pending += 1
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            async with self._get_semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                # 표준 오류가 가득 차서 프로그램이 멈추지 않도록 따로 읽어 둡니다.
+                stderr_task = asyncio.create_task(process.stderr.read())
+                try:
+                    while chunk := await process.stdout.read(chunk_size):
+                        yield chunk
+                    await process.wait()
+                    stderr = await stderr_task
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    stderr_task.cancel()
+                if process.returncode != 0:
+                    raise SubprocessError(process.returncode, stderr)
+                succeeded = True
+        finally:
+            self._pending -= 1
+            elapsed = time.perf_counter() - started
+            if succeeded:
+                self._completed += 1
+            else:
+                self._failed += 1
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        """풀 상태와 실행 시간 통계를 반환합니다. (시간은 대기 시간을 포함한 밀리초)"""
+        runs = self._completed + self._failed
+        average = self._total_seconds / runs if runs else 0.0
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_pending": None,
+            "pending": self._pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": 0,
+            "restarts": 0,
+            "avg_ms": round(average * 1000, 1),
+            "max_ms": round(self._max_seconds * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        # 실행 중인 프로세스는 요청 작업이 취소될 때 함께 종료됩니다.
+        pass
+
+
+def _init_pdf_worker() -> None:
+    # 각 렌더링 프로세스에서 폰트 등록과 스타일 생성을 미리 해 둡니다.
+    from app.pdf_service import get_render_context
+
+    get_render_context()
+
+
+# 문서 텍스트 추출용 프로세스 풀
+extraction_pool = ProcessPool("문서 추출", settings.EXTRACTION_POOL_SIZE)
+
+# PDF 렌더링용 프로세스 풀 (대기열이 가득 차면 503으로 거절)
+pdf_pool = ProcessPool(
+    "PDF 렌더링",
+    settings.PDF_POOL_SIZE,
+    max_pending=settings.PDF_POOL_MAX_PENDING,
+    initializer=_init_pdf_worker,
+)
+
+# 미디어 변환(ffmpeg/ffprobe)용 서브프로세스 풀
+media_pool = SubprocessPool("미디어 변환", settings.MEDIA_POOL_SIZE)
+
+ALL_POOLS = (extraction_pool, pdf_pool, media_pool)
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    return [pool.stats() for pool in ALL_POOLS]
+
+
+def shutdown_pools() -> None:
+    """애플리케이션 종료 시 모든 프로세스 풀을 정리합니다."""
+    for pool in ALL_POOLS:
+        pool.shutdown()
@@ -0,0 +1,75 @@
+# /TINO-TE.ai-BETA-backend/bench_pdf.py
+
+import statistics
+import sys
+import time
+
+from reportlab.pdfbase import pdfmetrics
+
+from app import pdf_service
+
+# --- 코드 설명 ---
+# 이 스크립트는 노트 PDF 한 개를 만드는 데 걸리는 시간을 측정합니다.
+# 'cold'는 렌더링할 때마다 폰트 등록과 스타일 생성을 다시 하는 경우(이전 방식),
+# 'warm'은 미리 만들어 둔 렌더링 컨텍스트를 재사용하는 경우입니다.
+# 마지막으로 노트 길이를 두 배씩 늘리며 레이아웃 시간이 길이에 비례하는지 확인합니다.
+# 터미널에서 'python bench_pdf.py [반복 횟수]' 명령으로 직접 실행합니다.
+
+
+def make_note(paragraphs: int) -> dict:
+    line = "이번 강의에서는 운영체제의 프로세스 스케줄링과 메모리 관리 기법을 다루었습니다."
+    summary = []
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            summary.append(f"### 주제 {i // 10 + 1}")
+        summary.append(f"- **요점 {i}**: {line}")
+    return {
+        "title": "벤치마크 노트",
+        "summary": "\n".join(summary),
+        "original_transcription": "\n".join(line for _ in range(paragraphs * 4)),
+        "note_type": "audio",
+        "created_at": "2025-01-01 00:00:00",
+    }
+
+
+def reset_render_context() -> None:
+    """이전 방식처럼 등록된 폰트와 스타일을 버려, 다음 렌더링에서 다시 만들게 합니다."""
+    pdf_service._render_context = None
+    pdfmetrics._fonts.pop(pdf_service.KOREAN_FONT_NAME, None)
+
+
+def measure(note: dict, runs: int, cold: bool) -> list:
+    timings = []
+    for _ in range(runs):
+        if cold:
+            reset_render_context()
+        start = time.perf_counter()
+        pdf_service.create_pdf_from_note(note)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"폰트: {pdf_service.get_render_context().font_name}, 반복: {runs}회")
+    for label, paragraphs in (("small", 3), ("large", 60)):
+        note = make_note(paragraphs)
+        pdf_service.create_pdf_from_note(note)  # 첫 실행의 import 비용 제외
+        for mode in ("cold", "warm"):
+            timings = measure(note, runs, cold=(mode == "cold"))
+            print(
+                f"{label:5} {mode}: 평균 {statistics.mean(timings):7.1f}ms, "
+                f"중앙값 {statistics.median(timings):7.1f}ms"
+            )
+
+    print("길이에 따른 렌더링 시간 (warm)")
+    for paragraphs in (25, 50, 100, 200, 400):
+        note = make_note(paragraphs)
+        chars = len(note["summary"]) + len(note["original_transcription"])
+        timings = measure(note, max(1, runs // 4), cold=False)
+        median = statistics.median(timings)
+        print(f"{chars:8,}자: {median:8.1f}ms ({median / chars * 1000:5.2f}ms/1000자)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ import { DeleteConfirmModal } from "@/components/modals/delete-confirm-modal"
 import { ThemeToggle } from "@/components/theme-toggle"
 import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuTrigger } from "@/components/ui/dropdown-menu"
 import { useAuth } from "@/lib/auth-context"
-import { getNotes, deleteNote } from "@/lib/api"
+import { getNotes, getNote, deleteNote } from "@/lib/api"
 import { useToast } from "@/components/ui/use-toast"
 
 const actionCards = [
@@ -58,6 +58,7 @@ interface Note {
   summary: string;
   transcription: string;
   noteType: string;
+  preview?: string;
 }
 
 export default function Dashboard() {
@@ -70,6 +71,7 @@ export default function Dashboard() {
   const [sidebarOpen, setSidebarOpen] = useState(false)
   const [hasNotes, setHasNotes] = useState(false)
   const [userNotes, setUserNotes] = useState<Note[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [noteDetailModalOpen, setNoteDetailModalOpen] = useState(false)
   const [selectedNote, setSelectedNote] = useState<Note | null>(null)
   const [deleteConfirmModalOpen, setDeleteConfirmModalOpen] = useState(false)
@@ -92,49 +94,43 @@ export default function Dashboard() {
     }
   }, [audioModalOpen, documentModalOpen]);
 
-  // 백엔드에서 노트 데이터 가져오기
-  const fetchNotes = async () => {
+  // 백엔드 목록 항목을 화면용 노트 형식으로 변환 (본문은 상세 조회 시 불러옴)
+  const formatNoteSummary = (note: Record<string, unknown>): Note => ({
+    id: note.id as string,
+    title: note.title as string,
+    date: `Created on ${new Date((note.created_at as string) || Date.now()).toLocaleDateString('en-US', {
+      weekday: 'long',
+      month: 'long',
+      day: 'numeric'
+    })}`,
+    icon: note.note_type === 'document' ? FileText : Mic, // 노트 타입에 따른 아이콘
+    iconBg: note.note_type === 'document' ? 'bg-blue-600' : 'bg-purple-600',
+    summary: '',
+    transcription: '',
+    noteType: note.note_type as string,
+    preview: note.preview as string
+  });
+
+  // 백엔드에서 노트 데이터 가져오기 (cursor가 있으면 다음 페이지를 이어 붙임)
+  const fetchNotes = async (cursor: string | null = null) => {
     try {
       if (!token) return;
 
-      const notes = await getNotes(token);
-      console.log('Fetched notes:', notes); // 디버깅용
-
-      if (notes && notes.length > 0) {
-        // 백엔드에서 가져온 노트 데이터 형식에 맞게 변환
-        const formattedNotes = notes.map((note: Record<string, unknown>) => ({
-          id: note.id,
-          title: note.title,
-          date: `Created on ${new Date(note.created_at || Date.now()).toLocaleDateString('en-US', {
-            weekday: 'long',
-            month: 'long',
-            day: 'numeric'
-          })}`,
-          icon: note.note_type === 'document' ? FileText : Mic, // 노트 타입에 따른 아이콘
-          iconBg: note.note_type === 'document' ? 'bg-blue-600' : 'bg-purple-600',
-          summary: note.summary,
-          transcription: note.original_transcription,
-          noteType: note.note_type
-        }));
-
-        // 최신 순으로 정렬 (created_at 기준)
-        formattedNotes.sort((a: Note, b: Note) => {
-          const dateA = new Date(notes.find((n: Record<string, unknown>) => n.id === a.id)?.created_at as string || 0);
-          const dateB = new Date(notes.find((n: Record<string, unknown>) => n.id === b.id)?.created_at as string || 0);
-          return dateB.getTime() - dateA.getTime();
-        });
+      // 백엔드가 최신순으로 정렬된 페이지를 반환합니다.
+      const page = await getNotes(token, cursor);
+      const formattedNotes: Note[] = (page?.items || []).map(formatNoteSummary);
 
-        console.log('Formatted notes:', formattedNotes); // 디버깅용
-        setUserNotes(formattedNotes);
-        setHasNotes(formattedNotes.length > 0);
-      } else {
+      const merged = cursor ? [...userNotes, ...formattedNotes] : formattedNotes;
+      setUserNotes(merged);
+      setHasNotes(merged.length > 0);
+      setNextCursor(page?.next_cursor || null);
+    } catch (error) {
+      console.error("노트 데이터를 가져오는 중 오류 발생:", error);
+      if (!cursor) {
         setUserNotes([]);
         setHasNotes(false);
+        setNextCursor(null);
       }
-    } catch (error) {
-      console.error("노트 데이터를 가져오는 중 오류 발생:", error);
-      setUserNotes([]);
-      setHasNotes(false);
     }
   };
 
@@ -182,10 +178,32 @@ export default function Dashboard() {
     });
   }
 
-  // 노트 상세 보기
-  const handleNoteClick = (note: Note) => {
-    setSelectedNote(note);
-    setNoteDetailModalOpen(true);
+  // 노트 상세 보기 (목록에는 본문이 없으므로 처음 열 때 상세 정보를 불러옴)
+  const handleNoteClick = async (note: Note) => {
+    if (note.summary || !token) {
+      setSelectedNote(note);
+      setNoteDetailModalOpen(true);
+      return;
+    }
+
+    try {
+      const detail = await getNote(note.id, token);
+      const fullNote = {
+        ...note,
+        summary: detail.summary,
+        transcription: detail.original_transcription
+      };
+      setUserNotes((prev) => prev.map((n) => (n.id === note.id ? fullNote : n)));
+      setSelectedNote(fullNote);
+      setNoteDetailModalOpen(true);
+    } catch (error) {
+      console.error("노트 상세 정보를 가져오는 중 오류 발생:", error);
+      toast({
+        title: "노트 조회 오류",
+        description: "노트 내용을 불러오지 못했습니다.",
+        variant: "destructive"
+      });
+    }
   }
 
   // 노트 생성 완료 처리
@@ -322,7 +340,7 @@ export default function Dashboard() {
                           <h3 className="font-semibold dark:text-gray-100">{note.title}</h3>
                           <p className="text-sm text-muted-foreground">{note.date}</p>
                           <p className="text-xs text-gray-500 mt-1">
-                            {note.noteType === 'document' ? 'Document' : 'Audio'} • {note.summary?.substring(0, 50)}...
+                            {note.noteType === 'document' ? 'Document' : 'Audio'} • {(note.preview || note.summary)?.substring(0, 50)}...
                           </p>
                         </div>
                       </div>
@@ -360,6 +378,14 @@ export default function Dashboard() {
                   </Card>
                 ))}
               </div>
+
+              {nextCursor && (
+                <div className="flex justify-center mt-4">
+                  <Button variant="outline" onClick={() => fetchNotes(nextCursor)}>
+                    더 보기
+                  </Button>
+                </div>
+              )}
             </div>
           )}
 
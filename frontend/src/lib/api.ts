@@ -76,9 +76,14 @@ export const getUserInfo = async (token: string) => {
   }, token);
 };
 
-// 노트 목록 조회
-export const getNotes = async (token: string) => {
-  return fetchApi('/api/v1/notes', {
+// 노트 목록 조회 (최신순, 커서 기반 페이지)
+// 응답: { items: [{ id, title, note_type, created_at, preview }], next_cursor }
+export const getNotes = async (token: string, cursor?: string | null, limit: number = 50) => {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  return fetchApi(`/api/v1/notes?${params.toString()}`, {
     method: 'GET',
   }, token);
 };
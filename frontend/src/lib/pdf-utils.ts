@@ -2,13 +2,28 @@
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+// Content-Disposition 헤더에서 파일명을 읽습니다. (한글 파일명은 filename*에 들어 있음)
+const filenameFromDisposition = (disposition: string | null): string | null => {
+  if (!disposition) return null;
+  const encoded = disposition.match(/filename\*=UTF-8''([^;]+)/i);
+  if (encoded) {
+    try {
+      return decodeURIComponent(encoded[1]);
+    } catch {
+      // 잘못된 인코딩이면 아래의 일반 filename을 사용합니다.
+    }
+  }
+  const plain = disposition.match(/filename="([^"]+)"/i);
+  return plain ? plain[1] : null;
+};
+
 export const downloadNotePDF = async (noteId: string, token: string, noteTitle: string) => {
   try {
+    // 서버가 application/pdf 바이너리를 바로 전송합니다.
     const response = await fetch(`${API_BASE_URL}/api/v1/notes/${noteId}/pdf`, {
       method: 'GET',
       headers: {
         'Authorization': `Bearer ${token}`,
-        'Content-Type': 'application/json',
       },
     });
 
@@ -17,22 +32,14 @@ export const downloadNotePDF = async (noteId: string, token: string, noteTitle:
       throw new Error(errorData.detail || 'PDF 생성 중 오류가 발생했습니다.');
     }
 
-    const data = await response.json();
-    
-    // Base64 데이터를 Blob으로 변환
-    const binaryString = atob(data.pdf_data);
-    const bytes = new Uint8Array(binaryString.length);
-    for (let i = 0; i < binaryString.length; i++) {
-      bytes[i] = binaryString.charCodeAt(i);
-    }
-    
-    const blob = new Blob([bytes], { type: 'application/pdf' });
+    const blob = await response.blob();
+    const filename = filenameFromDisposition(response.headers.get('content-disposition')) || `${noteTitle}.pdf`;
     
     // 다운로드 실행
     const url = URL.createObjectURL(blob);
     const link = document.createElement('a');
     link.href = url;
-    link.download = data.filename || `${noteTitle}.pdf`;
+    link.download = filename;
     document.body.appendChild(link);
     link.click();
     document.body.removeChild(link);
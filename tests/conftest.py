@@ -0,0 +1,12 @@
+# /TINO-TE.ai-BETA-backend/tests/conftest.py
+
+import os
+import sys
+
+# --- 코드 설명 ---
+# 테스트에서 app 패키지를 불러올 수 있도록 저장소 루트를 import 경로에 추가하고,
+# 필수 설정값(OPENAI_API_KEY)이 없어도 app.config가 로드되도록 테스트용 값을 채웁니다.
+# 외부 API는 호출하지 않으므로 실제 키는 필요하지 않습니다.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,163 @@
+# /TINO-TE.ai-BETA-backend/tests/test_media.py
+
+import asyncio
+import io
+import os
+import subprocess
+
+import pytest
+
+from app import media, media_probe
+from app.config import settings
+from app.ingestion import sniff_content_type
+from app.workers import media_pool
+
+# --- 코드 설명 ---
+# 전사 전 오디오 전처리(app/media.py)를 ffmpeg lavfi로 만든 샘플(톤, 무음, 오디오 없는 동영상)로 검사합니다.
+# ffmpeg/ffprobe가 설치되어 있지 않으면 모두 건너뜁니다.
+
+pytestmark = pytest.mark.skipif(not media.ffmpeg_available(), reason="ffmpeg/ffprobe가 설치되어 있지 않습니다.")
+
+
+def _ffmpeg(*args: str) -> None:
+    subprocess.run(["ffmpeg", "-nostdin", "-v", "error", "-y", *args], check=True)
+
+
+def _tone(seconds: float, rate: int = 44100) -> list:
+    return ["-f", "lavfi", "-i", f"sine=frequency=400:duration={seconds}:sample_rate={rate}"]
+
+
+def _silence(seconds: float, rate: int = 44100) -> list:
+    return ["-f", "lavfi", "-i", f"anullsrc=r={rate}:cl=mono:d={seconds}"]
+
+
+def _concat(output: str, *inputs: list) -> str:
+    args = [arg for source in inputs for arg in source]
+    streams = "".join(f"[{index}]" for index in range(len(inputs)))
+    _ffmpeg(*args, "-filter_complex", f"{streams}concat=n={len(inputs)}:v=0:a=1", output)
+    return output
+
+
+@pytest.fixture(autouse=True)
+def _spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_SPOOL_DIR", str(tmp_path / "spool"))
+
+
+@pytest.fixture
+def lecture_video(tmp_path):
+    """스테레오 48kHz 오디오가 들어 있는 10초짜리 동영상"""
+    path = str(tmp_path / "lecture.mp4")
+    _ffmpeg(
+        "-f", "lavfi", "-i", "testsrc=size=320x240:rate=10:duration=10",
+        *_tone(10, 48000), "-b:v", "1M", "-ac", "2", "-b:a", "192k", "-shortest", path,
+    )
+    return path
+
+
+def test_compact_audio_extracts_small_mono_track(lecture_video):
+    async def run():
+        async with media.compact_audio(lecture_video) as audio:
+            assert audio is not None
+            assert audio.content_type == media.audio_format()[1]
+            assert os.path.getsize(audio.path) * 5 < os.path.getsize(lecture_video)
+            probed = await media.probe_duration(audio.path)
+            # 출력 파일 없이 실행하면 ffmpeg가 입력 스트림 정보만 표준 오류로 출력합니다.
+            _, _, info = await media_pool.run("ffmpeg", "-hide_banner", "-i", audio.path)
+            return audio.path, probed, info.decode()
+
+    path, duration, info = asyncio.run(run())
+    assert duration == pytest.approx(10.0, abs=0.2)
+    audio_lines = [line for line in info.splitlines() if "Audio:" in line]
+    assert len(audio_lines) == 1 and "mono" in audio_lines[0]
+    assert not os.path.exists(path)
+
+
+def test_trim_silence_removes_leading_and_trailing_silence(tmp_path):
+    source = _concat(str(tmp_path / "gaps.wav"), _silence(6), _tone(4), _silence(3), _tone(4), _silence(6))
+
+    async def run():
+        async with media.compact_audio(source, trim_silence=True, duration=23.0) as audio:
+            return audio.duration, await media.probe_duration(audio.path)
+
+    reported, probed = asyncio.run(run())
+    # 가운데 무음은 남기고 앞뒤 무음만 잘라냅니다. (양쪽에 SILENCE_KEEP_SECONDS 여유)
+    expected = 11.0 + 2 * media.SILENCE_KEEP_SECONDS
+    assert reported == pytest.approx(expected, abs=0.3)
+    assert probed == pytest.approx(expected, abs=0.3)
+
+
+def test_video_without_audio_raises(tmp_path):
+    path = str(tmp_path / "silent.mp4")
+    _ffmpeg("-f", "lavfi", "-i", "testsrc=size=160x120:rate=5:duration=2", path)
+
+    async def run():
+        async with media.compact_audio(path):
+            pass
+
+    with pytest.raises(media.NoAudioStreamError):
+        asyncio.run(run())
+
+
+def test_speech_only_audio_drops_long_silence(tmp_path):
+    source = _concat(str(tmp_path / "lecture.wav"), _tone(5), _silence(30), _tone(5))
+
+    async def run():
+        async with media.compact_audio(source) as audio:
+            async with media.speech_only_audio(audio) as (speech, timestamps):
+                return speech, timestamps, await media.probe_duration(speech.path)
+
+    speech, timestamps, duration = asyncio.run(run())
+    assert timestamps is not None
+    assert len(timestamps.regions) == 2
+    assert timestamps.regions[0][0] == pytest.approx(0.0, abs=0.3)
+    assert timestamps.regions[1][0] == pytest.approx(35.0 - settings.VAD_PADDING_SECONDS, abs=0.3)
+    assert speech.duration == pytest.approx(timestamps.kept_seconds)
+    assert duration == pytest.approx(timestamps.kept_seconds, abs=0.3)
+    # 이어 붙인 오디오의 두 번째 톤은 원본 녹음의 35초 근처입니다.
+    assert timestamps.to_original(timestamps.regions[0][1] + settings.VAD_PADDING_SECONDS) == pytest.approx(35.0, abs=0.3)
+
+
+def test_speech_only_audio_keeps_continuous_speech(tmp_path):
+    source = _concat(str(tmp_path / "tone.wav"), _tone(8))
+
+    async def run():
+        async with media.compact_audio(source) as audio:
+            async with media.speech_only_audio(audio) as (speech, timestamps):
+                return audio.path, speech.path, timestamps
+
+    audio_path, speech_path, timestamps = asyncio.run(run())
+    assert timestamps is None
+    assert speech_path == audio_path
+
+
+@pytest.mark.parametrize(
+    "extension, codec_args",
+    [
+        (".wav", []),
+        (".flac", []),
+        (".mp3", ["-c:a", "libmp3lame", "-b:a", "64k"]),
+        (".m4a", ["-c:a", "aac"]),
+        (".ogg", ["-c:a", "libopus"]),
+        (".webm", ["-c:a", "libopus"]),
+    ],
+)
+def test_header_probe_matches_ffprobe(tmp_path, extension, codec_args):
+    path = str(tmp_path / f"sample{extension}")
+    try:
+        _ffmpeg(*_tone(7.5, 48000), *codec_args, path)
+    except subprocess.CalledProcessError:
+        pytest.skip(f"이 ffmpeg 빌드는 {extension} 인코딩을 지원하지 않습니다.")
+
+    with open(path, "rb") as source:
+        content_type = sniff_content_type(source.read(64))
+        header_duration = media_probe.probe_duration(source, content_type, os.path.getsize(path))
+
+    assert header_duration == pytest.approx(asyncio.run(media.probe_duration(path)), abs=0.1)
+
+
+def test_plan_segments_overlap_and_cover_duration():
+    segments = media.plan_segments(100.0, 30.0, 5.0)
+    assert segments[0] == (0.0, 30.0)
+    assert all(b[0] == pytest.approx(a[0] + 25.0) for a, b in zip(segments, segments[1:]))
+    assert segments[-1][0] + segments[-1][1] == pytest.approx(100.0)
+    assert media.plan_segments(20.0, 30.0, 5.0) == [(0.0, 20.0)]
@@ -0,0 +1,140 @@
+# /TINO-TE.ai-BETA-backend/tests/test_media_probe.py
+
+import io
+import struct
+import wave
+
+import pytest
+
+from app import media_probe
+from app.ingestion import sniff_content_type
+
+# --- 코드 설명 ---
+# 헤더만 읽어 재생 길이를 구하는 media_probe를 형식별로 직접 만든 최소 헤더로 검사합니다.
+# 실제 인코더가 만든 파일과의 비교는 tests/test_media.py에서 ffmpeg가 있을 때만 실행합니다.
+
+
+def _probe(data: bytes):
+    source = io.BytesIO(data)
+    content_type = sniff_content_type(data[:64])
+    duration = media_probe.probe_duration(source, content_type, len(data))
+    # 길이를 구한 뒤에는 처음 위치로 되돌려 둡니다.
+    assert source.tell() == 0
+    return content_type, duration
+
+
+def _box(box_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def _ebml_size(value: int) -> bytes:
+    return bytes([0x80 | value]) if value < 0x7F else (0x4000 | value).to_bytes(2, "big")
+
+
+def _ebml(element_id: int, body: bytes) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + _ebml_size(len(body)) + body
+
+
+def _ogg_page(granule: int, payload: bytes) -> bytes:
+    header = b"OggS" + struct.pack("<BBqIII", 0, 0, granule, 1, 0, 0)
+    return header + bytes([1, len(payload)]) + payload
+
+
+def test_wav():
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00\x00" * 12000)
+    assert _probe(output.getvalue()) == ("audio/wav", pytest.approx(1.5))
+
+
+def test_wav_with_streaming_data_size():
+    # 스트리밍으로 기록되어 data 크기가 0인 WAV는 파일 끝까지를 데이터로 봅니다.
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00\x00" * 8000)
+    data = bytearray(output.getvalue())
+    data[40:44] = b"\x00\x00\x00\x00"
+    assert _probe(bytes(data))[1] == pytest.approx(1.0)
+
+
+def test_flac():
+    sample_rate, total_samples = 44100, 88200
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = b"\x10\x00\x10\x00" + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+    data = b"fLaC" + b"\x80" + len(streaminfo).to_bytes(3, "big") + streaminfo
+    assert _probe(data) == ("audio/flac", pytest.approx(2.0))
+
+
+def test_mp3_constant_bitrate():
+    # MPEG-1 Layer III, 128kbps, 44.1kHz 프레임 헤더 뒤에 1초 분량의 데이터
+    data = b"\xff\xfb\x90\x00" + b"\x00" * (16000 - 4)
+    assert _probe(data) == ("audio/mpeg", pytest.approx(1.0))
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_mp4_moov_after_media_data(version):
+    if version == 0:
+        mvhd = bytes([0, 0, 0, 0]) + struct.pack(">IIII", 0, 0, 1000, 4500)
+    else:
+        mvhd = bytes([1, 0, 0, 0]) + struct.pack(">QQIQ", 0, 0, 600, 2700)
+    data = (
+        _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2")
+        + _box(b"mdat", b"\x00" * 5000)
+        + _box(b"moov", _box(b"mvhd", mvhd + b"\x00" * 80))
+    )
+    assert _probe(data) == ("video/mp4", pytest.approx(4.5))
+
+
+def test_m4a_brand_is_audio():
+    mvhd = bytes([0, 0, 0, 0]) + struct.pack(">IIII", 0, 0, 44100, 44100 * 3)
+    data = _box(b"ftyp", b"M4A \x00\x00\x00\x00") + _box(b"moov", _box(b"mvhd", mvhd))
+    assert _probe(data) == ("audio/mp4", pytest.approx(3.0))
+
+
+def test_ogg_opus_subtracts_pre_skip():
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+    data = _ogg_page(0, head) + b"\x00" * 1000 + _ogg_page(48000 * 3 + 312, b"\x00" * 10)
+    assert _probe(data) == ("audio/ogg", pytest.approx(3.0))
+
+
+def test_ogg_vorbis():
+    ident = b"\x01vorbis" + struct.pack("<IBIiii", 0, 2, 22050, 0, 0, 0) + b"\xb8\x01"
+    data = _ogg_page(0, ident) + _ogg_page(22050 * 2, b"\x00" * 10)
+    assert _probe(data) == ("audio/ogg", pytest.approx(2.0))
+
+
+def test_webm():
+    header = _ebml(0x1A45DFA3, _ebml(0x4282, b"webm"))
+    info = _ebml(0x1549A966, _ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big")) + _ebml(0x4489, struct.pack(">d", 2500.0)))
+    # 실시간 녹화 파일처럼 Segment 크기를 알 수 없는 경우
+    segment = (0x18538067).to_bytes(4, "big") + b"\x01\xff\xff\xff\xff\xff\xff\xff" + info
+    assert _probe(header + segment) == ("video/webm", pytest.approx(2.5))
+
+
+def test_webm_without_info_before_clusters():
+    header = _ebml(0x1A45DFA3, _ebml(0x4282, b"webm"))
+    segment = _ebml(0x18538067, _ebml(0x1F43B675, b"\x00" * 10))
+    assert _probe(header + segment)[1] is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"RIFF\x24\x00\x00\x00WAVEfmt ",  # 잘린 WAV
+        b"fLaC\x00",  # 잘린 FLAC
+        b"\x00\x00\x00\x18ftypisom" + b"\x00" * 8,  # moov 없는 MP4
+        b"OggS" + b"\x00" * 40,  # 알 수 없는 Ogg 코덱
+    ],
+)
+def test_truncated_or_unknown_headers_return_none(data):
+    assert _probe(data)[1] is None
+
+
+def test_unsupported_type_returns_none():
+    assert media_probe.probe_duration(io.BytesIO(b"#!AMR\n"), "audio/amr", 6) is None
@@ -0,0 +1,146 @@
+# /TINO-TE.ai-BETA-backend/tests/test_vad.py
+
+import numpy as np
+import pytest
+
+from app import vad
+
+# --- 코드 설명 ---
+# VAD(app/vad.py)를 NumPy로 만든 프레임 특징과 PCM 샘플로 검사합니다. ffmpeg는 필요하지 않습니다.
+
+
+def _levels(*parts):
+    """(프레임 수, 에너지 dB) 묶음을 이어 붙여 프레임 특징 배열을 만듭니다. 약간의 흔들림을 더합니다."""
+    rng = np.random.default_rng(0)
+    energy = np.concatenate([np.full(count, level, dtype=np.float32) for count, level in parts])
+    energy += rng.normal(0.0, 1.0, energy.size).astype(np.float32)
+    return energy, np.full(energy.size, 0.05, dtype=np.float32)
+
+
+def _seconds(frames):
+    return frames * vad.FRAME_SECONDS
+
+
+def test_frame_features_energy_and_zero_crossings():
+    t = np.arange(vad.FRAME_SAMPLES * 10) / vad.SAMPLE_RATE
+    tone = (0.5 * 32767 * np.sin(2 * np.pi * 200 * t)).astype(np.int16)
+    silence = np.zeros(vad.FRAME_SAMPLES * 10, dtype=np.int16)
+    noise = np.random.default_rng(1).integers(-3000, 3000, vad.FRAME_SAMPLES * 10).astype(np.int16)
+
+    tone_db, tone_zcr = vad.frame_features(tone)
+    silence_db, _ = vad.frame_features(silence)
+    _, noise_zcr = vad.frame_features(noise)
+
+    assert tone_db.shape == (10,)
+    # 진폭 0.5인 사인파의 평균 제곱은 0.125 (약 -9dBFS)
+    assert np.allclose(tone_db, 10 * np.log10(0.125), atol=0.5)
+    assert np.all(silence_db < -90)
+    assert np.all(tone_zcr < 0.05)
+    assert np.all(noise_zcr > vad.ZCR_THRESHOLD)
+
+
+def test_accumulator_matches_single_pass_for_any_chunking():
+    samples = np.random.default_rng(2).integers(-20000, 20000, vad.FRAME_SAMPLES * 7 + 100).astype("<i2")
+    data = samples.tobytes()
+
+    accumulator = vad.FrameFeatureAccumulator()
+    for start in range(0, len(data), 333):
+        accumulator.feed(data[start:start + 333])
+    energy, zcr = accumulator.result()
+
+    expected_energy, expected_zcr = vad.frame_features(samples[:vad.FRAME_SAMPLES * 7])
+    assert np.allclose(energy, expected_energy)
+    assert np.allclose(zcr, expected_zcr)
+
+
+def test_accumulator_without_data_is_empty():
+    energy, zcr = vad.FrameFeatureAccumulator().result()
+    assert energy.size == 0 and zcr.size == 0
+    assert vad.detect_speech(energy, zcr, 1.0, 0.2) == []
+
+
+def test_detects_speech_between_silences():
+    energy, zcr = _levels((300, -60), (200, -20), (400, -60), (100, -22), (300, -60))
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=2.0, padding_seconds=0.0)
+
+    assert len(regions) == 2
+    assert regions[0] == pytest.approx((_seconds(300), _seconds(500)), abs=0.1)
+    assert regions[1] == pytest.approx((_seconds(900), _seconds(1000)), abs=0.1)
+
+
+def test_mostly_silent_recording_keeps_only_speech():
+    # 95%가 -50dBFS 무음인 녹음에서도 말소리 수준을 배경 소음으로 잘못 잡지 않아야 합니다.
+    energy, zcr = _levels((9500, -50), (500, -20))
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=1.0, padding_seconds=0.2)
+
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert start == pytest.approx(_seconds(9500) - 0.2, abs=0.1)
+    assert end == pytest.approx(_seconds(10000), abs=0.1)
+
+
+def test_uniform_noise_has_no_speech():
+    energy, zcr = _levels((5000, -45))
+    assert vad.detect_speech(energy, zcr, min_silence_seconds=1.0, padding_seconds=0.2) == []
+
+
+def test_short_pauses_are_kept_inside_a_region():
+    energy, zcr = _levels((100, -60), (100, -20), (20, -60), (100, -20), (100, -60))
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=1.0, padding_seconds=0.0)
+    assert len(regions) == 1
+
+
+def test_high_zero_crossing_frames_count_as_speech_above_noise():
+    energy, zcr = _levels((300, -60), (100, -20), (300, -60))
+    # 말소리 바로 뒤의 무성음(에너지는 조금 낮고 영교차율은 높음)
+    energy[400:420] = -43
+    zcr[400:420] = 0.4
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=1.0, padding_seconds=0.0)
+    assert regions[0][1] == pytest.approx(_seconds(420), abs=0.1)
+
+
+def test_long_padding_does_not_overflow():
+    # 패딩 창이 127프레임보다 길어도 긴 말소리 구간 중간에 구멍이 생기지 않아야 합니다.
+    energy, zcr = _levels((1000, -60), (300, -20), (1000, -60))
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=0.1, padding_seconds=3.0)
+    assert regions == [pytest.approx((_seconds(900), _seconds(1400)), abs=0.05)]
+
+
+def test_padding_longer_than_recording():
+    energy, zcr = _levels((10, -60), (2, -20), (10, -60))
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=1.0, padding_seconds=5.0)
+    assert regions == [pytest.approx((0.0, _seconds(22)))]
+
+
+def test_max_regions_fills_shortest_silences_first():
+    parts = [(100, -60)]
+    for gap in (80, 40, 120, 60):
+        parts += [(50, -20), (gap, -60)]
+    parts += [(50, -20), (100, -60)]
+    energy, zcr = _levels(*parts)
+
+    regions = vad.detect_speech(energy, zcr, min_silence_seconds=0.5, padding_seconds=0.0)
+    assert len(regions) == 5
+
+    merged = vad.detect_speech(energy, zcr, min_silence_seconds=0.5, padding_seconds=0.0, max_regions=3)
+    assert len(merged) == 3
+    # 가장 긴 두 무음(120, 80프레임)에서만 나뉩니다.
+    gaps = [round((b[0] - a[1]) / vad.FRAME_SECONDS) for a, b in zip(merged, merged[1:])]
+    assert sorted(gaps) == [80, 120]
+
+
+def test_timestamp_map_translates_to_original_time():
+    timestamps = vad.TimestampMap([(10.0, 20.0), (50.0, 55.0), (100.0, 130.0)])
+
+    assert timestamps.kept_seconds == pytest.approx(45.0)
+    assert timestamps.to_original(0.0) == pytest.approx(10.0)
+    assert timestamps.to_original(9.5) == pytest.approx(19.5)
+    assert timestamps.to_original(10.0) == pytest.approx(50.0)
+    assert timestamps.to_original(16.0) == pytest.approx(101.0)
+    assert timestamps.to_original_range(12.0, 5.0) == pytest.approx((52.0, 102.0))
+
+
+def test_empty_timestamp_map_is_identity():
+    timestamps = vad.TimestampMap([])
+    assert timestamps.kept_seconds == 0.0
+    assert timestamps.to_original(12.5) == 12.5